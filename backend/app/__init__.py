@@ -1,13 +1,22 @@
 import os
-from flask import Flask, send_from_directory
+import time
+
+# Taken before Flask and the app modules load, so startup stats include imports
+_IMPORT_STARTED = time.perf_counter()
+
+from flask import Flask, jsonify, send_from_directory
 from flask_cors import CORS
 from dotenv import load_dotenv
 
 from app.config import Config
-from app.database import init_db, close_db
+from app.database import DatabaseBusy, PoolExhausted, init_db, close_db
+from app.passwords import PasswordHasherBusy, init_password_hasher
+
+_IMPORT_MS = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)
 
 
 def create_app():
+    started = time.perf_counter()
     load_dotenv()
 
     app = Flask(__name__, static_folder=None)
@@ -23,6 +32,16 @@ def create_app():
 
     app.teardown_appcontext(close_db)
 
+    init_password_hasher(app)
+
+    @app.errorhandler(DatabaseBusy)
+    @app.errorhandler(PoolExhausted)
+    @app.errorhandler(PasswordHasherBusy)
+    def service_busy(e):
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response, 503
+
     with app.app_context():
         init_db()
 
@@ -46,6 +65,9 @@ def create_app():
     from app.routes.rentals import rentals_bp
     from app.routes.users import users_bp
     from app.routes.upload import upload_bp
+    from app.routes.admin import admin_bp
+    from app.routes.events import events_bp
+    from app.routes.sync import sync_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(books_bp)
@@ -57,5 +79,13 @@ def create_app():
     app.register_blueprint(rentals_bp)
     app.register_blueprint(users_bp)
     app.register_blueprint(upload_bp)
+    app.register_blueprint(admin_bp)
+    app.register_blueprint(events_bp)
+    app.register_blueprint(sync_bp)
 
+    finished = time.perf_counter()
+    app.extensions['startup_ms'] = {
+        'import': _IMPORT_MS,
+        'create_app': round((finished - started) * 1000, 1),
+    }
     return app
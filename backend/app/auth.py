@@ -1,11 +1,15 @@
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
 from functools import wraps
 
-import bcrypt
 import jwt
 from flask import request, g, jsonify, current_app
 
 from app.database import query_db
+from app.passwords import get_password_hasher
+from app.versions import get_versions
 
 
 def generate_token(user_id, role):
@@ -34,24 +38,133 @@ def decode_token(token):
 
 
 def hash_password(password):
-    """Hash a password using bcrypt."""
-    return bcrypt.hashpw(
-        password.encode('utf-8'),
-        bcrypt.gensalt()
-    ).decode('utf-8')
+    """Hash a password using bcrypt on the bounded hashing pool."""
+    return get_password_hasher().hash(password)
 
 
 def check_password(password, hashed):
-    """Verify a password against a bcrypt hash."""
-    return bcrypt.checkpw(
-        password.encode('utf-8'),
-        hashed.encode('utf-8')
-    )
+    """Verify a password against a bcrypt hash on the bounded hashing pool."""
+    return get_password_hasher().check(password, hashed)
+
+
+def password_needs_rehash(hashed):
+    """True if a stored hash uses a different cost than the current setting."""
+    return get_password_hasher().needs_rehash(hashed)
+
+
+class UserCache:
+    """Bounded LRU of authenticated-user rows with a TTL.
+
+    Entries remember the `users` data version they were loaded under; a
+    write to users from any process bumps that version and so invalidates
+    every entry without cross-process messaging. The version itself is
+    re-read at most once per `version_interval` seconds, so a cache hit
+    costs no query; writes made by this process invalidate immediately.
+    """
+
+    def __init__(self, maxsize, ttl, version_interval):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version_interval = version_interval
+        self._version = None
+        self._version_expires_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # user_id -> (user, version, expires_at)
+        self._lock = threading.Lock()
+
+    def version(self, fetch):
+        """Return the `users` data version, calling fetch() when the last
+        reading is older than version_interval."""
+        now = time.monotonic()
+        with self._lock:
+            if now < self._version_expires_at:
+                return self._version
+        version = fetch()
+        with self._lock:
+            self._version = version
+            self._version_expires_at = now + self.version_interval
+        return version
+
+    def get(self, user_id, version):
+        """Return a copy of the cached user, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                user, cached_version, expires_at = entry
+                if cached_version == version and expires_at > time.monotonic():
+                    self._entries.move_to_end(user_id)
+                    self.hits += 1
+                    return dict(user)
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+
+    def put(self, user_id, user, version):
+        with self._lock:
+            self._entries[user_id] = (dict(user), version, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+def get_user_cache():
+    """Return the current app's UserCache, creating it on first use."""
+    cache = current_app.extensions.get('user_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault('user_cache', UserCache(
+            current_app.config['USER_CACHE_SIZE'],
+            current_app.config['USER_CACHE_TTL'],
+            current_app.config['USER_CACHE_VERSION_INTERVAL'],
+        ))
+    return cache
+
+
+def invalidate_user(user_id):
+    """Drop a user from this process's cache after changing their row.
+
+    Other processes notice through the `users` data version, within
+    USER_CACHE_VERSION_INTERVAL seconds.
+    """
+    get_user_cache().invalidate(user_id)
+
+
+def load_user(user_id):
+    """Load the public fields of a user, served from the cache when current."""
+    cache = get_user_cache()
+    version = cache.version(lambda: get_versions(('users',)).get('users', 0))
+
+    user = cache.get(user_id, version)
+    if user is None:
+        user = query_db(
+            'SELECT id, email, full_name, role, avatar_url, created_at, updated_at FROM users WHERE id = ?',
+            [user_id],
+            one=True
+        )
+        if user is not None:
+            cache.put(user_id, user, version)
+    return user
 
 
 def login_required(f):
     """Decorator that extracts JWT from Authorization header (Bearer token),
-    loads user from DB, and injects g.current_user.
+    loads user (via the user cache), and injects g.current_user.
     Returns 401 JSON response on failure."""
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -66,11 +179,7 @@ def login_required(f):
         if payload is None:
             return jsonify({'error': 'Invalid or expired token'}), 401
 
-        user = query_db(
-            'SELECT id, email, full_name, role, avatar_url, created_at, updated_at FROM users WHERE id = ?',
-            [payload['user_id']],
-            one=True
-        )
+        user = load_user(payload['user_id'])
 
         if user is None:
             return jsonify({'error': 'User not found'}), 401
@@ -0,0 +1,188 @@
+"""Incremental sync of the books table with the librarians' spreadsheet.
+
+Each sheet row is matched to an existing book by inventory number, then
+by ISBN, then by title + author (case-insensitive), pairing each book at
+most once. Matched books whose catalog fields differ are updated, unmatched
+rows are inserted, and books no longer in the sheet are removed unless
+they have rental history (those are kept and reported). `available` is
+left alone on existing books: it tracks live rentals, not the sheet.
+
+Planning only reads; a file identical to the database yields an empty plan
+and no writes.
+"""
+import random
+import uuid
+from contextlib import contextmanager
+
+from app.importer import BOOK_INSERT, COVER_COLORS, ReferenceResolver
+
+BATCH_SIZE = 500
+
+# Catalog fields the sheet owns; compared and overwritten on matched books
+SYNC_FIELDS = (
+    'title', 'author', 'category', 'series', 'publisher', 'publication_year',
+    'isbn', 'supplier', 'age', 'description', 'inventory_number',
+)
+
+BOOK_UPDATE = '''UPDATE books SET title = :title, author = :author, category = :category,
+                 category_id = :category_id, series_id = :series_id, publisher_id = :publisher_id,
+                 publication_year = :publication_year, isbn = :isbn, supplier = :supplier, age = :age,
+                 description = :description, inventory_number = :inventory_number,
+                 updated_at = CURRENT_TIMESTAMP
+                 WHERE id = :id'''
+
+
+def _fold(value):
+    return (value or '').strip().casefold()
+
+
+def _current_books(db):
+    rows = db.execute(
+        '''SELECT b.id, b.title, b.author, b.category, b.publication_year, b.isbn, b.supplier,
+                  b.age, b.description, b.inventory_number,
+                  s.name AS series, p.name AS publisher,
+                  EXISTS (SELECT 1 FROM rental_requests r WHERE r.book_id = b.id) AS has_rentals
+           FROM books b
+           LEFT JOIN series s ON s.id = b.series_id
+           LEFT JOIN publishers p ON p.id = b.publisher_id
+           ORDER BY b.created_at, b.id'''
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def plan_sync(db, sheet_books):
+    """Compare parsed sheet rows with the books table.
+
+    `sheet_books` is a list of (row_number, book) pairs as produced by
+    app.excel.iter_book_rows. Returns a plan dict with 'insert' (sheet
+    books), 'update' ((book_id, sheet book, changed fields)), 'remove'
+    (books) and 'keep' (books missing from the sheet but with rental
+    history), plus 'unchanged' and 'duplicates' counts.
+    """
+    current = _current_books(db)
+    by_inventory = {}
+    by_isbn = {}
+    by_title_author = {}
+    for book in current:
+        if book['inventory_number'] is not None:
+            by_inventory.setdefault(book['inventory_number'], []).append(book)
+        if book['isbn']:
+            by_isbn.setdefault(_fold(book['isbn']), []).append(book)
+        by_title_author.setdefault((_fold(book['title']), _fold(book['author'])), []).append(book)
+
+    matched = set()
+
+    def take(candidates):
+        for book in candidates or ():
+            if book['id'] not in matched:
+                matched.add(book['id'])
+                return book
+        return None
+
+    # Inventory numbers first across the whole sheet, so a fallback match
+    # can never steal a book that a later row claims by number
+    pairs = {}
+    seen_inventory = set()
+    duplicates = 0
+    for row_number, sheet_book in sheet_books:
+        inventory = sheet_book['inventory_number']
+        if inventory is None:
+            continue
+        if inventory in seen_inventory:
+            duplicates += 1
+            continue
+        seen_inventory.add(inventory)
+        book = take(by_inventory.get(inventory))
+        if book:
+            pairs[row_number] = book
+
+    plan = {'insert': [], 'update': [], 'remove': [], 'keep': [], 'unchanged': 0, 'duplicates': duplicates}
+    for row_number, sheet_book in sheet_books:
+        book = pairs.get(row_number)
+        if book is None and sheet_book['isbn']:
+            book = take(by_isbn.get(_fold(sheet_book['isbn'])))
+        if book is None:
+            book = take(by_title_author.get((_fold(sheet_book['title']), _fold(sheet_book['author']))))
+
+        if book is None:
+            plan['insert'].append(sheet_book)
+            continue
+
+        changed = [field for field in SYNC_FIELDS if (book[field] or None) != (sheet_book[field] or None)]
+        if changed:
+            plan['update'].append((book['id'], sheet_book, changed))
+        else:
+            plan['unchanged'] += 1
+
+    for book in current:
+        if book['id'] not in matched:
+            plan['keep' if book['has_rentals'] else 'remove'].append(book)
+
+    return plan
+
+
+def _batches(items, size=BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+@contextmanager
+def _transaction(db):
+    db.execute('BEGIN IMMEDIATE')
+    try:
+        yield
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def apply_sync(db, plan):
+    """Write a plan from plan_sync, one IMMEDIATE transaction per batch."""
+    if db.in_transaction:
+        db.commit()
+    resolver = ReferenceResolver(db)
+
+    for batch in _batches(plan['insert']):
+        books = [
+            {
+                **book,
+                'id': str(uuid.uuid4()),
+                'series': book['series'] or '',
+                'publisher': book['publisher'] or '',
+                'cover_color': random.choice(COVER_COLORS),
+                'cover_image_url': None,
+                'new_book': 0,
+            }
+            for book in batch
+        ]
+        with _transaction(db):
+            resolver.resolve(books)
+            db.executemany(BOOK_INSERT, books)
+
+    for batch in _batches(plan['update']):
+        books = [
+            {**book, 'id': book_id, 'series': book['series'] or '', 'publisher': book['publisher'] or ''}
+            for book_id, book, _ in batch
+        ]
+        with _transaction(db):
+            resolver.resolve(books)
+            db.executemany(BOOK_UPDATE, books)
+
+    for batch in _batches(plan['remove']):
+        ids = [(book['id'],) for book in batch]
+        with _transaction(db):
+            db.executemany('DELETE FROM book_media WHERE book_id = ?', ids)
+            db.executemany('DELETE FROM books WHERE id = ?', ids)
+
+
+def summarize(plan):
+    """Counts for reporting a plan."""
+    return {
+        'inserted': len(plan['insert']),
+        'updated': len(plan['update']),
+        'removed': len(plan['remove']),
+        'kept_with_rentals': len(plan['keep']),
+        'unchanged': plan['unchanged'],
+        'duplicate_inventory_numbers': plan['duplicates'],
+    }
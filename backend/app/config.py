@@ -7,3 +7,36 @@ class Config:
     DATABASE_PATH = os.environ.get('DATABASE_PATH', 'library.db')
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', 'uploads')
     JWT_EXPIRY = timedelta(hours=24)
+    # SQLite connections (see app/database.py). DB_POOL_SIZE=0 disables
+    # pooling and opens a connection per request.
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 16))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))  # seconds
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 16384))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 64 * 1024 * 1024))
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    # Extra attempts for write transactions still locked after busy_timeout
+    DB_BUSY_RETRIES = int(os.environ.get('DB_BUSY_RETRIES', 3))
+    SQLITE_CACHED_STATEMENTS = int(os.environ.get('SQLITE_CACHED_STATEMENTS', 256))
+    # In-process cache of authenticated users (see app/auth.py)
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 1024))
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60))  # seconds
+    # How often each process re-reads the users data version; a role change
+    # made by another process takes effect within this many seconds
+    USER_CACHE_VERSION_INTERVAL = float(os.environ.get('USER_CACHE_VERSION_INTERVAL', 5))
+    # Password hashing (see app/passwords.py). Unset BCRYPT_ROUNDS to
+    # calibrate the cost against BCRYPT_TARGET_MS at startup.
+    BCRYPT_ROUNDS = int(os.environ['BCRYPT_ROUNDS']) if os.environ.get('BCRYPT_ROUNDS') else None
+    BCRYPT_TARGET_MS = int(os.environ.get('BCRYPT_TARGET_MS', 250))
+    BCRYPT_MAX_CONCURRENCY = int(os.environ.get('BCRYPT_MAX_CONCURRENCY', 2))
+    BCRYPT_MAX_QUEUE = int(os.environ.get('BCRYPT_MAX_QUEUE', 8))
+    BCRYPT_QUEUE_TIMEOUT = float(os.environ.get('BCRYPT_QUEUE_TIMEOUT', 2))  # seconds
+    # Admin change stream (see app/events.py)
+    EVENTS_POLL_INTERVAL = float(os.environ.get('EVENTS_POLL_INTERVAL', 0.5))  # seconds
+    EVENTS_HEARTBEAT = float(os.environ.get('EVENTS_HEARTBEAT', 15))  # seconds; also how often the user is re-checked
+    # Streams end after this long (well within JWT_EXPIRY) and the client reconnects
+    EVENTS_MAX_STREAM_SECONDS = int(os.environ.get('EVENTS_MAX_STREAM_SECONDS', 3600))
+    EVENTS_RETRY_MS = int(os.environ.get('EVENTS_RETRY_MS', 3000))  # client reconnect delay
+    EVENTS_BACKLOG = int(os.environ.get('EVENTS_BACKLOG', 1000))  # per process, in memory
+    EVENTS_RETENTION = int(os.environ.get('EVENTS_RETENTION', 10000))  # rows kept in the events table
+    # Loans due within this many days are listed as due soon (GET /api/rentals/overdue)
+    RENTAL_DUE_SOON_DAYS = int(os.environ.get('RENTAL_DUE_SOON_DAYS', 3))
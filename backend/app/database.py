@@ -1,39 +1,236 @@
 import os
+import queue
+import random
 import sqlite3
+import threading
+import time
 from flask import g, current_app
 
+from app.migrate import migrate
+
+
+class PoolExhausted(Exception):
+    """Raised when no pooled connection frees up within DB_POOL_TIMEOUT."""
+
+    retry_after = 1
+
+
+class DatabaseBusy(Exception):
+    """Raised when a write transaction cannot get the database lock after retrying."""
+
+    retry_after = 1
+
+
+_pool_lock = threading.Lock()
+
+
+def _casefold(value):
+    return value.casefold() if isinstance(value, str) else value
+
+
+def connect(db_path, config):
+    """Open a connection configured with the SQLITE_* settings from `config`."""
+    db = sqlite3.connect(
+        db_path,
+        check_same_thread=False,
+        cached_statements=config['SQLITE_CACHED_STATEMENTS'],
+    )
+    db.row_factory = sqlite3.Row
+    db.execute('PRAGMA journal_mode = WAL')
+    db.execute('PRAGMA synchronous = NORMAL')
+    db.execute(f"PRAGMA cache_size = {-int(config['SQLITE_CACHE_SIZE_KB'])}")
+    db.execute(f"PRAGMA mmap_size = {int(config['SQLITE_MMAP_SIZE'])}")
+    db.execute(f"PRAGMA busy_timeout = {int(config['SQLITE_BUSY_TIMEOUT_MS'])}")
+    db.execute('PRAGMA foreign_keys = ON')
+    # SQLite's lower()/LIKE only fold ASCII; this folds Cyrillic too
+    db.create_function('casefold', 1, _casefold, deterministic=True)
+    return db
+
+
+class ConnectionPool:
+    """A bounded LIFO pool of configured connections to one database file.
+
+    Connections are opened on demand up to `size`; LIFO reuse keeps the
+    most recently used (warmest page and statement cache) connections busy.
+    """
+
+    def __init__(self, db_path, config, size, timeout):
+        self.db_path = db_path
+        self.config = config
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def acquire(self):
+        start = time.perf_counter()
+        blocked = False
+        try:
+            db = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if self._opened < self.size:
+                    self._opened += 1
+                    opening = True
+                else:
+                    opening = False
+            if opening:
+                try:
+                    db = connect(self.db_path, self.config)
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                blocked = True
+                try:
+                    db = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._timeouts += 1
+                    raise PoolExhausted('Database is busy, try again shortly')
+
+        waited = time.perf_counter() - start
+        with self._lock:
+            self._checkouts += 1
+            if blocked:
+                self._waits += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+        return db
+
+    def release(self, db):
+        try:
+            # Never hand the next request a half-finished transaction
+            if db.in_transaction:
+                db.rollback()
+        except sqlite3.Error:
+            db.close()
+            with self._lock:
+                self._opened -= 1
+            return
+        self._idle.put(db)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': self._opened,
+                'max_size': self.size,
+                'idle': self._idle.qsize(),
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'timeouts': self._timeouts,
+                'wait_ms_total': round(self._wait_total * 1000, 3),
+                'wait_ms_max': round(self._wait_max * 1000, 3),
+            }
+
+
+def get_pool():
+    """Return the app's connection pool, or None when DB_POOL_SIZE is 0."""
+    if current_app.config['DB_POOL_SIZE'] <= 0:
+        return None
+    pool = current_app.extensions.get('db_pool')
+    if pool is None:
+        with _pool_lock:
+            pool = current_app.extensions.get('db_pool')
+            if pool is None:
+                pool = ConnectionPool(
+                    current_app.config['DATABASE_PATH'],
+                    current_app.config,
+                    current_app.config['DB_POOL_SIZE'],
+                    current_app.config['DB_POOL_TIMEOUT'],
+                )
+                current_app.extensions['db_pool'] = pool
+    return pool
+
 
 def get_db():
     """Get a database connection stored in Flask's g object."""
     if 'db' not in g:
-        db_path = current_app.config['DATABASE_PATH']
-        g.db = sqlite3.connect(db_path)
-        g.db.row_factory = sqlite3.Row
-        g.db.execute('PRAGMA foreign_keys = ON')
+        pool = get_pool()
+        if pool is not None:
+            g.db = pool.acquire()
+        else:
+            g.db = connect(current_app.config['DATABASE_PATH'], current_app.config)
     return g.db
 
 
 def close_db(e=None):
-    """Close the database connection on app teardown."""
+    """Return the database connection to the pool (or close it) on app teardown."""
     db = g.pop('db', None)
     if db is not None:
-        db.close()
+        pool = get_pool()
+        if pool is not None:
+            pool.release(db)
+        else:
+            db.close()
 
 
-def init_db():
-    """Initialize the database from schema.sql and create upload directories."""
+def _is_busy(error):
+    return isinstance(error, sqlite3.OperationalError) and (
+        'locked' in str(error) or 'busy' in str(error)
+    )
+
+
+def write_transaction(fn, *args, **kwargs):
+    """Run fn(db, *args, **kwargs) in a BEGIN IMMEDIATE transaction and return its result.
+
+    IMMEDIATE takes the write lock up front, so everything fn reads stays
+    valid until it commits. If the lock stays busy past busy_timeout the
+    whole call is retried up to DB_BUSY_RETRIES times with jittered
+    backoff, then DatabaseBusy is raised. fn must not commit itself.
+
+    Raises RuntimeError if the connection already has uncommitted writes:
+    committing them here would put them outside the retry and atomicity
+    this helper provides, so callers must commit or move them into fn.
+    """
     db = get_db()
+    if db.in_transaction:
+        raise RuntimeError('write_transaction called with a transaction already open')
 
-    schema_path = os.path.join(os.path.dirname(__file__), 'schema.sql')
-    with open(schema_path, 'r') as f:
-        db.executescript(f.read())
+    retries = current_app.config['DB_BUSY_RETRIES']
+    for attempt in range(retries + 1):
+        try:
+            db.execute('BEGIN IMMEDIATE')
+            result = fn(db, *args, **kwargs)
+            db.commit()
+            return result
+        except Exception as e:
+            if db.in_transaction:
+                db.rollback()
+            if not _is_busy(e):
+                raise
+            if attempt == retries:
+                raise DatabaseBusy('Database is busy, try again shortly') from e
+            time.sleep(random.uniform(0.01, 0.05) * 2 ** attempt)
 
-    # Migrations for existing databases
-    try:
-        db.execute('ALTER TABLE rental_requests ADD COLUMN queue_position INTEGER DEFAULT NULL')
+
+def read_transaction(fn, *args, **kwargs):
+    """Run fn(db, *args, **kwargs) in one read transaction and return its result.
+
+    Under WAL every statement fn runs sees the same snapshot, however many
+    writes commit meanwhile; readers never block writers.
+    """
+    db = get_db()
+    if db.in_transaction:
         db.commit()
-    except Exception:
-        pass  # Column already exists
+    db.execute('BEGIN')
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.rollback()
+
+
+def init_db():
+    """Apply pending schema migrations and create upload directories."""
+    db = get_db()
+    migrate(db)
 
     # Create upload directories
     upload_folder = current_app.config['UPLOAD_FOLDER']
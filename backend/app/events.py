@@ -0,0 +1,138 @@
+"""Change events for admin clients (served as SSE by app/routes/events.py).
+
+Write paths call publish() inside their transaction, which appends a
+compact event to the `events` table, so an event exists exactly when its
+change committed, whichever worker process made it. Each process runs one
+EventBus thread that tails the table (querying only when PRAGMA
+data_version shows another connection committed) and wakes the streams
+waiting on it; the cost of following the log does not grow with the number
+of open streams, and streams hold no database connection while they wait.
+"""
+import collections
+import json
+import logging
+import threading
+import time
+
+from flask import current_app
+
+from app.database import connect
+
+logger = logging.getLogger(__name__)
+
+
+def publish(db, event_type, **data):
+    """Append an event in the caller's transaction and prune the oldest ones."""
+    cursor = db.execute(
+        'INSERT INTO events (type, data) VALUES (?, ?)',
+        [event_type, json.dumps(data, ensure_ascii=False, separators=(',', ':'))]
+    )
+    retention = current_app.config['EVENTS_RETENTION']
+    db.execute('DELETE FROM events WHERE id <= ?', [cursor.lastrowid - retention])
+
+
+def _row_to_event(row):
+    return {'id': row[0], 'type': row[1], 'data': row[2]}
+
+
+def events_after(db, after_id, limit):
+    """Logged events with id > after_id, oldest first, or None if some were pruned."""
+    oldest = db.execute('SELECT MIN(id) FROM events').fetchone()[0]
+    if oldest is not None and oldest > after_id + 1:
+        return None
+    rows = db.execute(
+        'SELECT id, type, data FROM events WHERE id > ? ORDER BY id LIMIT ?', [after_id, limit]
+    ).fetchall()
+    return [_row_to_event(row) for row in rows]
+
+
+def last_event_id(db):
+    return db.execute('SELECT COALESCE(MAX(id), 0) FROM events').fetchone()[0]
+
+
+class EventBus:
+    """Per-process fan-out of the events table to waiting streams."""
+
+    def __init__(self, db_path, config, poll_interval, backlog):
+        self.db_path = db_path
+        self.config = config
+        self.poll_interval = poll_interval
+        self._recent = collections.deque(maxlen=backlog)
+        self._cond = threading.Condition()
+        self._last_id = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                db = connect(self.db_path, self.config)
+                self._last_id = last_event_id(db)
+                self._thread = threading.Thread(target=self._run, args=(db,), name='event-bus', daemon=True)
+                self._thread.start()
+
+    def _run(self, db):
+        data_version = None
+        while True:
+            try:
+                version = db.execute('PRAGMA data_version').fetchone()[0]
+                if version != data_version:
+                    data_version = version
+                    self._poll(db)
+            except Exception:
+                logger.exception('Reading events failed')
+            time.sleep(self.poll_interval)
+
+    def _poll(self, db):
+        while True:
+            rows = db.execute(
+                'SELECT id, type, data FROM events WHERE id > ? ORDER BY id LIMIT 500', [self._last_id]
+            ).fetchall()
+            if not rows:
+                return
+            with self._cond:
+                self._recent.extend(_row_to_event(row) for row in rows)
+                self._last_id = rows[-1][0]
+                self._cond.notify_all()
+
+    @property
+    def last_id(self):
+        with self._cond:
+            return self._last_id
+
+    def wait(self, after_id, timeout):
+        """Events with id > after_id, waiting up to `timeout` seconds for one.
+
+        Returns None when the stream fell further behind than the in-memory
+        backlog and has to start over.
+        """
+        with self._cond:
+            if self._last_id <= after_id:
+                self._cond.wait(timeout)
+            # Ids are consecutive, so a full backlog starting past after_id + 1
+            # means the events in between have been dropped
+            if len(self._recent) == self._recent.maxlen and self._recent[0]['id'] > after_id + 1:
+                return None
+            return [event for event in self._recent if event['id'] > after_id]
+
+    def stats(self):
+        with self._cond:
+            return {
+                'running': self._thread is not None,
+                'last_id': self._last_id,
+                'backlog': len(self._recent),
+            }
+
+
+def get_event_bus():
+    """Return this process's EventBus, starting its thread on first use."""
+    bus = current_app.extensions.get('event_bus')
+    if bus is None:
+        bus = current_app.extensions.setdefault('event_bus', EventBus(
+            current_app.config['DATABASE_PATH'],
+            current_app.config,
+            current_app.config['EVENTS_POLL_INTERVAL'],
+            current_app.config['EVENTS_BACKLOG'],
+        ))
+    bus.start()
+    return bus
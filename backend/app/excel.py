@@ -0,0 +1,109 @@
+"""Reading the library spreadsheet.
+
+The librarians keep the catalog in an .xlsx workbook whose "КНИГИ" sheet
+has one book per row below a header row. openpyxl is imported lazily and
+opened in read_only mode, so rows stream from the file and memory stays
+flat however large it is.
+"""
+
+BOOKS_SHEET = 'КНИГИ'
+
+# Availability marker meaning the copy is out with a reader
+ON_LOAN = 'ЧИТАЮТЬ'
+
+# 0-based column positions in the "КНИГИ" sheet (column A = 0)
+COL_INVENTORY_NUMBER = 2
+COL_CATEGORY = 3
+COL_AUTHOR = 4
+COL_TITLE = 5
+COL_AVAILABILITY = 6  # more complete than the later availability column
+COL_SERIES = 7
+COL_PUBLISHER_CITY = 8
+COL_PUBLISHER = 9
+COL_PUBLICATION_YEAR = 10
+COL_ISBN = 11
+COL_SUPPLIER = 12
+COL_AGE = 14
+COL_DESCRIPTION = 15
+
+
+def _cell(row, index):
+    return row[index] if index < len(row) else None
+
+
+def cell_text(value):
+    """Stripped string value of a cell, or None for empty cells."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def parse_book_row(row):
+    """Return book fields for one "КНИГИ" row, or None if it has no title."""
+    title = cell_text(_cell(row, COL_TITLE))
+    if not title:
+        return None
+
+    inventory_number = None
+    inv = _cell(row, COL_INVENTORY_NUMBER)
+    if inv is not None:
+        try:
+            inventory_number = int(float(inv))
+        except (ValueError, TypeError):
+            pass
+
+    publication_year = None
+    year = _cell(row, COL_PUBLICATION_YEAR)
+    if year is not None:
+        try:
+            publication_year = str(int(float(year)))
+        except (ValueError, TypeError):
+            publication_year = cell_text(year)
+
+    return {
+        'title': title,
+        'author': cell_text(_cell(row, COL_AUTHOR)) or '',
+        # Uncategorised books keep an empty category, as they always have
+        'category': cell_text(_cell(row, COL_CATEGORY)) or '',
+        'series': cell_text(_cell(row, COL_SERIES)),
+        'publisher': cell_text(_cell(row, COL_PUBLISHER)),
+        'publisher_city': cell_text(_cell(row, COL_PUBLISHER_CITY)) or '',
+        'publication_year': publication_year,
+        'isbn': cell_text(_cell(row, COL_ISBN)),
+        'supplier': cell_text(_cell(row, COL_SUPPLIER)),
+        'age': cell_text(_cell(row, COL_AGE)),
+        'description': cell_text(_cell(row, COL_DESCRIPTION)),
+        'inventory_number': inventory_number,
+        'available': 0 if cell_text(_cell(row, COL_AVAILABILITY)) == ON_LOAN else 1,
+    }
+
+
+def _books_sheet(workbook):
+    if BOOKS_SHEET in workbook.sheetnames:
+        return workbook[BOOKS_SHEET]
+    # Same fallback as the old in-browser import: second sheet, else first
+    names = workbook.sheetnames
+    return workbook[names[1] if len(names) > 1 else names[0]]
+
+
+def iter_book_rows(path, on_size=None):
+    """Yield (sheet_row_number, book) for every titled row of the books sheet.
+
+    on_size(rows), if given, is called once the sheet is open with its data
+    row count from the stored dimensions (an estimate, or None), so callers
+    can report progress without opening the file twice.
+    """
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = _books_sheet(workbook)
+        if on_size is not None:
+            on_size(max(sheet.max_row - 1, 0) if sheet.max_row else None)
+        for row_number, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
+            book = parse_book_row(row)
+            if book is not None:
+                yield row_number, book
+    finally:
+        workbook.close()
@@ -0,0 +1,120 @@
+"""In-memory facet index for the catalog filters.
+
+Each facet value maps to a bitset (a Python int) of the books carrying it,
+so counting how many books match every option under the current selection
+is a handful of ANDs and popcounts instead of a query per facet. The index
+is rebuilt from a single query whenever the books/series/publishers data
+versions change.
+"""
+import threading
+
+from flask import current_app
+
+from app.database import query_db
+from app.versions import get_versions
+
+FACETS = ('category', 'author', 'age', 'publisher', 'series', 'availability')
+
+VERSION_SCOPES = ('books', 'series', 'publishers')
+
+_index = None
+_index_lock = threading.Lock()
+
+
+class FacetIndex:
+    """Bitsets per facet value over a snapshot of the books table."""
+
+    def __init__(self, rows):
+        self.positions = {}  # books.rowid -> bit position
+        self.bitsets = {facet: {} for facet in FACETS}
+
+        for position, row in enumerate(rows):
+            self.positions[row['rowid']] = position
+            bit = 1 << position
+            values = {
+                'category': row['category'],
+                'author': row['author'],
+                'age': row['age'],
+                'publisher': row['publisher'],
+                'series': row['series'],
+                'availability': 'available' if row['available'] else 'unavailable',
+            }
+            for facet, value in values.items():
+                if value is None or value == '':
+                    continue
+                bitsets = self.bitsets[facet]
+                bitsets[value] = bitsets.get(value, 0) | bit
+
+        self.all = (1 << len(rows)) - 1
+
+    def mask_for_rowids(self, rowids):
+        """Bitset of the given books.rowid values (e.g. full-text matches)."""
+        mask = 0
+        for rowid in rowids:
+            position = self.positions.get(rowid)
+            if position is not None:
+                mask |= 1 << position
+        return mask
+
+    def values(self, facet):
+        """All values of a facet, sorted."""
+        return sorted(self.bitsets[facet])
+
+    def counts(self, selection, restrict=None):
+        """Count matches for every value of every facet.
+
+        `selection` maps facet names to the selected value. Each facet is
+        counted under all *other* selected facets, so the UI can show how
+        many books switching that facet's value would yield. `restrict` is
+        an optional bitset (such as search matches) applied to everything.
+        Returns ({facet: [{value, count}]}, total).
+        """
+        base = self.all if restrict is None else self.all & restrict
+        masks = {
+            facet: self.bitsets[facet].get(value, 0)
+            for facet, value in selection.items() if facet in self.bitsets
+        }
+
+        result = {}
+        for facet in FACETS:
+            mask = base
+            for other, other_mask in masks.items():
+                if other != facet:
+                    mask &= other_mask
+            result[facet] = [
+                {'value': value, 'count': (bits & mask).bit_count()}
+                for value, bits in sorted(self.bitsets[facet].items())
+            ]
+
+        total = base
+        for other_mask in masks.values():
+            total &= other_mask
+        return result, total.bit_count()
+
+
+def _build_index():
+    rows = query_db(
+        '''SELECT b.rowid AS rowid, b.category, b.author, b.age, b.available,
+                  p.name AS publisher, s.name AS series
+           FROM books b
+           LEFT JOIN publishers p ON p.id = b.publisher_id
+           LEFT JOIN series s ON s.id = b.series_id'''
+    )
+    return FacetIndex(rows)
+
+
+def get_facet_index():
+    """Return the facet index, rebuilding it if the catalog data changed."""
+    global _index
+
+    versions = get_versions(VERSION_SCOPES)
+    key = (current_app.config['DATABASE_PATH'],) + tuple(versions.get(scope, 0) for scope in VERSION_SCOPES)
+
+    current = _index
+    if current is not None and current[0] == key:
+        return current[1]
+
+    with _index_lock:
+        if _index is None or _index[0] != key:
+            _index = (key, _build_index())
+        return _index[1]
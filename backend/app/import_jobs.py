@@ -0,0 +1,108 @@
+"""Spreadsheet imports run as background jobs.
+
+The upload request saves the file, records a row in `import_jobs` and
+returns its id straight away; a thread then streams the sheet through the
+importer chunk by chunk, writing progress back to the job row after each
+chunk so any worker can answer status requests.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from app.database import get_db, query_db
+from app.events import publish
+from app.excel import iter_book_rows
+from app.importer import import_numbered_books
+
+# Attempts at recording a failed job before giving up (e.g. database locked)
+FAIL_STATUS_ATTEMPTS = 5
+
+
+def create_job(db, filename, user_id):
+    """Record a queued import job and return its id."""
+    job_id = str(uuid.uuid4())
+    db.execute(
+        'INSERT INTO import_jobs (id, filename, created_by) VALUES (?, ?, ?)',
+        [job_id, filename, user_id]
+    )
+    db.commit()
+    return job_id
+
+
+def get_job(job_id):
+    """Return the job as a dict (errors decoded), or None."""
+    job = query_db('SELECT * FROM import_jobs WHERE id = ?', [job_id], one=True)
+    if job:
+        job['errors'] = json.loads(job['errors'])
+    return job
+
+
+def _update_job(db, job_id, **fields):
+    assignments = ', '.join(f'{column} = ?' for column in fields)
+    db.execute(f'UPDATE import_jobs SET {assignments} WHERE id = ?', [*fields.values(), job_id])
+    db.commit()
+
+
+def _mark_failed(app, db, job_id, message):
+    """Record the job as failed, retrying so it never stays 'running'."""
+    for attempt in range(FAIL_STATUS_ATTEMPTS):
+        try:
+            if db.in_transaction:
+                db.rollback()
+            db.execute(
+                "UPDATE import_jobs SET status = 'failed', error = ?, finished_at = CURRENT_TIMESTAMP WHERE id = ?",
+                [message, job_id]
+            )
+            db.commit()
+            return
+        except sqlite3.Error:
+            app.logger.warning('Could not mark import job %s failed (attempt %d)', job_id, attempt + 1)
+            time.sleep(0.1 * 2 ** attempt)
+    app.logger.error('Import job %s left unfinished: its failure could not be recorded', job_id)
+
+
+def _run_job(app, job_id, path):
+    with app.app_context():
+        db = get_db()
+        try:
+            db.execute(
+                "UPDATE import_jobs SET status = 'running', started_at = CURRENT_TIMESTAMP WHERE id = ?",
+                [job_id]
+            )
+            db.commit()
+
+            def on_progress(result, last_row_number):
+                _update_job(
+                    db, job_id,
+                    processed=last_row_number - 1,  # sheet rows below the header
+                    success=result['success'],
+                    failed=result['failed'],
+                    errors=json.dumps(result['errors'], ensure_ascii=False),
+                )
+
+            rows = iter_book_rows(path, on_size=lambda total: _update_job(db, job_id, total_rows=total))
+            result = import_numbered_books(db, rows, on_progress=on_progress)
+            db.execute(
+                "UPDATE import_jobs SET status = 'done', finished_at = CURRENT_TIMESTAMP WHERE id = ?",
+                [job_id]
+            )
+            if result['success']:
+                publish(db, 'book', action='imported', count=result['success'])
+            db.commit()
+        except Exception as e:
+            app.logger.exception('Import job %s failed', job_id)
+            _mark_failed(app, db, job_id, str(e))
+        finally:
+            os.remove(path)
+
+
+def start_job(app, job_id, path):
+    """Run the import of the .xlsx at `path` in a background thread; the file is removed afterwards."""
+    thread = threading.Thread(
+        target=_run_job, args=(app, job_id, path), name=f'import-{job_id}', daemon=True
+    )
+    thread.start()
+    return thread
@@ -0,0 +1,226 @@
+"""Set-based bulk book import.
+
+Rows are taken from any iterable in chunks of CHUNK_SIZE. For each chunk,
+every category, series and publisher name is resolved in memory (with one
+lookup query per table for names not seen before), the missing ones are
+created with executemany, and the books are inserted with executemany
+under a savepoint. If that batch insert fails, it is rolled back and the
+chunk is retried row by row, so a bad row costs itself and not the batch.
+Each chunk is committed on its own.
+"""
+import uuid
+
+CHUNK_SIZE = 500
+
+# Row error messages kept in a result; `failed` keeps counting past this so
+# a file full of bad rows does not grow memory with its size
+MAX_ERRORS = 1000
+
+# Palette for generated covers of books without an image
+COVER_COLORS = [
+    '#4A90E2', '#E74C3C', '#2ECC71', '#F39C12', '#9B59B6',
+    '#1ABC9C', '#E67E22', '#3498DB', '#E91E63', '#00BCD4',
+    '#8BC34A', '#FF5722',
+]
+
+BOOK_INSERT = '''INSERT INTO books (id, title, author, category, category_id, series_id, publisher_id,
+                 cover_color, cover_image_url, available, description, age, publication_year, isbn,
+                 inventory_number, supplier, new_book)
+                 VALUES (:id, :title, :author, :category, :category_id, :series_id, :publisher_id,
+                 :cover_color, :cover_image_url, :available, :description, :age, :publication_year, :isbn,
+                 :inventory_number, :supplier, :new_book)'''
+
+# SQLite's bound-parameter limit is far higher, but keep IN lists modest
+_LOOKUP_BATCH = 500
+
+
+def reference_lookup_query(table, count):
+    """The statement resolving `count` category/series/publisher names to ids."""
+    placeholders = ', '.join('?' for _ in range(count))
+    return f'SELECT id, name FROM {table} WHERE name IN ({placeholders})'
+
+
+def _text(value):
+    return str(value).strip() if value is not None else ''
+
+
+def prepare_book(book_data):
+    """Validate one input row and return the column values for its insert.
+
+    Raises ValueError for rows missing a required field.
+    """
+    if not isinstance(book_data, dict):
+        raise ValueError('row must be an object')
+
+    title = _text(book_data.get('title'))
+    author = _text(book_data.get('author'))
+    category = _text(book_data.get('category'))
+    if not title or not author or not category:
+        raise ValueError('title, author and category are required')
+
+    return {
+        'id': str(uuid.uuid4()),
+        'title': title,
+        'author': author,
+        'category': category,
+        'series': _text(book_data.get('series')),
+        'publisher': _text(book_data.get('publisher')),
+        'publisher_city': _text(book_data.get('publisher_city')),
+        'cover_color': book_data.get('cover_color', '#4A90E2'),
+        'cover_image_url': book_data.get('cover_image_url'),
+        'available': book_data.get('available', 1),
+        'description': book_data.get('description'),
+        'age': book_data.get('age'),
+        'publication_year': book_data.get('publication_year'),
+        'isbn': book_data.get('isbn'),
+        'inventory_number': book_data.get('inventory_number'),
+        'supplier': book_data.get('supplier'),
+        'new_book': book_data.get('new_book', 0),
+    }
+
+
+class ReferenceResolver:
+    """Maps category/series/publisher names to ids, creating missing rows in bulk."""
+
+    def __init__(self, db):
+        self.db = db
+        self.ids = {'categories': {}, 'series': {}, 'publishers': {}}
+
+    def _lookup(self, table, names):
+        known = self.ids[table]
+        names = [name for name in names if name not in known]
+        for start in range(0, len(names), _LOOKUP_BATCH):
+            batch = names[start:start + _LOOKUP_BATCH]
+            for row_id, name in self.db.execute(reference_lookup_query(table, len(batch)), batch):
+                known.setdefault(name, row_id)
+
+    def resolve(self, books):
+        """Fill category_id/series_id/publisher_id on prepared books."""
+        categories = {book['category'] for book in books if book['category']}
+        series = {book['series'] for book in books if book['series']}
+        publishers = {}
+        for book in books:
+            if book['publisher']:
+                publishers.setdefault(book['publisher'], book['publisher_city'])
+
+        for table, names in (('categories', categories), ('series', series), ('publishers', publishers)):
+            self._lookup(table, names)
+
+        new_categories = [(str(uuid.uuid4()), name) for name in sorted(categories - self.ids['categories'].keys())]
+        new_series = [(str(uuid.uuid4()), name) for name in sorted(series - self.ids['series'].keys())]
+        new_publishers = [
+            (str(uuid.uuid4()), name, city) for name, city in sorted(publishers.items())
+            if name not in self.ids['publishers']
+        ]
+        self.db.executemany('INSERT INTO categories (id, name) VALUES (?, ?)', new_categories)
+        self.db.executemany('INSERT INTO series (id, name) VALUES (?, ?)', new_series)
+        self.db.executemany('INSERT INTO publishers (id, name, city) VALUES (?, ?, ?)', new_publishers)
+        self.ids['categories'].update((name, row_id) for row_id, name in new_categories)
+        self.ids['series'].update((name, row_id) for row_id, name in new_series)
+        self.ids['publishers'].update((name, row_id) for row_id, name, _ in new_publishers)
+
+        for book in books:
+            book['category_id'] = self.ids['categories'].get(book['category'])
+            book['series_id'] = self.ids['series'].get(book['series'])
+            book['publisher_id'] = self.ids['publishers'].get(book['publisher'])
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _insert_chunk(db, books, record_error):
+    """Insert prepared (row_number, book) pairs; return how many went in.
+
+    Rows that fail on their own are passed to record_error(message).
+    """
+    db.execute('SAVEPOINT import_chunk')
+    try:
+        db.executemany(BOOK_INSERT, [book for _, book in books])
+        db.execute('RELEASE import_chunk')
+        return len(books)
+    except Exception:
+        db.execute('ROLLBACK TO import_chunk')
+        db.execute('RELEASE import_chunk')
+
+    inserted = 0
+    for row_number, book in books:
+        db.execute('SAVEPOINT import_row')
+        try:
+            db.execute(BOOK_INSERT, book)
+            db.execute('RELEASE import_row')
+            inserted += 1
+        except Exception as e:
+            db.execute('ROLLBACK TO import_row')
+            db.execute('RELEASE import_row')
+            record_error(f'Row {row_number}: {str(e)}')
+    return inserted
+
+
+def import_books(db, rows, chunk_size=CHUNK_SIZE, on_progress=None):
+    """Import book rows (dicts with book fields plus category/series/publisher names).
+
+    `rows` may be any iterable, including a generator streaming a file.
+    Returns {'success', 'failed', 'errors'} with 1-based row numbers in the
+    error messages; only the first MAX_ERRORS messages are kept. Commits
+    after every chunk.
+    """
+    return import_numbered_books(db, enumerate(rows, start=1), chunk_size, on_progress)
+
+
+def import_numbered_books(db, numbered_rows, chunk_size=CHUNK_SIZE, on_progress=None):
+    """Like import_books, but takes (row_number, row) pairs so errors can cite
+    the caller's numbering (e.g. spreadsheet rows).
+
+    `on_progress(result, last_row_number)` is called after each chunk commits.
+    """
+    if db.in_transaction:
+        db.commit()
+
+    resolver = ReferenceResolver(db)
+    success = 0
+    failed = 0
+    errors = []
+
+    def record_error(message):
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_ERRORS:
+            errors.append(message)
+
+    def result():
+        return {
+            'success': success,
+            'failed': failed,
+            'errors': errors,
+        }
+
+    for chunk in _chunks(numbered_rows, chunk_size):
+        books = []
+        for row_number, book_data in chunk:
+            try:
+                books.append((row_number, prepare_book(book_data)))
+            except ValueError as e:
+                record_error(f'Row {row_number}: {str(e)}')
+
+        if books:
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                resolver.resolve([book for _, book in books])
+                success += _insert_chunk(db, books, record_error)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+        if on_progress is not None:
+            on_progress(result(), chunk[-1][0])
+
+    return result()
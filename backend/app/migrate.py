@@ -0,0 +1,104 @@
+"""Versioned schema migrations.
+
+Migrations live in app/migrations as NNNN_description.sql or
+NNNN_description.py (the latter defining `upgrade(db)`). The number of the
+last applied migration is stored in `PRAGMA user_version`; each pending
+migration runs in its own IMMEDIATE transaction together with the version
+bump, so a failure leaves the database at the previous version.
+"""
+import importlib.util
+import os
+import re
+import sqlite3
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), 'migrations')
+
+_FILENAME_RE = re.compile(r'^(\d{4})_\w+\.(sql|py)$')
+
+
+class MigrationError(RuntimeError):
+    """Raised when a migration fails; the database stays at the prior version."""
+
+
+def discover_migrations(directory=MIGRATIONS_DIR):
+    """Return [(version, path)] for all migration files, sorted by version."""
+    migrations = []
+    for filename in os.listdir(directory):
+        match = _FILENAME_RE.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), os.path.join(directory, filename)))
+    migrations.sort()
+
+    versions = [version for version, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise MigrationError('Duplicate migration version numbers')
+    return migrations
+
+
+def get_schema_version(db):
+    """Return the version of the last migration applied to `db`."""
+    return db.execute('PRAGMA user_version').fetchone()[0]
+
+
+def split_sql(script):
+    """Split a SQL script into complete statements, keeping trigger bodies whole."""
+    statements = []
+    buffer = ''
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            statement = buffer.strip()
+            if statement.rstrip(';').strip():
+                statements.append(statement)
+            buffer = ''
+    if buffer.strip():
+        statements.append(buffer.strip())
+    return statements
+
+
+def _run_migration(db, path):
+    if path.endswith('.sql'):
+        with open(path, 'r', encoding='utf-8') as f:
+            for statement in split_sql(f.read()):
+                db.execute(statement)
+    else:
+        spec = importlib.util.spec_from_file_location(
+            f'app.migrations.m{os.path.basename(path)[:-3]}', path
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        module.upgrade(db)
+
+
+def migrate(db, directory=MIGRATIONS_DIR):
+    """Apply all pending migrations to `db`. Returns the versions applied.
+
+    When the stored version already matches the newest migration this is a
+    directory listing and one PRAGMA, so it is cheap to call on every start.
+    """
+    migrations = discover_migrations(directory)
+    current = get_schema_version(db)
+    if not migrations or current >= migrations[-1][0]:
+        return []
+
+    applied = []
+    for version, path in migrations:
+        if version <= current:
+            continue
+
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            # Another process may have applied it while we waited for the lock
+            if version <= get_schema_version(db):
+                db.rollback()
+                continue
+            _run_migration(db, path)
+            db.execute(f'PRAGMA user_version = {version:d}')
+            db.commit()
+        except Exception as e:
+            if db.in_transaction:
+                db.execute('ROLLBACK')
+            raise MigrationError(f'Migration {os.path.basename(path)} failed: {e}') from e
+
+        applied.append(version)
+    return applied
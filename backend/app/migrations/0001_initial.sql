@@ -1,3 +1,6 @@
+-- Baseline schema. Statements are idempotent so databases created before
+-- versioned migrations existed can be adopted at user_version 0.
+
 CREATE TABLE IF NOT EXISTS users (
     id TEXT PRIMARY KEY,
     email TEXT UNIQUE NOT NULL,
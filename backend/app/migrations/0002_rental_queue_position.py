@@ -0,0 +1,7 @@
+"""Add rental_requests.queue_position to databases created before queueing."""
+
+
+def upgrade(db):
+    columns = [row[1] for row in db.execute('PRAGMA table_info(rental_requests)')]
+    if 'queue_position' not in columns:
+        db.execute('ALTER TABLE rental_requests ADD COLUMN queue_position INTEGER DEFAULT NULL')
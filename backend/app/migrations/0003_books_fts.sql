@@ -0,0 +1,53 @@
+-- Full-text catalog search. Rows share rowids with `books`; apostrophe
+-- variants (', ’, ʼ) are stripped so "м'яч" and "мʼяч" index the same way,
+-- and unicode61 folds Cyrillic case.
+CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+    title, author, description, series, publisher,
+    tokenize = 'unicode61 remove_diacritics 0'
+);
+
+CREATE TRIGGER IF NOT EXISTS books_fts_insert AFTER INSERT ON books BEGIN
+    INSERT INTO books_fts (rowid, title, author, description, series, publisher)
+    SELECT new.rowid,
+           replace(replace(replace(new.title, '''', ''), '’', ''), 'ʼ', ''),
+           replace(replace(replace(new.author, '''', ''), '’', ''), 'ʼ', ''),
+           replace(replace(replace(new.description, '''', ''), '’', ''), 'ʼ', ''),
+           (SELECT replace(replace(replace(name, '''', ''), '’', ''), 'ʼ', '') FROM series WHERE id = new.series_id),
+           (SELECT replace(replace(replace(name, '''', ''), '’', ''), 'ʼ', '') FROM publishers WHERE id = new.publisher_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS books_fts_update
+AFTER UPDATE OF title, author, description, series_id, publisher_id ON books BEGIN
+    DELETE FROM books_fts WHERE rowid = old.rowid;
+    INSERT INTO books_fts (rowid, title, author, description, series, publisher)
+    SELECT new.rowid,
+           replace(replace(replace(new.title, '''', ''), '’', ''), 'ʼ', ''),
+           replace(replace(replace(new.author, '''', ''), '’', ''), 'ʼ', ''),
+           replace(replace(replace(new.description, '''', ''), '’', ''), 'ʼ', ''),
+           (SELECT replace(replace(replace(name, '''', ''), '’', ''), 'ʼ', '') FROM series WHERE id = new.series_id),
+           (SELECT replace(replace(replace(name, '''', ''), '’', ''), 'ʼ', '') FROM publishers WHERE id = new.publisher_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS books_fts_delete AFTER DELETE ON books BEGIN
+    DELETE FROM books_fts WHERE rowid = old.rowid;
+END;
+
+CREATE TRIGGER IF NOT EXISTS books_fts_series_update AFTER UPDATE OF name ON series BEGIN
+    UPDATE books_fts SET series = replace(replace(replace(new.name, '''', ''), '’', ''), 'ʼ', '')
+    WHERE rowid IN (SELECT rowid FROM books WHERE series_id = new.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS books_fts_series_delete AFTER DELETE ON series BEGIN
+    UPDATE books_fts SET series = NULL
+    WHERE rowid IN (SELECT rowid FROM books WHERE series_id = old.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS books_fts_publisher_update AFTER UPDATE OF name ON publishers BEGIN
+    UPDATE books_fts SET publisher = replace(replace(replace(new.name, '''', ''), '’', ''), 'ʼ', '')
+    WHERE rowid IN (SELECT rowid FROM books WHERE publisher_id = new.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS books_fts_publisher_delete AFTER DELETE ON publishers BEGIN
+    UPDATE books_fts SET publisher = NULL
+    WHERE rowid IN (SELECT rowid FROM books WHERE publisher_id = old.id);
+END;
@@ -0,0 +1,7 @@
+"""Index books that existed before books_fts and configure bm25 ranking."""
+from app.search import configure_books_fts_rank, rebuild_books_fts
+
+
+def upgrade(db):
+    rebuild_books_fts(db)
+    configure_books_fts_rank(db)
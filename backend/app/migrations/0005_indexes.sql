@@ -0,0 +1,23 @@
+-- Secondary indexes for the lookups and orderings used by app/routes.
+-- `python -m app.query_check` verifies the hot queries use them.
+
+CREATE INDEX IF NOT EXISTS idx_books_title ON books (title, id);
+CREATE INDEX IF NOT EXISTS idx_books_author ON books (author, id);
+CREATE INDEX IF NOT EXISTS idx_books_category ON books (category);
+CREATE INDEX IF NOT EXISTS idx_books_series ON books (series_id);
+CREATE INDEX IF NOT EXISTS idx_books_publisher ON books (publisher_id);
+
+CREATE INDEX IF NOT EXISTS idx_categories_name ON categories (name);
+CREATE INDEX IF NOT EXISTS idx_series_name ON series (name);
+CREATE INDEX IF NOT EXISTS idx_publishers_name ON publishers (name);
+
+CREATE INDEX IF NOT EXISTS idx_readers_name ON readers (parent_surname, parent_name);
+CREATE INDEX IF NOT EXISTS idx_children_reader ON children (reader_id, surname, name);
+
+CREATE INDEX IF NOT EXISTS idx_rental_requests_queue ON rental_requests (book_id, status, queue_position);
+CREATE INDEX IF NOT EXISTS idx_rental_requests_reader ON rental_requests (reader_id);
+CREATE INDEX IF NOT EXISTS idx_rental_requests_child ON rental_requests (child_id);
+CREATE INDEX IF NOT EXISTS idx_rental_requests_requested ON rental_requests (requested_at);
+CREATE INDEX IF NOT EXISTS idx_rental_requests_status ON rental_requests (status, requested_at);
+
+CREATE INDEX IF NOT EXISTS idx_book_media_book ON book_media (book_id, display_order);
@@ -0,0 +1,59 @@
+-- Per-scope data versions, bumped by triggers on every write. Conditional
+-- GET endpoints derive their ETags from these (see app/versions.py).
+CREATE TABLE IF NOT EXISTS data_versions (
+    scope TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO data_versions (scope) VALUES
+    ('books'), ('categories'), ('series'), ('publishers'), ('rentals');
+
+CREATE TRIGGER IF NOT EXISTS books_version_insert AFTER INSERT ON books BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE scope = 'books';
+END;
+CREATE TRIGGER IF NOT EXISTS books_version_update AFTER UPDATE ON books BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE scope = 'books';
+END;
+CREATE TRIGGER IF NOT EXISTS books_version_delete AFTER DELETE ON books BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE scope = 'books';
+END;
+
+CREATE TRIGGER IF NOT EXISTS categories_version_insert AFTER INSERT ON categories BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE scope = 'categories';
+END;
+CREATE TRIGGER IF NOT EXISTS categories_version_update AFTER UPDATE ON categories BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE scope = 'categories';
+END;
+CREATE TRIGGER IF NOT EXISTS categories_version_delete AFTER DELETE ON categories BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE scope = 'categories';
+END;
+
+CREATE TRIGGER IF NOT EXISTS series_version_insert AFTER INSERT ON series BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE scope = 'series';
+END;
+CREATE TRIGGER IF NOT EXISTS series_version_update AFTER UPDATE ON series BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE scope = 'series';
+END;
+CREATE TRIGGER IF NOT EXISTS series_version_delete AFTER DELETE ON series BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE scope = 'series';
+END;
+
+CREATE TRIGGER IF NOT EXISTS publishers_version_insert AFTER INSERT ON publishers BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE scope = 'publishers';
+END;
+CREATE TRIGGER IF NOT EXISTS publishers_version_update AFTER UPDATE ON publishers BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE scope = 'publishers';
+END;
+CREATE TRIGGER IF NOT EXISTS publishers_version_delete AFTER DELETE ON publishers BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE scope = 'publishers';
+END;
+
+CREATE TRIGGER IF NOT EXISTS rentals_version_insert AFTER INSERT ON rental_requests BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE scope = 'rentals';
+END;
+CREATE TRIGGER IF NOT EXISTS rentals_version_update AFTER UPDATE ON rental_requests BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE scope = 'rentals';
+END;
+CREATE TRIGGER IF NOT EXISTS rentals_version_delete AFTER DELETE ON rental_requests BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE scope = 'rentals';
+END;
@@ -0,0 +1,8 @@
+-- Normalised phone keys for reader auto-matching (see app/phones.py).
+CREATE TABLE IF NOT EXISTS reader_phones (
+    phone_key TEXT NOT NULL,
+    reader_id TEXT NOT NULL REFERENCES readers(id) ON DELETE CASCADE,
+    PRIMARY KEY (phone_key, reader_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_reader_phones_reader ON reader_phones (reader_id);
@@ -0,0 +1,7 @@
+"""Compute phone keys for readers created before reader_phones existed."""
+from app.phones import sync_reader_phones
+
+
+def upgrade(db):
+    for reader_id, phone1, phone2 in db.execute('SELECT id, phone1, phone2 FROM readers').fetchall():
+        sync_reader_phones(db, reader_id, [phone1, phone2])
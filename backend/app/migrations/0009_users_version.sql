@@ -0,0 +1,13 @@
+-- Version scope for users, so processes can tell when their cached
+-- authenticated-user rows (see app/auth.py) may be stale.
+INSERT OR IGNORE INTO data_versions (scope) VALUES ('users');
+
+CREATE TRIGGER IF NOT EXISTS users_version_insert AFTER INSERT ON users BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE scope = 'users';
+END;
+CREATE TRIGGER IF NOT EXISTS users_version_update AFTER UPDATE ON users BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE scope = 'users';
+END;
+CREATE TRIGGER IF NOT EXISTS users_version_delete AFTER DELETE ON users BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE scope = 'users';
+END;
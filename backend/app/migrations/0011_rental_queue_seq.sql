@@ -0,0 +1,7 @@
+-- Queued reservations are ordered by an immutable enqueue sequence instead
+-- of a stored position that had to be renumbered whenever someone left the
+-- queue; app/routes/rentals.py numbers positions at read time. Stored
+-- positions are already increasing per book, so they carry over as
+-- sequence values (the rename also updates idx_rental_requests_queue).
+
+ALTER TABLE rental_requests RENAME COLUMN queue_position TO queue_seq;
@@ -0,0 +1,10 @@
+-- Change log behind the /api/events stream (see app/events.py). Writers
+-- append in their own transaction; every worker process tails the table.
+-- AUTOINCREMENT keeps ids increasing after old rows are pruned, so they
+-- can serve as SSE event ids.
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type TEXT NOT NULL,
+    data TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
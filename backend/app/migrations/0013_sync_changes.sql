@@ -0,0 +1,59 @@
+-- Change sequence for delta sync (GET /api/sync, app/routes/sync.py).
+-- Every insert, update or delete of a synced row replaces that row's entry
+-- here, taking a new AUTOINCREMENT seq, so seq only grows and each row has
+-- at most one entry: its latest change. Deletes leave a tombstone
+-- (deleted = 1) instead of disappearing.
+CREATE TABLE IF NOT EXISTS sync_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    entity TEXT NOT NULL,
+    row_id TEXT NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    changed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (entity, row_id)
+);
+
+CREATE TRIGGER IF NOT EXISTS books_sync_insert AFTER INSERT ON books BEGIN
+    INSERT OR REPLACE INTO sync_changes (entity, row_id) VALUES ('books', NEW.id);
+END;
+CREATE TRIGGER IF NOT EXISTS books_sync_update AFTER UPDATE ON books BEGIN
+    INSERT OR REPLACE INTO sync_changes (entity, row_id) VALUES ('books', NEW.id);
+END;
+CREATE TRIGGER IF NOT EXISTS books_sync_delete AFTER DELETE ON books BEGIN
+    INSERT OR REPLACE INTO sync_changes (entity, row_id, deleted) VALUES ('books', OLD.id, 1);
+END;
+
+CREATE TRIGGER IF NOT EXISTS readers_sync_insert AFTER INSERT ON readers BEGIN
+    INSERT OR REPLACE INTO sync_changes (entity, row_id) VALUES ('readers', NEW.id);
+END;
+CREATE TRIGGER IF NOT EXISTS readers_sync_update AFTER UPDATE ON readers BEGIN
+    INSERT OR REPLACE INTO sync_changes (entity, row_id) VALUES ('readers', NEW.id);
+END;
+CREATE TRIGGER IF NOT EXISTS readers_sync_delete AFTER DELETE ON readers BEGIN
+    INSERT OR REPLACE INTO sync_changes (entity, row_id, deleted) VALUES ('readers', OLD.id, 1);
+END;
+
+CREATE TRIGGER IF NOT EXISTS children_sync_insert AFTER INSERT ON children BEGIN
+    INSERT OR REPLACE INTO sync_changes (entity, row_id) VALUES ('children', NEW.id);
+END;
+CREATE TRIGGER IF NOT EXISTS children_sync_update AFTER UPDATE ON children BEGIN
+    INSERT OR REPLACE INTO sync_changes (entity, row_id) VALUES ('children', NEW.id);
+END;
+CREATE TRIGGER IF NOT EXISTS children_sync_delete AFTER DELETE ON children BEGIN
+    INSERT OR REPLACE INTO sync_changes (entity, row_id, deleted) VALUES ('children', OLD.id, 1);
+END;
+
+CREATE TRIGGER IF NOT EXISTS rental_requests_sync_insert AFTER INSERT ON rental_requests BEGIN
+    INSERT OR REPLACE INTO sync_changes (entity, row_id) VALUES ('rental_requests', NEW.id);
+END;
+CREATE TRIGGER IF NOT EXISTS rental_requests_sync_update AFTER UPDATE ON rental_requests BEGIN
+    INSERT OR REPLACE INTO sync_changes (entity, row_id) VALUES ('rental_requests', NEW.id);
+END;
+CREATE TRIGGER IF NOT EXISTS rental_requests_sync_delete AFTER DELETE ON rental_requests BEGIN
+    INSERT OR REPLACE INTO sync_changes (entity, row_id, deleted) VALUES ('rental_requests', OLD.id, 1);
+END;
+
+-- Existing rows, oldest first
+INSERT OR IGNORE INTO sync_changes (entity, row_id) SELECT 'books', id FROM books ORDER BY created_at, id;
+INSERT OR IGNORE INTO sync_changes (entity, row_id) SELECT 'readers', id FROM readers ORDER BY created_at, id;
+INSERT OR IGNORE INTO sync_changes (entity, row_id) SELECT 'children', id FROM children ORDER BY created_at, id;
+INSERT OR IGNORE INTO sync_changes (entity, row_id) SELECT 'rental_requests', id FROM rental_requests ORDER BY requested_at, id;
@@ -0,0 +1,23 @@
+-- Indexes for the keyset-paginated rental journal (GET /api/rentals,
+-- ordered by requested_at DESC, id DESC) under each equality filter.
+-- Ending each index with (requested_at, id) lets a page be read straight
+-- off the index with no sort.
+
+-- Keyset comparisons skip NULLs, so give the few old rows without a
+-- request date the closest date they have
+UPDATE rental_requests SET requested_at = COALESCE(approved_at, return_date, CURRENT_TIMESTAMP)
+WHERE requested_at IS NULL;
+
+DROP INDEX IF EXISTS idx_rental_requests_requested;
+CREATE INDEX IF NOT EXISTS idx_rental_requests_requested ON rental_requests (requested_at, id);
+
+DROP INDEX IF EXISTS idx_rental_requests_status;
+CREATE INDEX IF NOT EXISTS idx_rental_requests_status ON rental_requests (status, requested_at, id);
+
+DROP INDEX IF EXISTS idx_rental_requests_reader;
+CREATE INDEX IF NOT EXISTS idx_rental_requests_reader ON rental_requests (reader_id, requested_at, id);
+
+DROP INDEX IF EXISTS idx_rental_requests_child;
+CREATE INDEX IF NOT EXISTS idx_rental_requests_child ON rental_requests (child_id, requested_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_rental_requests_book ON rental_requests (book_id, requested_at, id);
@@ -0,0 +1,25 @@
+-- Stored due date of each loan (GET /api/rentals/overdue). It is the
+-- approval date plus rental_duration weeks, kept up to date by triggers so
+-- every writer (approvals, admin-created loans, the seed script) sets it.
+ALTER TABLE rental_requests ADD COLUMN due_date TEXT;
+
+UPDATE rental_requests
+SET due_date = date(approved_at, '+' || (rental_duration * 7) || ' days')
+WHERE approved_at IS NOT NULL;
+
+CREATE TRIGGER IF NOT EXISTS rental_requests_due_date_insert
+AFTER INSERT ON rental_requests WHEN NEW.approved_at IS NOT NULL BEGIN
+    UPDATE rental_requests
+    SET due_date = date(NEW.approved_at, '+' || (NEW.rental_duration * 7) || ' days')
+    WHERE id = NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS rental_requests_due_date_update
+AFTER UPDATE OF approved_at, rental_duration ON rental_requests BEGIN
+    UPDATE rental_requests
+    SET due_date = date(NEW.approved_at, '+' || (NEW.rental_duration * 7) || ' days')
+    WHERE id = NEW.id;
+END;
+
+-- Overdue and due-soon lookups are a range scan on due_date within the
+-- approved loans, already in due order
+CREATE INDEX IF NOT EXISTS idx_rental_requests_due ON rental_requests (status, due_date, id);
@@ -0,0 +1,13 @@
+-- Version scope for children, whose names the rental journal pages carry
+-- (GET /api/rentals joins them in), so its ETag changes when one is edited.
+INSERT OR IGNORE INTO data_versions (scope) VALUES ('children');
+
+CREATE TRIGGER IF NOT EXISTS children_version_insert AFTER INSERT ON children BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE scope = 'children';
+END;
+CREATE TRIGGER IF NOT EXISTS children_version_update AFTER UPDATE ON children BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE scope = 'children';
+END;
+CREATE TRIGGER IF NOT EXISTS children_version_delete AFTER DELETE ON children BEGIN
+    UPDATE data_versions SET version = version + 1 WHERE scope = 'children';
+END;
@@ -0,0 +1,12 @@
+-- Indexes that let catalog pages (GET /api/books, app/routes/books.py) be
+-- read in order straight off an index, checked by app/query_check.py:
+-- the category and author facets in the default title order, and every
+-- ?sort= of the unfiltered catalog. The sort expressions match BOOK_SORTS exactly.
+DROP INDEX IF EXISTS idx_books_category;
+CREATE INDEX IF NOT EXISTS idx_books_category ON books (category, title, id);
+
+CREATE INDEX IF NOT EXISTS idx_books_author_title ON books (author, title, id);
+
+CREATE INDEX IF NOT EXISTS idx_books_newest ON books (COALESCE(created_at, ''), id);
+CREATE INDEX IF NOT EXISTS idx_books_year ON books (COALESCE(publication_year, ''), id);
+CREATE INDEX IF NOT EXISTS idx_books_inventory ON books (COALESCE(inventory_number, 0), id);
@@ -0,0 +1,8 @@
+-- Indexes that let readers pages (GET /api/readers, app/routes/readers.py)
+-- be read in order straight off an index for every ?sort=, checked by
+-- app/query_check.py. The columns match READER_SORTS exactly.
+DROP INDEX IF EXISTS idx_readers_name;
+CREATE INDEX IF NOT EXISTS idx_readers_name ON readers (parent_surname, parent_name, id);
+
+CREATE INDEX IF NOT EXISTS idx_readers_first_name ON readers (parent_name, parent_surname, id);
+CREATE INDEX IF NOT EXISTS idx_readers_newest ON readers (COALESCE(created_at, ''), id);
@@ -0,0 +1,93 @@
+import base64
+import json
+
+from app.database import query_db
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor that cannot be decoded."""
+
+
+def encode_cursor(values):
+    """Encode the keyset values of the last row on a page as an opaque string."""
+    raw = json.dumps(values, ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, length):
+    """Decode a cursor produced by encode_cursor into a list of `length` values."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (ValueError, UnicodeError):
+        raise InvalidCursor('Invalid cursor')
+    if not isinstance(values, list) or len(values) != length:
+        raise InvalidCursor('Invalid cursor')
+    return values
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Parse a ?limit= query value, clamped to [1, maximum]."""
+    if value in (None, ''):
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, maximum))
+
+
+def keyset_clause(columns, values, descending=False):
+    """Build a row-value comparison that selects rows strictly after `values`.
+
+    `columns` are the SQL expressions of the ORDER BY, ending with a unique
+    tie-breaker (usually the primary key), all sorted in the same direction.
+    """
+    op = '<' if descending else '>'
+    placeholders = ', '.join('?' for _ in columns)
+    return f'({", ".join(columns)}) {op} ({placeholders})', list(values)
+
+
+def keyset_query(columns, from_clause, args, order_columns, limit, values=None, descending=False):
+    """Build the SQL and params for one keyset page of at most `limit` rows.
+
+    `values` are the decoded keyset values of the previous page's last row,
+    or None for the first page. See paginate for the other arguments.
+    """
+    key_columns = ', '.join(f'{col} AS _k{i}' for i, col in enumerate(order_columns))
+    query = f'SELECT {columns}, {key_columns} FROM {from_clause}'
+    args = list(args)
+
+    if values is not None:
+        clause, clause_args = keyset_clause(order_columns, values, descending)
+        query += f' AND {clause}'
+        args.extend(clause_args)
+
+    direction = 'DESC' if descending else 'ASC'
+    query += ' ORDER BY ' + ', '.join(f'{col} {direction}' for col in order_columns)
+    query += ' LIMIT ?'
+    args.append(limit)
+    return query, args
+
+
+def paginate(columns, from_clause, args, order_columns, limit, cursor=None, descending=False):
+    """Run a keyset-paginated query and return (rows, next_cursor).
+
+    Builds `SELECT {columns} FROM {from_clause}`; `from_clause` must end with
+    a WHERE clause so the keyset condition can be appended with AND.
+    `order_columns` are the ORDER BY expressions, ending with a unique
+    tie-breaker such as the primary key.
+    """
+    values = decode_cursor(cursor, len(order_columns)) if cursor else None
+    query, args = keyset_query(columns, from_clause, args, order_columns, limit + 1, values, descending)
+    rows = query_db(query, args)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    keys = [[row.pop(f'_k{i}') for i in range(len(order_columns))] for row in rows]
+    next_cursor = encode_cursor(keys[-1]) if has_more else None
+
+    return rows, next_cursor
@@ -0,0 +1,104 @@
+"""Bounded bcrypt execution.
+
+bcrypt is deliberately slow, so a burst of logins can occupy every request
+thread. All hashing goes through a PasswordHasher, which runs at most
+BCRYPT_MAX_CONCURRENCY hashes at once, lets up to BCRYPT_MAX_QUEUE more
+wait, and rejects anything beyond that with PasswordHasherBusy (served as
+a 503) after BCRYPT_QUEUE_TIMEOUT seconds.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from flask import current_app
+
+# Never go below the bcrypt default's neighbourhood, whatever the host speed
+MIN_ROUNDS = 10
+MAX_ROUNDS = 14
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full."""
+
+    retry_after = 1
+
+
+def hash_rounds(hashed):
+    """Return the cost factor encoded in a bcrypt hash, or None if unparseable."""
+    try:
+        return int(hashed.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def calibrate_rounds(target_ms, min_rounds=MIN_ROUNDS, max_rounds=MAX_ROUNDS):
+    """Pick the highest cost whose hash time on this host stays within target_ms.
+
+    Times a cheap cost-6 hash and extrapolates (each round doubles the
+    work), which keeps calibration to a few milliseconds.
+    """
+    sample_rounds = 6
+    salt = bcrypt.gensalt(sample_rounds)
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        bcrypt.hashpw(b'calibration', salt)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    rounds = min_rounds
+    while rounds < max_rounds and best * 1000 * 2 ** (rounds + 1 - sample_rounds) <= target_ms:
+        rounds += 1
+    return rounds
+
+
+class PasswordHasher:
+    def __init__(self, rounds, max_concurrency, max_queue, queue_timeout):
+        self.rounds = rounds
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(max_concurrency + max_queue)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise PasswordHasherBusy('Too many password operations in progress, try again shortly')
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        salt = bcrypt.gensalt(self.rounds)
+        return self._run(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+    def check(self, password, hashed):
+        return self._run(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+    def needs_rehash(self, hashed):
+        """True if `hashed` was made with a lower cost than the current one.
+
+        Workers that calibrated to different costs would otherwise keep
+        rehashing each other's hashes, so a higher cost is left alone.
+        """
+        rounds = hash_rounds(hashed)
+        return rounds is None or rounds < self.rounds
+
+
+def init_password_hasher(app):
+    """Create the app's PasswordHasher.
+
+    Without BCRYPT_ROUNDS the cost is calibrated here, at startup, so no
+    request pays for it (calibration takes a few milliseconds).
+    """
+    rounds = app.config['BCRYPT_ROUNDS'] or calibrate_rounds(app.config['BCRYPT_TARGET_MS'])
+    app.extensions['password_hasher'] = PasswordHasher(
+        rounds,
+        app.config['BCRYPT_MAX_CONCURRENCY'],
+        app.config['BCRYPT_MAX_QUEUE'],
+        app.config['BCRYPT_QUEUE_TIMEOUT'],
+    )
+
+
+def get_password_hasher():
+    return current_app.extensions['password_hasher']
@@ -0,0 +1,74 @@
+"""Phone number normalisation and the indexed reader phone lookup.
+
+Readers' phones are free text ("+359 88 420 6203", "0884206203", "=359884206203"
+from spreadsheets). `phone_key` reduces a number to its last nine digits —
+the national significant number for both Ukrainian and Bulgarian numbers —
+so every spelling of the same number shares a key. Keys live in the
+reader_phones table, which is indexed by key.
+"""
+import re
+
+# Digits that identify a subscriber regardless of country code or trunk prefix
+PHONE_KEY_DIGITS = 9
+
+# Shorter digit strings are treated as typos or placeholders, not phones
+MIN_PHONE_DIGITS = 6
+
+READER_BY_PHONE_KEY = 'SELECT reader_id FROM reader_phones WHERE phone_key = ? LIMIT 1'
+DELETE_READER_PHONES = 'DELETE FROM reader_phones WHERE reader_id = ?'
+
+
+def clean_phone(val):
+    """Tidy a phone cell from the readers spreadsheet for display.
+
+    Handles formula strings like =359884206203 or ="...", numbers stored as
+    floats and stray whitespace; long numbers get a leading +.
+    """
+    if val is None:
+        return ''
+    s = str(val).strip()
+    # Remove formula markers
+    s = s.replace('=', '').replace('"', '').replace("'", '')
+    # Remove non-breaking spaces, special chars
+    s = re.sub(r'[\s\u00a0\u202c]+', '', s)
+    if not s or s == 'None' or s == '0':
+        return ''
+    # If it's a pure number, format it
+    try:
+        n = int(float(s))
+        s = str(n)
+    except (ValueError, OverflowError):
+        pass
+    # Add + prefix if it looks like an international number without one
+    if len(s) >= 10 and s[0].isdigit():
+        s = '+' + s
+    return s
+
+
+def phone_key(phone):
+    """Return the lookup key for a phone number, or None if it has too few digits."""
+    if not phone:
+        return None
+    digits = re.sub(r'\D', '', str(phone)).lstrip('0')
+    if len(digits) < MIN_PHONE_DIGITS:
+        return None
+    return digits[-PHONE_KEY_DIGITS:]
+
+
+def sync_reader_phones(db, reader_id, phones):
+    """Replace the phone keys stored for a reader. Runs in the caller's transaction."""
+    db.execute(DELETE_READER_PHONES, [reader_id])
+    keys = {key for key in (phone_key(p) for p in phones) if key}
+    db.executemany(
+        'INSERT OR IGNORE INTO reader_phones (phone_key, reader_id) VALUES (?, ?)',
+        [(key, reader_id) for key in keys]
+    )
+
+
+def find_reader_by_phone(db, phone):
+    """Return the id of a reader with this phone number in any spelling, or None."""
+    key = phone_key(phone)
+    if key is None:
+        return None
+    row = db.execute(READER_BY_PHONE_KEY, [key]).fetchone()
+    return row[0] if row else None
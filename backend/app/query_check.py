@@ -0,0 +1,246 @@
+"""Check that the hot queries in app/routes are served by indexes.
+
+Runs EXPLAIN QUERY PLAN for each query in HOT_QUERIES against a freshly
+migrated database and reports any full table scan, and any sort in a
+temporary B-tree, that the entry does not explicitly accept. Every entry
+is built from the SQL constants and filter builders the routes themselves
+use, so the statements checked are exactly the ones the routes run. A new
+hot lookup belongs in a module constant and an entry here.
+
+Usage:
+    python -m app.query_check
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+
+from app.config import Config
+from app.database import connect
+from app.migrate import migrate
+from app.pagination import keyset_query
+from app.importer import reference_lookup_query
+from app.phones import DELETE_READER_PHONES, READER_BY_PHONE_KEY
+from app.routes.auth import USER_BY_EMAIL_QUERY
+from app.routes.books import (
+    ACTIVE_RENTAL_QUERY, AVAILABILITY_COLUMNS, AVAILABILITY_JOIN, BOOK_COLUMNS, BOOK_FROM,
+    BOOK_MEDIA_QUERY, BOOK_SORTS, _book_filters, _works_from,
+)
+from app.routes.categories import CATEGORIES_QUERY
+from app.routes.publishers import PUBLISHERS_QUERY
+from app.routes.readers import (
+    CHILDREN_QUERY, DETACH_CHILD_RENTALS, DETACH_READER_RENTALS, READER_COLUMNS, READER_SORTS,
+    _reader_filters,
+)
+from app.routes.rentals import (
+    JOURNAL_COLUMNS, JOURNAL_FROM, JOURNAL_ORDER, NEXT_IN_QUEUE_QUERY, OVERDUE_COUNTS_QUERY,
+    OVERDUE_QUERY, QUEUE_QUERY, QUEUE_TAIL_QUERY, RENTALS_WITH_POSITION, _journal_filters,
+)
+from app.routes.series import SERIES_QUERY
+from app.routes.sync import CHANGES_QUERY
+from app.routes.upload import NEXT_MEDIA_ORDER_QUERY
+
+PAGE_SIZE = 51  # a page of 50 plus the look-ahead row
+
+# Plan steps an entry may accept, each for a stated reason
+FULL_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+
+
+def _catalog_queries():
+    """The catalog listing, page, grouped page and count for each filter and sort."""
+    queries = []
+    for filters in ({}, {'category': 'x'}, {'author': 'x'}, {'publisher': 'x'}, {'series': 'x'},
+                    {'available': '1'}, {'age': 'x'}, {'search': 'x'}):
+        from_clause, where, params = _book_filters(filters)
+        label = ', '.join(filters) or 'unfiltered'
+        searching = 'search' in filters
+
+        for sort, sort_expr in BOOK_SORTS.items():
+            if sort == 'relevance' and not searching:
+                continue
+            # Search matches, one facet value in an order other than the
+            # default, and publisher/series facets (matched by name through
+            # the join; names are not unique) are sorted. Their size is
+            # bounded by the match or facet, not the catalog.
+            indexed_order = not searching and not set(filters) & {'publisher', 'series'} and (
+                sort == 'title' or set(filters) <= {'available', 'age'} or set(filters) == {sort}
+            )
+            sorted_selection = () if indexed_order else (FULL_SORT,)
+            for values in (None, ['', '']):
+                sql, args = keyset_query(
+                    BOOK_COLUMNS, f'{from_clause} WHERE {where}', params,
+                    [sort_expr, 'b.id'], PAGE_SIZE, values,
+                )
+                page = 'page after cursor' if values else 'page'
+                queries.append((f'catalog {page} ({label}, by {sort})', sql, args, sorted_selection))
+
+        sql = f'SELECT {BOOK_COLUMNS} FROM {from_clause} WHERE {where} ORDER BY b.title ASC, b.id ASC'
+        by_name = searching or set(filters) & {'publisher', 'series'}
+        queries.append((f'catalog full list ({label})', sql, params, (FULL_SORT,) if by_name else ()))
+
+        # Counting every book (or every book of an unindexed facet) reads them all
+        counts_all = ('SCAN b',) if not filters or set(filters) & {'available', 'age'} else ()
+        queries.append((
+            f'catalog count ({label})',
+            f'SELECT COUNT(*) AS total FROM {from_clause} WHERE {where}', params, counts_all,
+        ))
+
+        # Works are windowed over the whole selection before paging
+        sql, args = keyset_query(
+            'g.*', _works_from(from_clause, where, BOOK_SORTS['title']), params,
+            ['g.sort_value', 'g.id'], PAGE_SIZE,
+        )
+        queries.append((f'grouped catalog page ({label})', sql, args, (FULL_SORT,)))
+
+    queries.append((
+        'availability summary',
+        f'SELECT {AVAILABILITY_COLUMNS} FROM {BOOK_FROM}{AVAILABILITY_JOIN} WHERE b.id IN (?, ?) GROUP BY b.id',
+        ['', ''], (),
+    ))
+    return queries
+
+
+def _rental_queries():
+    """The rental journal page and count for each filter, and single-rental reads."""
+    queries = []
+    for filters in ({}, {'status': 'x'}, {'reader_id': 'x'}, {'book_id': 'x'}, {'child_id': 'x'},
+                    {'from': '2025-01-01', 'to': '2025-12-31'}, {'renter': 'x'}):
+        where, params = _journal_filters(filters)
+        label = ', '.join(filters) or 'unfiltered'
+        for values in (None, ['', '']):
+            sql, args = keyset_query(
+                JOURNAL_COLUMNS, f'{JOURNAL_FROM} WHERE {where}', params,
+                JOURNAL_ORDER, PAGE_SIZE, values, descending=True,
+            )
+            page = 'page after cursor' if values else 'page'
+            queries.append((f'rentals journal {page} ({label})', sql, args, ()))
+
+        # A renter substring cannot use an index; the count reads every rental
+        counts_all = ('SCAN r',) if 'renter' in filters else ()
+        queries.append((
+            f'rentals journal count ({label})',
+            f'SELECT COUNT(*) AS total FROM rental_requests r WHERE {where}', params, counts_all,
+        ))
+
+    queries += [
+        ('rental by id',
+         f'{RENTALS_WITH_POSITION} WHERE r.id = ?', [''], ()),
+        ('newest pending rentals (bootstrap)',
+         f"{RENTALS_WITH_POSITION} WHERE r.status = 'pending' ORDER BY r.requested_at DESC LIMIT ?", [50], ()),
+        ('queued rentals (bootstrap)',
+         f"{RENTALS_WITH_POSITION} WHERE r.status = 'queued' ORDER BY r.book_id, r.queue_seq LIMIT ?", [50],
+         # Queues are short and few; ordering every queue by book is a small sort
+         (FULL_SORT,)),
+        ('overdue and due-soon loans', OVERDUE_QUERY, ['+3 days'], ()),
+        ('overdue counts', OVERDUE_COUNTS_QUERY, ['+3 days'], ()),
+    ]
+    return queries
+
+
+def _reader_queries():
+    """The readers listing, page and count, with and without a search."""
+    queries = []
+    for filters in ({}, {'search': 'x'}):
+        where, params = _reader_filters(filters)
+        label = 'search' if filters else 'unfiltered'
+        for sort, order_columns in READER_SORTS.items():
+            for values in (None, [''] * len(order_columns)):
+                sql, args = keyset_query(
+                    READER_COLUMNS, f'readers r WHERE {where}', params,
+                    order_columns, PAGE_SIZE, values,
+                )
+                page = 'page after cursor' if values else 'page'
+                # "SCAN c" walks the co-routine over one reader's children
+                # (READER_COLUMNS), which only looks like a table scan when
+                # the search also names `children c`
+                queries.append((f'readers {page} ({label}, by {sort})', sql, args, ('SCAN c',)))
+            order_by = ', '.join(f'{col} ASC' for col in order_columns)
+            queries.append((
+                f'readers full list ({label}, by {sort})',
+                f'SELECT {READER_COLUMNS} FROM readers r WHERE {where} ORDER BY {order_by}', params,
+                ('SCAN c',),
+            ))
+        # A search is a substring match; counting reads every reader either way
+        queries.append((
+            f'readers count ({label})',
+            f'SELECT COUNT(*) AS total FROM readers r WHERE {where}', params, ('SCAN r',),
+        ))
+    return queries
+
+
+# (description, sql, params[, accepted plan steps]) — parameter values only
+# need the right type
+HOT_QUERIES = _catalog_queries() + _rental_queries() + _reader_queries() + [
+    ('category names (import)', reference_lookup_query('categories', 2), ['', '']),
+    ('series names (import)', reference_lookup_query('series', 2), ['', '']),
+    ('publisher names (import)', reference_lookup_query('publishers', 2), ['', '']),
+    ('categories list', CATEGORIES_QUERY, []),
+    ('series list', SERIES_QUERY, []),
+    ('publishers list', PUBLISHERS_QUERY, []),
+    ('reader by id', f'SELECT {READER_COLUMNS} FROM readers r WHERE r.id = ?', ['']),
+    ('reader by phone key', READER_BY_PHONE_KEY, ['']),
+    ('phone keys of reader', DELETE_READER_PHONES, ['']),
+    ('children of reader', CHILDREN_QUERY, ['']),
+    ('rentals of reader', DETACH_READER_RENTALS, ['']),
+    ('rentals of child', DETACH_CHILD_RENTALS, ['']),
+    ('book media', BOOK_MEDIA_QUERY, ['']),
+    ('next media order', NEXT_MEDIA_ORDER_QUERY, ['']),
+    ('active rentals of book', ACTIVE_RENTAL_QUERY, ['']),
+    ('next in queue', NEXT_IN_QUEUE_QUERY, ['']),
+    ('queue of book', QUEUE_QUERY, ['']),
+    ('queue tail', QUEUE_TAIL_QUERY, ['']),
+    ('changes since', CHANGES_QUERY, [0, 1]),
+    ('user by email', USER_BY_EMAIL_QUERY, ['']),
+]
+
+
+def find_table_scans(db, queries=HOT_QUERIES):
+    """Return [(description, plan_detail)] for every full scan of a real table
+    and every temporary sort that the query does not accept."""
+    tables = {
+        row[0] for row in db.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND sql NOT LIKE 'CREATE VIRTUAL%'"
+        )
+    }
+    problems = []
+    for description, sql, params, *accepted in queries:
+        accepted = accepted[0] if accepted else ()
+        for row in db.execute(f'EXPLAIN QUERY PLAN {sql}', params):
+            detail = row[3]
+            if detail in accepted:
+                continue
+            if detail == FULL_SORT:
+                problems.append((description, detail))
+                continue
+            if not detail.startswith('SCAN ') or ' USING ' in detail:
+                continue
+            target = detail.split()[1]
+            aliases = {target}
+            # "SCAN b" refers to an aliased table; resolve it via the query text
+            for table in tables:
+                if f'{table} {target}' in sql:
+                    aliases.add(table)
+            if aliases & tables:
+                problems.append((description, detail))
+    return problems
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        # connect() registers the SQL functions the routes use (casefold)
+        db = connect(os.path.join(tmp, 'plan.db'), vars(Config))
+        migrate(db)
+        problems = find_table_scans(db)
+        db.close()
+
+    for description, detail in problems:
+        print(f'{description}: {detail}')
+    if problems:
+        print(f'{len(problems)} hot queries do not use an index.')
+        return 1
+    print(f'All {len(HOT_QUERIES)} hot queries use an index.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
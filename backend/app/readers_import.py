@@ -0,0 +1,219 @@
+"""Load readers and children from the "ЧИТАЧІ" sheet and link rentals to them.
+
+Journal entries only carry the free-text `renter_name` ("Олена Петренко
+(Марко)", "олена петренко 2"), so each distinct name is linked to the
+parent whose full name is its longest word-wise prefix. Parent names are
+kept in a trie of normalised words, making each lookup proportional to
+the renter name's length rather than to the number of parents. A prefix
+shared by several parents with the same name is reported as ambiguous
+and left unlinked.
+"""
+import uuid
+
+from app.phones import clean_phone, phone_key
+from app.search import tokenize
+
+READERS_SHEET = 'ЧИТАЧІ'
+
+MISSING = 'не вказано'
+DEFAULT_BIRTH_DATE = '2000-01-01'
+
+
+def _text(value):
+    if value is None:
+        return ''
+    text = str(value).strip()
+    return '' if text == 'None' else text
+
+
+def parse_readers_sheet(path):
+    """Return (parents, children) from the readers sheet.
+
+    parents: {sheet parent id: {full_name, phone1, phone2, address, comment}}
+    children: [{parent_id, name, birthday}]
+    """
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = list(workbook[READERS_SHEET].iter_rows(min_row=2, values_only=True))
+    finally:
+        workbook.close()
+    return parse_reader_rows(rows)
+
+
+def parse_reader_rows(rows):
+    """Parse readers-sheet rows (tuples of cell values); see parse_readers_sheet."""
+    parents = {}
+    children = []
+    for row in rows:
+        row = tuple(row) + (None,) * (13 - len(row))
+        full_name, id_parent, phone_ukr, phone_bg, district, comment = row[:6]
+
+        if full_name is not None and id_parent is not None:
+            p1 = clean_phone(phone_ukr)
+            p2 = clean_phone(phone_bg)
+            # Use whichever phone is available as phone1
+            if not p1 and p2:
+                p1, p2 = p2, ''
+
+            parents[int(id_parent)] = {
+                'full_name': str(full_name).strip(),
+                'phone1': p1 or MISSING,
+                'phone2': p2 or None,
+                'address': _text(district) or MISSING,
+                'comment': _text(comment) or None,
+            }
+
+        parent_id, kid_name, kid_birthday = row[9], row[10], row[11]
+        if kid_name is not None and parent_id is not None:
+            birthday = ''
+            if kid_birthday:
+                try:
+                    birthday = kid_birthday.strftime('%Y-%m-%d')
+                except AttributeError:
+                    birthday = str(kid_birthday)
+            children.append({
+                'parent_id': int(parent_id),
+                'name': str(kid_name).strip(),
+                'birthday': birthday or DEFAULT_BIRTH_DATE,
+            })
+
+    return parents, children
+
+
+def split_full_name(full_name):
+    """Split "Name Surname" into (name, surname); one-word names get an empty surname."""
+    parts = full_name.split(None, 1)
+    if len(parts) == 2:
+        return parts[0], parts[1]
+    return full_name, ''
+
+
+class NamePrefixIndex:
+    """Trie over the normalised words of parent names."""
+
+    def __init__(self):
+        self._root = {}
+
+    def add(self, name, value):
+        node = self._root
+        for word in tokenize(name):
+            node = node.setdefault(word, {})
+        node.setdefault(None, set()).add(value)  # None marks the end of a name
+
+    def longest_prefix(self, text):
+        """Values of the longest indexed name that `text` starts with (empty set if none)."""
+        node = self._root
+        best = set()
+        for word in tokenize(text):
+            node = node.get(word)
+            if node is None:
+                break
+            best = node.get(None, best)
+        return best
+
+
+def write_readers(db, parents, children):
+    """Replace all readers and children; returns ({sheet parent id: reader id}, children inserted).
+
+    Runs in the caller's transaction.
+    """
+    db.execute('DELETE FROM reader_phones')
+    db.execute('DELETE FROM children')
+    db.execute('DELETE FROM readers')
+
+    reader_ids = {}
+    reader_rows = []
+    phone_rows = set()
+    for pid, parent in sorted(parents.items()):
+        reader_id = str(uuid.uuid4())
+        reader_ids[pid] = reader_id
+        name, surname = split_full_name(parent['full_name'])
+        reader_rows.append((reader_id, name, surname, parent['phone1'], parent['phone2'], parent['address']))
+        for phone in (parent['phone1'], parent['phone2']):
+            key = phone_key(phone)
+            if key:
+                phone_rows.add((key, reader_id))
+
+    db.executemany(
+        'INSERT INTO readers (id, parent_name, parent_surname, phone1, phone2, address) VALUES (?, ?, ?, ?, ?, ?)',
+        reader_rows
+    )
+    db.executemany('INSERT INTO reader_phones (phone_key, reader_id) VALUES (?, ?)', sorted(phone_rows))
+
+    child_rows = []
+    for child in children:
+        reader_id = reader_ids.get(child['parent_id'])
+        if not reader_id:
+            # Some kids point at a parent id with no parent row
+            continue
+        # Children take the parent's surname
+        name, surname = split_full_name(parents[child['parent_id']]['full_name'])
+        child_rows.append((str(uuid.uuid4()), reader_id, child['name'], surname or name, child['birthday']))
+    db.executemany(
+        'INSERT INTO children (id, reader_id, name, surname, birth_date) VALUES (?, ?, ?, ?, ?)',
+        child_rows
+    )
+    return reader_ids, len(child_rows)
+
+
+def match_renters(renter_names, parents):
+    """Match renter names to parents by longest full-name prefix.
+
+    Returns (matched {renter: parent id}, ambiguous {renter: [full names]}, unmatched [renter]).
+    """
+    index = NamePrefixIndex()
+    for pid, parent in parents.items():
+        index.add(parent['full_name'], pid)
+
+    matched, ambiguous, unmatched = {}, {}, []
+    for renter in renter_names:
+        candidates = index.longest_prefix(renter)
+        if len(candidates) == 1:
+            matched[renter] = next(iter(candidates))
+        elif candidates:
+            ambiguous[renter] = sorted(parents[pid]['full_name'] for pid in candidates)
+        else:
+            unmatched.append(renter)
+    return matched, ambiguous, unmatched
+
+
+def link_rentals(db, links):
+    """Set rental_requests.reader_id from {renter_name: reader_id}; returns rows updated.
+
+    One set-based UPDATE through a temporary table rather than one per name.
+    """
+    db.execute('CREATE TEMP TABLE IF NOT EXISTS renter_links (renter_name TEXT PRIMARY KEY, reader_id TEXT NOT NULL)')
+    db.execute('DELETE FROM renter_links')
+    db.executemany('INSERT INTO renter_links (renter_name, reader_id) VALUES (?, ?)', links.items())
+    updated = db.execute(
+        '''UPDATE rental_requests
+           SET reader_id = (SELECT l.reader_id FROM renter_links l WHERE l.renter_name = rental_requests.renter_name)
+           WHERE renter_name IN (SELECT renter_name FROM renter_links)'''
+    ).rowcount
+    db.execute('DROP TABLE renter_links')
+    return updated
+
+
+def populate_readers(db, parents, children):
+    """Replace readers/children and link the rental journal to them. Commits.
+
+    Returns a report dict with counts and the matched, ambiguous and
+    unmatched renter names.
+    """
+    reader_ids, children_inserted = write_readers(db, parents, children)
+
+    renter_names = [row[0] for row in db.execute('SELECT DISTINCT renter_name FROM rental_requests')]
+    matched, ambiguous, unmatched = match_renters(renter_names, parents)
+    linked = link_rentals(db, {renter: reader_ids[pid] for renter, pid in matched.items()})
+    db.commit()
+
+    return {
+        'readers': len(reader_ids),
+        'children': children_inserted,
+        'linked_requests': linked,
+        'matched': {renter: parents[pid]['full_name'] for renter, pid in matched.items()},
+        'ambiguous': ambiguous,
+        'unmatched': unmatched,
+    }
@@ -0,0 +1,112 @@
+"""Writing the rental journal out as CSV or XLSX, streamed chunk by chunk.
+
+Both writers take an iterator of journal rows (dicts from the journal
+query in app/routes/rentals.py) and yield bytes as they go; nothing holds
+the whole journal. The XLSX writer uses openpyxl's write-only mode, which
+spools rows to a temporary file; that file is then streamed and removed.
+
+Renter names, emails and book titles come from the public rental form, so
+text that a spreadsheet would read as a formula is quoted (see _cell_text)
+and XLSX text is always written as string cells.
+"""
+import codecs
+import csv
+import io
+import os
+import tempfile
+
+# (header, row key) in column order
+COLUMNS = (
+    ('Дата запиту', 'requested_at'),
+    ('Дата видачі', 'approved_at'),
+    ('Дата повернення', 'return_date'),
+    ('Статус', 'status'),
+    ('Назва', 'book_title'),
+    ('Автор', 'book_author'),
+    ('Читач', 'renter_name'),
+    ('Телефон', 'renter_phone'),
+    ('Email', 'renter_email'),
+    ('Дитина', 'child_name'),
+    ('Тривалість (тижнів)', 'rental_duration'),
+)
+
+# Rows written to the CSV buffer between yields
+CSV_FLUSH_ROWS = 500
+
+XLSX_CHUNK_SIZE = 64 * 1024
+
+# Leading characters that make Excel and LibreOffice evaluate a cell
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _cell_text(value):
+    """Return a string value with a leading quote if it would start a formula."""
+    if value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _values(row):
+    """Yield row's export values in column order, with text made formula-safe."""
+    for _, key in COLUMNS:
+        value = row[key]
+        yield _cell_text(value) if isinstance(value, str) else value
+
+
+def csv_chunks(rows):
+    """Yield the journal as UTF-8 CSV (with a BOM so Excel detects the encoding)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for header, _ in COLUMNS])
+    yield codecs.BOM_UTF8 + buffer.getvalue().encode('utf-8')
+    buffer.seek(0)
+    buffer.truncate()
+
+    for count, row in enumerate(rows, 1):
+        writer.writerow(['' if value is None else value for value in _values(row)])
+        if count % CSV_FLUSH_ROWS == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def xlsx_chunks(rows):
+    """Yield the journal as an .xlsx workbook."""
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('Журнал')
+    sheet.append([header for header, _ in COLUMNS])
+
+    def cell(value):
+        cell = WriteOnlyCell(sheet, value=value)
+        if isinstance(value, str):
+            # Assigning a value starting with "=" makes it a formula cell
+            cell.data_type = 's'
+        return cell
+
+    for row in rows:
+        sheet.append([cell(value) for value in _values(row)])
+
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+    try:
+        workbook.save(path)
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(XLSX_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.remove(path)
+
+
+# ?format= value -> (mimetype, writer)
+FORMATS = {
+    'csv': ('text/csv; charset=utf-8', csv_chunks),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', xlsx_chunks),
+}
@@ -0,0 +1,71 @@
+from flask import Blueprint, g, jsonify, current_app
+
+from app.auth import admin_required, get_user_cache
+from app.database import get_pool, read_transaction
+from app.passwords import get_password_hasher
+from app.routes.auth import _user_dict
+from app.routes.rentals import OVERDUE_COUNTS_QUERY, RENTALS_WITH_POSITION, due_window
+
+admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
+
+# Rental requests of each status sent with the dashboard's first render
+BOOTSTRAP_PAGE_SIZE = 50
+
+
+def _read_bootstrap(db):
+    def rows(sql, args=()):
+        return [dict(row) for row in db.execute(sql, args)]
+
+    counts = {'pending': 0, 'queued': 0, 'approved': 0}
+    for row in db.execute(
+        '''SELECT status, COUNT(*) FROM rental_requests
+           WHERE status IN ('pending', 'queued', 'approved') GROUP BY status'''
+    ):
+        counts[row[0]] = row[1]
+    counts.update(dict(db.execute(OVERDUE_COUNTS_QUERY, [due_window()]).fetchone()))
+
+    return {
+        'counts': counts,
+        'pending': rows(
+            f"{RENTALS_WITH_POSITION} WHERE r.status = 'pending' ORDER BY r.requested_at DESC LIMIT ?",
+            [BOOTSTRAP_PAGE_SIZE]
+        ),
+        'queued': rows(
+            f"{RENTALS_WITH_POSITION} WHERE r.status = 'queued' ORDER BY r.book_id, r.queue_seq LIMIT ?",
+            [BOOTSTRAP_PAGE_SIZE]
+        ),
+        'categories': rows('SELECT * FROM categories ORDER BY name'),
+        'series': rows('SELECT * FROM series ORDER BY name'),
+        'publishers': rows('SELECT * FROM publishers ORDER BY name'),
+    }
+
+
+@admin_bp.route('/stats', methods=['GET'])
+@admin_required
+def get_stats():
+    """Return this process's runtime counters (caches, pools). Admin only."""
+    pool = get_pool()
+    event_bus = current_app.extensions.get('event_bus')
+    return jsonify({
+        'user_cache': get_user_cache().stats(),
+        'bcrypt_rounds': get_password_hasher().rounds,
+        'db_pool': pool.stats() if pool is not None else None,
+        'event_bus': event_bus.stats() if event_bus is not None else None,
+        'startup_ms': current_app.extensions.get('startup_ms'),
+    })
+
+
+@admin_bp.route('/bootstrap', methods=['GET'])
+@admin_required
+def get_bootstrap():
+    """Return what the admin dashboard needs for its first render. Admin only.
+
+    The current user, rental counts by status plus overdue and due-soon
+    loans, the newest pending and first queued requests (BOOTSTRAP_PAGE_SIZE
+    each) and the categories, series and publishers, all read from one
+    snapshot. Books, readers, users and the full rental journal are loaded
+    separately when needed.
+    """
+    data = read_transaction(_read_bootstrap)
+    data['user'] = _user_dict(g.current_user)
+    return jsonify(data)
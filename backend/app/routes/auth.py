@@ -1,11 +1,16 @@
 import uuid
 from flask import Blueprint, request, jsonify, g
 
-from app.auth import generate_token, hash_password, check_password, login_required
+from app.auth import (
+    generate_token, hash_password, check_password, password_needs_rehash,
+    login_required, invalidate_user
+)
 from app.database import get_db, query_db
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
+USER_BY_EMAIL_QUERY = 'SELECT * FROM users WHERE email = ?'
+
 
 def _user_dict(user):
     """Build a flat user dict for API responses."""
@@ -71,11 +76,20 @@ def login():
     if not email or not password:
         return jsonify({'error': 'Email and password are required'}), 400
 
-    user = query_db('SELECT * FROM users WHERE email = ?', [email], one=True)
+    user = query_db(USER_BY_EMAIL_QUERY, [email], one=True)
 
     if not user or not check_password(password, user['password_hash']):
         return jsonify({'error': 'Invalid email or password'}), 401
 
+    # Upgrade hashes made with an older cost factor while we have the password
+    if password_needs_rehash(user['password_hash']):
+        db = get_db()
+        db.execute(
+            'UPDATE users SET password_hash = ? WHERE id = ?',
+            [hash_password(password), user['id']]
+        )
+        db.commit()
+
     token = generate_token(user['id'], user['role'])
 
     return jsonify({
@@ -109,5 +123,6 @@ def reset_password():
         [new_hash, g.current_user['id']]
     )
     db.commit()
+    invalidate_user(g.current_user['id'])
 
     return jsonify({'message': 'Password updated successfully'})
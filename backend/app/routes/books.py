@@ -1,102 +1,377 @@
+import os
+import tempfile
 import uuid
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g, current_app
 
+from app import import_jobs, importer
 from app.auth import admin_required
-from app.database import get_db, query_db
+from app.database import get_db, query_db, write_transaction
+from app.events import publish
+from app.facets import get_facet_index
+from app.pagination import InvalidCursor, paginate, parse_limit
+from app.search import build_fts_query
+from app.versions import etag_cached
 
 books_bp = Blueprint('books', __name__, url_prefix='/api/books')
 
 
+# Books joined with their publisher and series so a single query yields
+# everything _enrich_book needs.
+BOOK_COLUMNS = 'b.*, p.name AS publisher_name, p.city AS publisher_city, s.name AS series_name'
+BOOK_FROM = '''books b
+LEFT JOIN publishers p ON p.id = b.publisher_id
+LEFT JOIN series s ON s.id = b.series_id'''
+BOOK_SELECT = f'SELECT {BOOK_COLUMNS} FROM {BOOK_FROM}'
+
+# ?sort= values accepted by the catalog, mapped to non-NULL sort expressions
+# so they can take part in keyset comparisons.
+BOOK_SORTS = {
+    'title': 'b.title',
+    'author': 'b.author',
+    'newest': "COALESCE(b.created_at, '')",
+    'year': "COALESCE(b.publication_year, '')",
+    'inventory': 'COALESCE(b.inventory_number, 0)',
+    'relevance': 'f.rank',
+}
+
+# Restricts the catalog to full-text matches and exposes their bm25 rank.
+SEARCH_JOIN = '''
+JOIN (SELECT rowid, rank FROM books_fts WHERE books_fts MATCH ?) f ON f.rowid = b.rowid'''
+
+# Per book: queue length, expected return of the current loan (its stored
+# due date) and available copies of the same work (title + author), in one
+# aggregate over the selection's queued and approved rentals.
+AVAILABILITY_COLUMNS = '''b.id AS book_id,
+    COUNT(CASE WHEN r.status = 'queued' THEN 1 END) AS queue_length,
+    MIN(CASE WHEN r.status = 'approved' THEN r.due_date END) AS expected_return,
+    (SELECT COUNT(*) FROM books c
+     WHERE c.title = b.title AND c.author = b.author AND c.available = 1) AS available_copies'''
+AVAILABILITY_JOIN = '''
+LEFT JOIN rental_requests r ON r.book_id = b.id AND r.status IN ('queued', 'approved')'''
+
+MAX_AVAILABILITY_IDS = 1000
+
+BOOK_MEDIA_QUERY = 'SELECT * FROM book_media WHERE book_id = ? ORDER BY display_order'
+ACTIVE_RENTAL_QUERY = "SELECT id FROM rental_requests WHERE book_id = ? AND status IN ('approved', 'pending', 'queued')"
+
+
 def _enrich_book(book):
-    """Add joined publisher/series data and convert integer flags to booleans."""
+    """Nest joined publisher/series data and convert integer flags to booleans.
+
+    Expects a row produced by BOOK_SELECT.
+    """
     enriched = dict(book)
 
     # Convert 0/1 integers to booleans
     enriched['available'] = bool(enriched.get('available'))
     enriched['new_book'] = bool(enriched.get('new_book'))
 
-    # Join publisher data
-    if enriched.get('publisher_id'):
-        publisher = query_db(
-            'SELECT name, city FROM publishers WHERE id = ?',
-            [enriched['publisher_id']],
-            one=True
-        )
-        enriched['publishers'] = publisher
+    publisher_name = enriched.pop('publisher_name', None)
+    publisher_city = enriched.pop('publisher_city', None)
+    series_name = enriched.pop('series_name', None)
+
+    if enriched.get('publisher_id') and publisher_name is not None:
+        enriched['publishers'] = {'name': publisher_name, 'city': publisher_city}
     else:
         enriched['publishers'] = None
 
-    # Join series data
-    if enriched.get('series_id'):
-        series = query_db(
-            'SELECT name FROM series WHERE id = ?',
-            [enriched['series_id']],
-            one=True
-        )
-        enriched['series'] = series
+    if enriched.get('series_id') and series_name is not None:
+        enriched['series'] = {'name': series_name}
     else:
         enriched['series'] = None
 
     return enriched
 
 
+def _get_enriched_book(book_id):
+    """Load a single book with publisher/series data, or None."""
+    book = query_db(f'{BOOK_SELECT} WHERE b.id = ?', [book_id], one=True)
+    return _enrich_book(book) if book else None
+
+
+def _availability(from_clause, where, params):
+    """Return {book id: {queue_length, expected_return, available_copies}} for a selection."""
+    rows = query_db(
+        f'SELECT {AVAILABILITY_COLUMNS} FROM {from_clause}{AVAILABILITY_JOIN} WHERE {where} GROUP BY b.id',
+        params
+    )
+    return {row.pop('book_id'): row for row in rows}
+
+
+def _availability_of(book_ids):
+    if not book_ids:
+        return {}
+    placeholders = ', '.join('?' * len(book_ids))
+    return _availability(BOOK_FROM, f'b.id IN ({placeholders})', list(book_ids))
+
+
+def _wants_availability():
+    return 'availability' in request.args.get('include', '').split(',')
+
+
+def _availability_scopes():
+    """Catalog rows carry rental data only with ?include=availability."""
+    return ('rentals',) if _wants_availability() else ()
+
+
+def _include_availability(items):
+    """Attach `availability` to catalog rows when ?include=availability is set."""
+    if not _wants_availability():
+        return items
+    summary = _availability_of([item['id'] for item in items])
+    for item in items:
+        item['availability'] = summary.get(item['id'])
+    return items
+
+
+def _parse_availability(value):
+    """Map an availability filter value to 1/0, or None for no filter."""
+    if value is None:
+        return None
+    value = value.strip().lower()
+    if value in ('1', 'true', 'available'):
+        return 1
+    if value in ('0', 'false', 'unavailable'):
+        return 0
+    return None
+
+
+def _book_filters(args):
+    """Build the FROM and WHERE clauses for the catalog facets in request args.
+
+    Returns (from_clause, where, params). A search adds a join against the
+    full-text index, which also makes the 'relevance' sort available.
+    """
+    from_clause = BOOK_FROM
+    where = ['1=1']
+    params = []
+
+    search = build_fts_query(args.get('search'))
+    if search:
+        from_clause += SEARCH_JOIN
+        params.append(search)
+
+    for arg, column in (
+        ('category', 'b.category'),
+        ('author', 'b.author'),
+        ('age', 'b.age'),
+        ('publisher', 'p.name'),
+        ('series', 's.name'),
+    ):
+        value = args.get(arg)
+        if value:
+            where.append(f'{column} = ?')
+            params.append(value)
+
+    available = _parse_availability(args.get('available'))
+    if available is not None:
+        where.append('b.available = ?')
+        params.append(available)
+
+    return from_clause, ' AND '.join(where), params
+
+
+def _book_sort(args, searching):
+    """Return (sort expression, descending) for ?sort= and ?order=.
+
+    Raises ValueError for an unknown sort.
+    """
+    sort = args.get('sort', 'relevance' if searching else 'title')
+    if sort not in BOOK_SORTS:
+        raise ValueError(f'sort must be one of: {", ".join(BOOK_SORTS)}')
+    if sort == 'relevance' and not searching:
+        sort = 'title'
+    return BOOK_SORTS[sort], args.get('order', 'asc').lower() == 'desc'
+
+
+def _works_from(from_clause, where, sort_expr):
+    """Return the FROM clause (ending in WHERE) of the grouped catalog: one
+    representative copy per work, with its copy counts and sort value."""
+    return f'''(
+        SELECT {BOOK_COLUMNS}, {sort_expr} AS sort_value,
+               COUNT(*) OVER work AS copies,
+               SUM(b.available) OVER work AS available_copies,
+               ROW_NUMBER() OVER (
+                   PARTITION BY b.title, b.author
+                   ORDER BY b.cover_image_url IS NULL, b.available DESC, b.created_at, b.id
+               ) AS copy_rank
+        FROM {from_clause}
+        WHERE {where}
+        WINDOW work AS (PARTITION BY b.title, b.author)
+    ) g WHERE g.copy_rank = 1'''
+
+
 @books_bp.route('', methods=['GET'])
+@etag_cached('books', 'series', 'publishers', extra_scopes=_availability_scopes)
 def get_books():
-    """Get all books with optional filtering, joined publisher and series data."""
-    category = request.args.get('category')
-    search = request.args.get('search')
-    available = request.args.get('available')
+    """Get books filtered by category, author, publisher, age, series,
+    availability and search, with joined publisher and series data.
+
+    Without ?limit= or ?cursor= the full list is returned. With either, the
+    response is a keyset-paginated page: { items, next_cursor, total }.
+    Supports ?sort=title|author|newest|year|inventory|relevance and
+    ?order=asc|desc. Searches default to relevance (bm25) order.
+    ?include=availability adds each book's queue summary (see
+    get_availability) as `availability`.
+    """
+    from_clause, where, args = _book_filters(request.args)
+    try:
+        sort_expr, descending = _book_sort(request.args, searching=from_clause != BOOK_FROM)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        direction = 'DESC' if descending else 'ASC'
+        books = query_db(
+            f'SELECT {BOOK_COLUMNS} FROM {from_clause} WHERE {where} '
+            f'ORDER BY {sort_expr} {direction}, b.id {direction}',
+            args
+        )
+        return jsonify(_include_availability([_enrich_book(b) for b in books]))
+
+    try:
+        books, next_cursor = paginate(
+            BOOK_COLUMNS, f'{from_clause} WHERE {where}', args,
+            [sort_expr, 'b.id'],
+            parse_limit(request.args.get('limit')),
+            cursor=request.args.get('cursor'),
+            descending=descending,
+        )
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
 
-    query = 'SELECT * FROM books WHERE 1=1'
-    args = []
+    total = query_db(f'SELECT COUNT(*) AS total FROM {from_clause} WHERE {where}', args, one=True)['total']
 
-    if category:
-        query += ' AND category = ?'
-        args.append(category)
+    return jsonify({
+        'items': _include_availability([_enrich_book(b) for b in books]),
+        'next_cursor': next_cursor,
+        'total': total,
+    })
 
-    if search:
-        query += ' AND (title LIKE ? OR author LIKE ?)'
-        search_term = f'%{search}%'
-        args.extend([search_term, search_term])
 
-    if available is not None:
-        query += ' AND available = ?'
-        args.append(int(available))
+@books_bp.route('/grouped', methods=['GET'])
+@etag_cached('books', 'series', 'publishers', extra_scopes=_availability_scopes)
+def get_grouped_books():
+    """Get the catalog as one entry per work (title + author).
 
-    query += ' ORDER BY title ASC'
+    Accepts the same filters, sorts and ?limit=/?cursor= as the catalog and
+    always returns a page: { items, next_cursor, total }. Each item is a
+    representative copy (preferring one with a cover image, then an
+    available one) with `copies` and `available_copies` counted over the
+    copies that match the filters. ?include=availability adds the queue
+    summary of the representative copy as `availability`.
+    """
+    from_clause, where, args = _book_filters(request.args)
+    try:
+        sort_expr, descending = _book_sort(request.args, searching=from_clause != BOOK_FROM)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    works = _works_from(from_clause, where, sort_expr)
+
+    try:
+        groups, next_cursor = paginate(
+            'g.*', works, args,
+            ['g.sort_value', 'g.id'],
+            parse_limit(request.args.get('limit')),
+            cursor=request.args.get('cursor'),
+            descending=descending,
+        )
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+
+    total = query_db(
+        f'''SELECT COUNT(*) AS total FROM (
+               SELECT 1 FROM {from_clause} WHERE {where} GROUP BY b.title, b.author
+           )''',
+        args, one=True
+    )['total']
+
+    items = []
+    for group in groups:
+        group.pop('sort_value')
+        group.pop('copy_rank')
+        item = _enrich_book(group)
+        item['available_copies'] = item['available_copies'] or 0
+        items.append(item)
 
-    books = query_db(query, args)
-    return jsonify([_enrich_book(b) for b in books])
+    return jsonify({
+        'items': _include_availability(items),
+        'next_cursor': next_cursor,
+        'total': total,
+    })
 
 
 @books_bp.route('/filters', methods=['GET'])
+@etag_cached('books', 'series', 'publishers')
 def get_filters():
-    """Return unique filter values for the book catalog."""
-    categories = [r['category'] for r in query_db(
-        'SELECT DISTINCT category FROM books WHERE category IS NOT NULL AND category != "" ORDER BY category'
-    )]
-    authors = [r['author'] for r in query_db(
-        'SELECT DISTINCT author FROM books WHERE author IS NOT NULL AND author != "" ORDER BY author'
-    )]
-    ages = [r['age'] for r in query_db(
-        'SELECT DISTINCT age FROM books WHERE age IS NOT NULL AND age != "" ORDER BY age'
-    )]
-    publishers = [r['name'] for r in query_db(
-        'SELECT DISTINCT name FROM publishers ORDER BY name'
-    )]
-    series_list = [r['name'] for r in query_db(
-        'SELECT DISTINCT name FROM series ORDER BY name'
-    )]
+    """Return filter values for the book catalog with per-value match counts.
+
+    Accepts the same facet and search parameters as the catalog. Each facet
+    in `facets` is counted under the other selected facets; `total` is the
+    number of books matching the whole selection.
+    """
+    index = get_facet_index()
+
+    selection = {}
+    for arg in ('category', 'author', 'age', 'publisher', 'series'):
+        if request.args.get(arg):
+            selection[arg] = request.args[arg]
+    available = _parse_availability(request.args.get('available'))
+    if available is not None:
+        selection['availability'] = 'available' if available else 'unavailable'
+
+    restrict = None
+    search = build_fts_query(request.args.get('search'))
+    if search:
+        matches = query_db('SELECT rowid FROM books_fts WHERE books_fts MATCH ?', [search])
+        restrict = index.mask_for_rowids(row['rowid'] for row in matches)
+
+    facets, total = index.counts(selection, restrict)
 
     return jsonify({
-        'categories': categories,
-        'authors': authors,
-        'ages': ages,
-        'publishers': publishers,
-        'series': series_list,
+        'categories': index.values('category'),
+        'authors': index.values('author'),
+        'ages': index.values('age'),
+        'publishers': index.values('publisher'),
+        'series': index.values('series'),
+        'facets': facets,
+        'total': total,
     })
 
 
+@books_bp.route('/availability', methods=['GET'])
+@etag_cached('books', 'rentals')
+def get_availability():
+    """Return queue and availability summaries keyed by book id.
+
+    Takes ?ids=<id>,<id>,... or, without ids, the catalog filters and search
+    (a whole selection). Each summary has `queue_length`, `expected_return`
+    (date the current loan is due back, or null) and `available_copies`
+    (available copies of the same title + author).
+    """
+    if 'ids' in request.args:
+        ids = [book_id for book_id in request.args['ids'].split(',') if book_id]
+        if len(ids) > MAX_AVAILABILITY_IDS:
+            return jsonify({'error': f'At most {MAX_AVAILABILITY_IDS} ids per request'}), 400
+        return jsonify(_availability_of(ids))
+
+    from_clause, where, args = _book_filters(request.args)
+    return jsonify(_availability(from_clause, where, args))
+
+
+@books_bp.route('/availability', methods=['POST'])
+def post_availability():
+    """Same as get_availability for a JSON body { ids: [...] } too long for a URL."""
+    data = request.get_json()
+    ids = data.get('ids') if isinstance(data, dict) else None
+    if not isinstance(ids, list):
+        return jsonify({'error': 'ids must be a list'}), 400
+    if len(ids) > MAX_AVAILABILITY_IDS:
+        return jsonify({'error': f'At most {MAX_AVAILABILITY_IDS} ids per request'}), 400
+    return jsonify(_availability_of([str(book_id) for book_id in ids]))
+
+
 @books_bp.route('', methods=['POST'])
 @admin_required
 def create_book():
@@ -137,10 +412,10 @@ def create_book():
             data.get('new_book', 0)
         ]
     )
+    publish(db, 'book', action='created', id=book_id)
     db.commit()
 
-    book = query_db('SELECT * FROM books WHERE id = ?', [book_id], one=True)
-    return jsonify(_enrich_book(book)), 201
+    return jsonify(_get_enriched_book(book_id)), 201
 
 
 @books_bp.route('/<book_id>', methods=['PUT'])
@@ -179,10 +454,10 @@ def update_book(book_id):
         f'UPDATE books SET {", ".join(set_clauses)} WHERE id = ?',
         args
     )
+    publish(db, 'book', action='updated', id=book_id)
     db.commit()
 
-    updated = query_db('SELECT * FROM books WHERE id = ?', [book_id], one=True)
-    return jsonify(_enrich_book(updated))
+    return jsonify(_get_enriched_book(book_id))
 
 
 @books_bp.route('/<book_id>', methods=['DELETE'])
@@ -193,10 +468,7 @@ def delete_book(book_id):
     if not book:
         return jsonify({'error': 'Book not found'}), 404
 
-    active = query_db(
-        "SELECT id FROM rental_requests WHERE book_id = ? AND status IN ('approved', 'pending', 'queued')",
-        [book_id], one=True
-    )
+    active = query_db(ACTIVE_RENTAL_QUERY, [book_id], one=True)
     if active:
         return jsonify({'error': 'Cannot delete a book with active rentals'}), 400
 
@@ -204,6 +476,7 @@ def delete_book(book_id):
     db.execute('DELETE FROM book_media WHERE book_id = ?', [book_id])
     db.execute('DELETE FROM rental_requests WHERE book_id = ?', [book_id])
     db.execute('DELETE FROM books WHERE id = ?', [book_id])
+    publish(db, 'book', action='deleted', id=book_id)
     db.commit()
 
     return jsonify({'message': 'Book deleted successfully'})
@@ -244,30 +517,33 @@ def duplicate_book(book_id):
             book['new_book'],
         ]
     )
+    publish(db, 'book', action='created', id=new_id)
     db.commit()
 
-    new_book = query_db('SELECT * FROM books WHERE id = ?', [new_id], one=True)
-    return jsonify(_enrich_book(new_book)), 201
+    return jsonify(_get_enriched_book(new_id)), 201
 
 
 @books_bp.route('/<book_id>/force-available', methods=['PUT'])
 @admin_required
 def force_book_available(book_id):
     """Force a book to be available, marking any approved rentals as returned."""
-    book = query_db('SELECT * FROM books WHERE id = ?', [book_id], one=True)
-    if not book:
-        return jsonify({'error': 'Book not found'}), 404
-
-    db = get_db()
-    db.execute('UPDATE books SET available = 1, updated_at = CURRENT_TIMESTAMP WHERE id = ?', [book_id])
-    db.execute(
-        "UPDATE rental_requests SET status = 'returned', return_date = CURRENT_TIMESTAMP WHERE book_id = ? AND status = 'approved'",
-        [book_id]
-    )
-    db.commit()
+    # Same serialized write path as approvals and returns in app/routes/rentals.py
+    def force(db):
+        book = query_db('SELECT id FROM books WHERE id = ?', [book_id], one=True)
+        if not book:
+            return {'error': 'Book not found'}, 404
+
+        db.execute('UPDATE books SET available = 1, updated_at = CURRENT_TIMESTAMP WHERE id = ?', [book_id])
+        db.execute(
+            "UPDATE rental_requests SET status = 'returned', return_date = CURRENT_TIMESTAMP WHERE book_id = ? AND status = 'approved'",
+            [book_id]
+        )
+        publish(db, 'book', action='updated', id=book_id)
+        publish(db, 'rental', action='returned', book_id=book_id)
+        return _get_enriched_book(book_id), 200
 
-    updated = query_db('SELECT * FROM books WHERE id = ?', [book_id], one=True)
-    return jsonify(_enrich_book(updated))
+    body, status = write_transaction(force)
+    return jsonify(body), status
 
 
 @books_bp.route('/<book_id>/media', methods=['GET'])
@@ -277,10 +553,7 @@ def get_book_media(book_id):
     if not book:
         return jsonify({'error': 'Book not found'}), 404
 
-    media = query_db(
-        'SELECT * FROM book_media WHERE book_id = ? ORDER BY display_order',
-        [book_id]
-    )
+    media = query_db(BOOK_MEDIA_QUERY, [book_id])
     return jsonify(media)
 
 
@@ -308,6 +581,7 @@ def add_book_media(book_id):
             data.get('display_order', 0)
         ]
     )
+    publish(db, 'book', action='updated', id=book_id)
     db.commit()
 
     media = query_db('SELECT * FROM book_media WHERE id = ?', [media_id], one=True)
@@ -324,6 +598,7 @@ def delete_book_media(media_id):
 
     db = get_db()
     db.execute('DELETE FROM book_media WHERE id = ?', [media_id])
+    publish(db, 'book', action='updated', id=media['book_id'])
     db.commit()
 
     return jsonify({'message': 'Media deleted successfully'})
@@ -334,99 +609,55 @@ def delete_book_media(media_id):
 def import_books():
     """Import books from Excel data (admin only).
 
-    Accepts { booksData: [...] } where each item has book fields.
-    For each book, get-or-create category/series/publisher, then insert.
+    Accepts { booksData: [...] } where each item has book fields plus
+    category/series/publisher names; see app/importer.py.
     Returns { success, failed, errors }.
     """
     data = request.get_json()
     if not data or 'booksData' not in data:
         return jsonify({'error': 'booksData is required'}), 400
+    if not isinstance(data['booksData'], list):
+        return jsonify({'error': 'booksData must be a list'}), 400
 
-    books_data = data['booksData']
     db = get_db()
-    success = 0
-    failed = 0
-    errors = []
-
-    for idx, book_data in enumerate(books_data):
-        try:
-            title = book_data.get('title', '').strip()
-            author = book_data.get('author', '').strip()
-            category_name = book_data.get('category', '').strip()
-
-            if not title or not author or not category_name:
-                raise ValueError('title, author and category are required')
-
-            # Get or create category
-            cat = query_db('SELECT id FROM categories WHERE name = ?', [category_name], one=True)
-            if not cat:
-                cat_id = str(uuid.uuid4())
-                db.execute('INSERT INTO categories (id, name) VALUES (?, ?)', [cat_id, category_name])
-            else:
-                cat_id = cat['id']
-
-            # Get or create series (optional)
-            series_id = None
-            series_name = book_data.get('series', '').strip() if book_data.get('series') else ''
-            if series_name:
-                s = query_db('SELECT id FROM series WHERE name = ?', [series_name], one=True)
-                if not s:
-                    series_id = str(uuid.uuid4())
-                    db.execute('INSERT INTO series (id, name) VALUES (?, ?)', [series_id, series_name])
-                else:
-                    series_id = s['id']
-
-            # Get or create publisher (optional)
-            publisher_id = None
-            publisher_name = book_data.get('publisher', '').strip() if book_data.get('publisher') else ''
-            if publisher_name:
-                p = query_db('SELECT id FROM publishers WHERE name = ?', [publisher_name], one=True)
-                if not p:
-                    publisher_id = str(uuid.uuid4())
-                    publisher_city = book_data.get('publisher_city', '').strip() if book_data.get('publisher_city') else ''
-                    db.execute(
-                        'INSERT INTO publishers (id, name, city) VALUES (?, ?, ?)',
-                        [publisher_id, publisher_name, publisher_city]
-                    )
-                else:
-                    publisher_id = p['id']
-
-            book_id = str(uuid.uuid4())
-            db.execute(
-                '''INSERT INTO books (id, title, author, category, category_id, series_id, publisher_id,
-                   cover_color, cover_image_url, available, description, age, publication_year, isbn,
-                   inventory_number, supplier, new_book)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                [
-                    book_id,
-                    title,
-                    author,
-                    category_name,
-                    cat_id,
-                    series_id,
-                    publisher_id,
-                    book_data.get('cover_color', '#4A90E2'),
-                    book_data.get('cover_image_url'),
-                    book_data.get('available', 1),
-                    book_data.get('description'),
-                    book_data.get('age'),
-                    book_data.get('publication_year'),
-                    book_data.get('isbn'),
-                    book_data.get('inventory_number'),
-                    book_data.get('supplier'),
-                    book_data.get('new_book', 0)
-                ]
-            )
-            success += 1
-
-        except Exception as e:
-            failed += 1
-            errors.append(f'Row {idx + 1}: {str(e)}')
+    result = importer.import_books(db, data['booksData'])
+    if result['success']:
+        publish(db, 'book', action='imported', count=result['success'])
+        db.commit()
+    return jsonify(result)
 
-    db.commit()
 
-    return jsonify({
-        'success': success,
-        'failed': failed,
-        'errors': errors,
-    })
+@books_bp.route('/import/xlsx', methods=['POST'])
+@admin_required
+def import_books_xlsx():
+    """Start a background import of an uploaded .xlsx catalog (admin only).
+
+    Returns 202 with the job; poll /api/books/import/jobs/<id> for progress.
+    """
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file provided'}), 400
+
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'error': 'No file selected'}), 400
+    if not file.filename.lower().endswith('.xlsx'):
+        return jsonify({'error': 'Only .xlsx files are supported'}), 400
+
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    with os.fdopen(fd, 'wb') as out:
+        file.save(out)
+
+    job_id = import_jobs.create_job(get_db(), file.filename, g.current_user['id'])
+    import_jobs.start_job(current_app._get_current_object(), job_id, path)
+
+    return jsonify(import_jobs.get_job(job_id)), 202
+
+
+@books_bp.route('/import/jobs/<job_id>', methods=['GET'])
+@admin_required
+def get_import_job(job_id):
+    """Get the status, progress and errors of an import job (admin only)."""
+    job = import_jobs.get_job(job_id)
+    if not job:
+        return jsonify({'error': 'Import job not found'}), 404
+    return jsonify(job)
@@ -3,14 +3,18 @@ from flask import Blueprint, request, jsonify
 
 from app.auth import admin_required
 from app.database import get_db, query_db
+from app.versions import etag_cached
 
 categories_bp = Blueprint('categories', __name__, url_prefix='/api/categories')
 
+CATEGORIES_QUERY = 'SELECT * FROM categories ORDER BY name'
+
 
 @categories_bp.route('', methods=['GET'])
+@etag_cached('categories')
 def get_categories():
     """Get all categories."""
-    categories = query_db('SELECT * FROM categories ORDER BY name')
+    categories = query_db(CATEGORIES_QUERY)
     return jsonify(categories)
 
 
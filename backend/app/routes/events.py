@@ -0,0 +1,106 @@
+import time
+from flask import Blueprint, Response, request, jsonify, current_app
+
+from app.auth import decode_token, load_user
+from app.database import get_db
+from app.events import events_after, get_event_bus, last_event_id
+
+events_bp = Blueprint('events', __name__, url_prefix='/api/events')
+
+
+def _format(event_id, event_type, data):
+    return f'id: {event_id}\nevent: {event_type}\ndata: {data}\n\n'
+
+
+def _is_admin(user_id):
+    user = load_user(user_id)
+    return user is not None and user['role'] == 'admin'
+
+
+@events_bp.route('', methods=['GET'])
+def stream_events():
+    """Server-Sent Events stream of rental and book changes (admin only).
+
+    EventSource cannot send headers, so the token may also be passed as
+    ?token=. That puts the JWT in the URL, where access logs record it.
+    A reconnect with Last-Event-ID (or ?last_event_id=) replays the events
+    missed in between; if those were already pruned the stream starts with
+    a `reset` event and the client should reload. A comment line is sent
+    every EVENTS_HEARTBEAT seconds. The user is re-checked at the same
+    interval and the stream ends once they are deleted or no longer an
+    admin, when the token expires, or after EVENTS_MAX_STREAM_SECONDS;
+    EventSource then reconnects and is authorized afresh.
+    """
+    auth_header = request.headers.get('Authorization', '')
+    token = auth_header.split('Bearer ')[1] if auth_header.startswith('Bearer ') else request.args.get('token')
+    if not token:
+        return jsonify({'error': 'Authorization token required'}), 401
+
+    payload = decode_token(token)
+    if payload is None:
+        return jsonify({'error': 'Invalid or expired token'}), 401
+
+    user = load_user(payload['user_id'])
+    if user is None:
+        return jsonify({'error': 'User not found'}), 401
+    if user['role'] != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+
+    app = current_app._get_current_object()
+    bus = get_event_bus()
+    db = get_db()
+    backlog_size = current_app.config['EVENTS_BACKLOG']
+    heartbeat = current_app.config['EVENTS_HEARTBEAT']
+    retry_ms = current_app.config['EVENTS_RETRY_MS']
+
+    replay = []
+    reset = False
+    resume_from = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        resume_from = int(resume_from) if resume_from else None
+    except ValueError:
+        resume_from = None
+
+    if resume_from is None:
+        cursor = last_event_id(db)
+    else:
+        replay = events_after(db, resume_from, backlog_size)
+        if replay is None or len(replay) == backlog_size:
+            replay, reset = [], True
+            cursor = last_event_id(db)
+        else:
+            cursor = replay[-1]['id'] if replay else resume_from
+
+    user_id = user['id']
+    ends_at = min(payload['exp'], time.time() + current_app.config['EVENTS_MAX_STREAM_SECONDS'])
+
+    def generate(cursor):
+        yield f'retry: {retry_ms}\n\n'
+        if reset:
+            yield _format(cursor, 'reset', '{}')
+        for event in replay:
+            yield _format(event['id'], event['type'], event['data'])
+        next_check = time.monotonic() + heartbeat
+        while time.time() < ends_at:
+            if time.monotonic() >= next_check:
+                # The request context is gone while streaming; load the user
+                # in a short app context so no connection is held between checks
+                with app.app_context():
+                    if not _is_admin(user_id):
+                        return
+                next_check = time.monotonic() + heartbeat
+            events = bus.wait(cursor, heartbeat)
+            if events is None:
+                cursor = bus.last_id
+                yield _format(cursor, 'reset', '{}')
+            elif events:
+                for event in events:
+                    yield _format(event['id'], event['type'], event['data'])
+                cursor = events[-1]['id']
+            else:
+                yield ': keepalive\n\n'
+
+    response = Response(generate(cursor), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
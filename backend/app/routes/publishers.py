@@ -3,14 +3,18 @@ from flask import Blueprint, request, jsonify
 
 from app.auth import admin_required
 from app.database import get_db, query_db
+from app.versions import etag_cached
 
 publishers_bp = Blueprint('publishers', __name__, url_prefix='/api/publishers')
 
+PUBLISHERS_QUERY = 'SELECT * FROM publishers ORDER BY name'
+
 
 @publishers_bp.route('', methods=['GET'])
+@etag_cached('publishers')
 def get_publishers():
     """Get all publishers."""
-    publishers = query_db('SELECT * FROM publishers ORDER BY name')
+    publishers = query_db(PUBLISHERS_QUERY)
     return jsonify(publishers)
 
 
@@ -1,44 +1,128 @@
+import json
 import uuid
 from flask import Blueprint, request, jsonify
 
 from app.auth import admin_required
 from app.database import get_db, query_db
+from app.pagination import InvalidCursor, paginate, parse_limit
+from app.phones import sync_reader_phones
 
 readers_bp = Blueprint('readers', __name__, url_prefix='/api/readers')
 children_bp = Blueprint('children', __name__, url_prefix='/api/children')
 
 
+# Readers with their children aggregated into a JSON array, so a listing is
+# a single query however many families it returns.
+READER_COLUMNS = '''r.*, (
+    SELECT json_group_array(json_object(
+        'id', c.id, 'reader_id', c.reader_id, 'name', c.name, 'surname', c.surname,
+        'birth_date', c.birth_date, 'gender', c.gender, 'created_at', c.created_at
+    ))
+    FROM (SELECT * FROM children WHERE reader_id = r.id ORDER BY surname, name) c
+) AS children_json'''
+
+# ?sort= values for the readers listing, mapped to keyset ORDER BY columns
+READER_SORTS = {
+    'surname': ['r.parent_surname', 'r.parent_name', 'r.id'],
+    'name': ['r.parent_name', 'r.parent_surname', 'r.id'],
+    'newest': ["COALESCE(r.created_at, '')", 'r.id'],
+}
+
+# A reader's children in display order
+CHILDREN_QUERY = 'SELECT * FROM children WHERE reader_id = ? ORDER BY surname, name'
+
+# Rentals keep their history when a reader or child is deleted
+DETACH_READER_RENTALS = 'UPDATE rental_requests SET reader_id = NULL WHERE reader_id = ?'
+DETACH_CHILD_RENTALS = 'UPDATE rental_requests SET child_id = NULL WHERE child_id = ?'
+
+
+def _reader_with_children(row):
+    """Decode the children_json column produced by READER_COLUMNS."""
+    reader = dict(row)
+    reader['children'] = json.loads(reader.pop('children_json') or '[]')
+    return reader
+
+
+def _reader_filters(args):
+    """Build the WHERE clause and params for ?search= in request args.
+
+    The search matches parent names, phones and children's names
+    case-insensitively.
+    """
+    where = ['1=1']
+    params = []
+
+    search = args.get('search', '').strip()
+    if search:
+        term = search.casefold()
+        where.append('''(
+            instr(casefold(r.parent_name || ' ' || r.parent_surname), ?)
+            OR instr(casefold(r.parent_surname || ' ' || r.parent_name), ?)
+            OR instr(casefold(r.phone1), ?)
+            OR instr(casefold(COALESCE(r.phone2, '')), ?)
+            OR EXISTS (
+                SELECT 1 FROM children c
+                WHERE c.reader_id = r.id AND instr(casefold(c.name || ' ' || c.surname), ?)
+            )
+        )''')
+        params.extend([term] * 5)
+
+    return ' AND '.join(where), params
+
+
 @readers_bp.route('', methods=['GET'])
 @admin_required
 def get_readers():
-    """Get all readers with their children. Admin only."""
-    readers = query_db('SELECT * FROM readers ORDER BY parent_surname, parent_name')
-
-    for reader in readers:
-        children = query_db(
-            'SELECT * FROM children WHERE reader_id = ? ORDER BY surname, name',
-            [reader['id']]
+    """Get readers with their children. Admin only.
+
+    ?search= matches parent names, phones and children's names
+    (case-insensitively). Without ?limit= or ?cursor= the full list is
+    returned; with either, a keyset page { items, next_cursor, total }.
+    Supports ?sort=surname|name|newest and ?order=asc|desc.
+    """
+    where, args = _reader_filters(request.args)
+
+    sort = request.args.get('sort', 'surname')
+    if sort not in READER_SORTS:
+        return jsonify({'error': f'sort must be one of: {", ".join(READER_SORTS)}'}), 400
+    order_columns = READER_SORTS[sort]
+    descending = request.args.get('order', 'asc').lower() == 'desc'
+
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        direction = 'DESC' if descending else 'ASC'
+        order_by = ', '.join(f'{col} {direction}' for col in order_columns)
+        readers = query_db(f'SELECT {READER_COLUMNS} FROM readers r WHERE {where} ORDER BY {order_by}', args)
+        return jsonify([_reader_with_children(r) for r in readers])
+
+    try:
+        readers, next_cursor = paginate(
+            READER_COLUMNS, f'readers r WHERE {where}', args,
+            order_columns,
+            parse_limit(request.args.get('limit')),
+            cursor=request.args.get('cursor'),
+            descending=descending,
         )
-        reader['children'] = children
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
 
-    return jsonify(readers)
+    total = query_db(f'SELECT COUNT(*) AS total FROM readers r WHERE {where}', args, one=True)['total']
+
+    return jsonify({
+        'items': [_reader_with_children(r) for r in readers],
+        'next_cursor': next_cursor,
+        'total': total,
+    })
 
 
 @readers_bp.route('/<reader_id>', methods=['GET'])
 @admin_required
 def get_reader(reader_id):
     """Get a single reader by ID with children. Admin only."""
-    reader = query_db('SELECT * FROM readers WHERE id = ?', [reader_id], one=True)
+    reader = query_db(f'SELECT {READER_COLUMNS} FROM readers r WHERE r.id = ?', [reader_id], one=True)
     if not reader:
         return jsonify({'error': 'Reader not found'}), 404
 
-    children = query_db(
-        'SELECT * FROM children WHERE reader_id = ? ORDER BY surname, name',
-        [reader_id]
-    )
-    reader['children'] = children
-
-    return jsonify(reader)
+    return jsonify(_reader_with_children(reader))
 
 
 @readers_bp.route('', methods=['POST'])
@@ -60,6 +144,7 @@ def create_reader():
         [reader_id, data['parent_name'], data['parent_surname'], data['phone1'],
          data.get('phone2'), data.get('email', ''), data['address'], data.get('comment', '')]
     )
+    sync_reader_phones(db, reader_id, [data['phone1'], data.get('phone2')])
 
     # Create children if provided
     children_data = data.get('children', [])
@@ -85,10 +170,7 @@ def get_reader_children(reader_id):
     if not reader:
         return jsonify({'error': 'Reader not found'}), 404
 
-    children = query_db(
-        'SELECT * FROM children WHERE reader_id = ? ORDER BY surname, name',
-        [reader_id]
-    )
+    children = query_db(CHILDREN_QUERY, [reader_id])
     return jsonify(children)
 
 
@@ -118,6 +200,11 @@ def update_reader(reader_id):
     args.append(reader_id)
     db = get_db()
     db.execute(f'UPDATE readers SET {", ".join(set_clauses)} WHERE id = ?', args)
+    if 'phone1' in data or 'phone2' in data:
+        sync_reader_phones(
+            db, reader_id,
+            [data.get('phone1', reader['phone1']), data.get('phone2', reader['phone2'])]
+        )
     db.commit()
 
     updated = query_db('SELECT * FROM readers WHERE id = ?', [reader_id], one=True)
@@ -136,9 +223,9 @@ def delete_reader(reader_id):
     db = get_db()
     # Detach rentals referencing this reader or their children
     child_ids = [c['id'] for c in query_db('SELECT id FROM children WHERE reader_id = ?', [reader_id])]
-    db.execute('UPDATE rental_requests SET reader_id = NULL WHERE reader_id = ?', [reader_id])
+    db.execute(DETACH_READER_RENTALS, [reader_id])
     for cid in child_ids:
-        db.execute('UPDATE rental_requests SET child_id = NULL WHERE child_id = ?', [cid])
+        db.execute(DETACH_CHILD_RENTALS, [cid])
     db.execute('DELETE FROM children WHERE reader_id = ?', [reader_id])
     db.execute('DELETE FROM readers WHERE id = ?', [reader_id])
     db.commit()
@@ -299,7 +386,7 @@ def delete_child(reader_id, child_id):
         return jsonify({'error': 'Child not found'}), 404
 
     db = get_db()
-    db.execute('UPDATE rental_requests SET child_id = NULL WHERE child_id = ?', [child_id])
+    db.execute(DETACH_CHILD_RENTALS, [child_id])
     db.execute('DELETE FROM children WHERE id = ?', [child_id])
     db.commit()
 
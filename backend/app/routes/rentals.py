@@ -1,69 +1,240 @@
 import uuid
-from datetime import datetime
-from flask import Blueprint, request, jsonify
+from datetime import date, datetime
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 
+from app import rental_export
 from app.auth import admin_required
-from app.database import get_db, query_db
+from app.database import query_db, write_transaction
+from app.events import publish
+from app.pagination import InvalidCursor, paginate, parse_limit
+from app.phones import find_reader_by_phone, sync_reader_phones
+from app.versions import etag_cached
 
 rentals_bp = Blueprint('rentals', __name__, url_prefix='/api/rentals')
 
 
+# Queued reservations keep the queue_seq they were given on joining; positions
+# are numbered at read time, so leaving the queue never rewrites other rows.
+# Only queued rows count their place, each with one range count on
+# idx_rental_requests_queue, so reading other rentals costs nothing extra.
+RENTAL_COLUMNS = '''r.*, CASE WHEN r.status = 'queued' THEN
+        (SELECT COUNT(*) FROM rental_requests q
+         WHERE q.book_id = r.book_id AND q.status = 'queued' AND q.queue_seq <= r.queue_seq)
+    END AS queue_position'''
+RENTAL_FROM = 'rental_requests r'
+RENTALS_WITH_POSITION = f'SELECT {RENTAL_COLUMNS} FROM {RENTAL_FROM}'
+
+# Journal rows also carry the book's author and the child's name
+JOURNAL_COLUMNS = f'{RENTAL_COLUMNS}, b.author AS book_author, c.name AS child_name'
+JOURNAL_FROM = f'''{RENTAL_FROM}
+    LEFT JOIN books b ON b.id = r.book_id
+    LEFT JOIN children c ON c.id = r.child_id'''
+
+# Newest first; id breaks ties between requests made in the same second
+JOURNAL_ORDER = ['r.requested_at', 'r.id']
+
+EXPORT_BATCH_SIZE = 1000
+
+# Loans still out that are overdue or due within the window (a '+N days'
+# modifier), with the reader's contact details; a range scan on
+# idx_rental_requests_due. Dates are UTC, like approved_at.
+OVERDUE_QUERY = '''SELECT r.id, r.book_id, r.book_title, b.author AS book_author,
+        r.renter_name, r.renter_phone, r.renter_email,
+        r.reader_id, rd.parent_name AS reader_name, rd.parent_surname AS reader_surname,
+        rd.phone1 AS reader_phone1, rd.phone2 AS reader_phone2, rd.email AS reader_email,
+        r.child_id, c.name AS child_name,
+        r.approved_at, r.rental_duration, r.due_date,
+        CAST(julianday(date('now')) - julianday(r.due_date) AS INTEGER) AS days_overdue
+    FROM rental_requests r
+    LEFT JOIN books b ON b.id = r.book_id
+    LEFT JOIN readers rd ON rd.id = r.reader_id
+    LEFT JOIN children c ON c.id = r.child_id
+    WHERE r.status = 'approved' AND r.due_date <= date('now', ?)
+    ORDER BY r.due_date, r.id'''
+OVERDUE_COUNTS_QUERY = '''SELECT COUNT(CASE WHEN due_date < date('now') THEN 1 END) AS overdue,
+        COUNT(CASE WHEN due_date >= date('now') THEN 1 END) AS due_soon
+    FROM rental_requests
+    WHERE status = 'approved' AND due_date <= date('now', ?)'''
+MAX_DUE_SOON_DAYS = 365
+
+# A book's reservation queue, in joining order
+NEXT_IN_QUEUE_QUERY = '''SELECT id FROM rental_requests
+    WHERE book_id = ? AND status = 'queued'
+    ORDER BY queue_seq ASC LIMIT 1'''
+QUEUE_TAIL_QUERY = 'SELECT MAX(queue_seq) as max_seq FROM rental_requests WHERE book_id = ?'
+QUEUE_QUERY = '''SELECT id, renter_name, ROW_NUMBER() OVER (ORDER BY queue_seq) AS queue_position, requested_at
+    FROM rental_requests
+    WHERE book_id = ? AND status = 'queued'
+    ORDER BY queue_seq ASC'''
+
+
+def _get_rental(rental_id):
+    return query_db(f'{RENTALS_WITH_POSITION} WHERE r.id = ?', [rental_id], one=True)
+
+
 def _promote_next_or_release(db, book_id):
     """Promote the next queued reservation to pending, or release the book."""
-    next_in_queue = query_db(
-        '''SELECT id, queue_position FROM rental_requests
-           WHERE book_id = ? AND status = 'queued'
-           ORDER BY queue_position ASC LIMIT 1''',
-        [book_id], one=True
-    )
+    next_in_queue = query_db(NEXT_IN_QUEUE_QUERY, [book_id], one=True)
     if next_in_queue:
-        db.execute(
-            'UPDATE rental_requests SET status = ?, queue_position = NULL WHERE id = ?',
-            ['pending', next_in_queue['id']]
-        )
-        # Decrement remaining queue positions
-        db.execute(
-            '''UPDATE rental_requests
-               SET queue_position = queue_position - 1
-               WHERE book_id = ? AND status = 'queued' AND queue_position > ?''',
-            [book_id, next_in_queue['queue_position']]
-        )
+        db.execute('UPDATE rental_requests SET status = ? WHERE id = ?', ['pending', next_in_queue['id']])
+        publish(db, 'rental', action='promoted', id=next_in_queue['id'], book_id=book_id, status='pending')
     else:
         db.execute('UPDATE books SET available = 1 WHERE id = ?', [book_id])
+        publish(db, 'book', action='available', id=book_id)
+
+
+def due_window(days=None):
+    """Return the date modifier for loans due within days (default RENTAL_DUE_SOON_DAYS)."""
+    if days is None:
+        days = current_app.config['RENTAL_DUE_SOON_DAYS']
+    return f'+{days} days'
 
 
-def _remove_from_queue(db, book_id, position):
-    """Remove a queued entry and reorder remaining positions."""
-    db.execute(
-        '''UPDATE rental_requests
-           SET queue_position = queue_position - 1
-           WHERE book_id = ? AND status = 'queued' AND queue_position > ?''',
-        [book_id, position]
-    )
+def _parse_date(value, name):
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise ValueError(f'{name} must be a date (YYYY-MM-DD)')
+
+
+def _journal_filters(args):
+    """Build the WHERE clause and params for the journal filters in request args.
+
+    Raises ValueError for a malformed date.
+    """
+    where = ['1=1']
+    params = []
+
+    for arg, column in (
+        ('reader_id', 'r.reader_id'),
+        ('status', 'r.status'),
+        ('book_id', 'r.book_id'),
+        ('child_id', 'r.child_id'),
+    ):
+        value = args.get(arg)
+        if value:
+            where.append(f'{column} = ?')
+            params.append(value)
+
+    # Dates are inclusive and compare against requested_at
+    if args.get('from'):
+        where.append('r.requested_at >= ?')
+        params.append(_parse_date(args['from'], 'from'))
+    if args.get('to'):
+        where.append("r.requested_at < date(?, '+1 day')")
+        params.append(_parse_date(args['to'], 'to'))
+
+    renter = args.get('renter', '').strip()
+    if renter:
+        where.append('instr(casefold(r.renter_name), ?)')
+        params.append(renter.casefold())
+
+    return ' AND '.join(where), params
 
 
 @rentals_bp.route('', methods=['GET'])
 @admin_required
+# Journal pages also show book authors and child names
+@etag_cached('rentals', 'books', 'children')
 def get_rentals():
-    """Get all rental requests. Supports ?reader_id=xxx filter. Admin only."""
-    reader_id = request.args.get('reader_id')
-    status = request.args.get('status')
+    """Get rental requests, newest first. Admin only.
+
+    Filters: ?reader_id=, ?status=, ?book_id=, ?child_id=, ?from= and ?to=
+    (inclusive YYYY-MM-DD on the request date) and ?renter= (case-insensitive
+    text in the renter name). Without ?limit= or ?cursor= the full list is
+    returned. With either, the response is a keyset page { items,
+    next_cursor, total } whose rows also carry book_author and child_name.
+    """
+    try:
+        where, args = _journal_filters(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        rentals = query_db(
+            f'{RENTALS_WITH_POSITION} WHERE {where} ORDER BY r.requested_at DESC, r.id DESC', args
+        )
+        return jsonify(rentals)
+
+    try:
+        rentals, next_cursor = paginate(
+            JOURNAL_COLUMNS, f'{JOURNAL_FROM} WHERE {where}', args,
+            JOURNAL_ORDER,
+            parse_limit(request.args.get('limit')),
+            cursor=request.args.get('cursor'),
+            descending=True,
+        )
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+
+    total = query_db(f'SELECT COUNT(*) AS total FROM rental_requests r WHERE {where}', args, one=True)['total']
+
+    return jsonify({
+        'items': rentals,
+        'next_cursor': next_cursor,
+        'total': total,
+    })
+
+
+@rentals_bp.route('/export', methods=['GET'])
+@admin_required
+def export_rentals():
+    """Download the rental journal as ?format=csv (default) or xlsx. Admin only.
 
-    query = 'SELECT * FROM rental_requests WHERE 1=1'
-    args = []
+    Takes the same filters as the journal listing. Rows are read in keyset
+    batches of EXPORT_BATCH_SIZE and written out as they arrive, so memory
+    stays flat however long the journal is.
+    """
+    export_format = request.args.get('format', 'csv')
+    if export_format not in rental_export.FORMATS:
+        return jsonify({'error': f'format must be one of: {", ".join(rental_export.FORMATS)}'}), 400
+    try:
+        where, args = _journal_filters(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    def rows():
+        cursor = None
+        while True:
+            batch, cursor = paginate(
+                JOURNAL_COLUMNS, f'{JOURNAL_FROM} WHERE {where}', args,
+                JOURNAL_ORDER, EXPORT_BATCH_SIZE, cursor=cursor, descending=True,
+            )
+            yield from batch
+            if cursor is None:
+                return
 
-    if reader_id:
-        query += ' AND reader_id = ?'
-        args.append(reader_id)
+    mimetype, chunks = rental_export.FORMATS[export_format]
+    response = Response(stream_with_context(chunks(rows())), mimetype=mimetype)
+    filename = f'rentals-{date.today().isoformat()}.{export_format}'
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
 
-    if status:
-        query += ' AND status = ?'
-        args.append(status)
 
-    query += ' ORDER BY requested_at DESC'
+@rentals_bp.route('/overdue', methods=['GET'])
+@admin_required
+def get_overdue():
+    """Get loans that are overdue or due soon, soonest due first. Admin only.
 
-    rentals = query_db(query, args)
-    return jsonify(rentals)
+    ?days= widens or narrows the due-soon window (default
+    RENTAL_DUE_SOON_DAYS). Returns { overdue, due_soon, days }; each row
+    carries the renter's and reader's contact details and days_overdue
+    (negative for loans not yet due).
+    """
+    days = request.args.get('days', current_app.config['RENTAL_DUE_SOON_DAYS'])
+    try:
+        days = int(days)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'days must be an integer'}), 400
+    if not 0 <= days <= MAX_DUE_SOON_DAYS:
+        return jsonify({'error': f'days must be between 0 and {MAX_DUE_SOON_DAYS}'}), 400
+
+    rentals = query_db(OVERDUE_QUERY, [due_window(days)])
+    return jsonify({
+        'overdue': [r for r in rentals if r['days_overdue'] > 0],
+        'due_soon': [r for r in rentals if r['days_overdue'] <= 0],
+        'days': days,
+    })
 
 
 @rentals_bp.route('', methods=['POST'])
@@ -79,112 +250,114 @@ def create_rental():
             return jsonify({'error': f'{field} is required'}), 400
 
     rental_id = str(uuid.uuid4())
-    db = get_db()
-
-    # Check book availability
-    book = query_db('SELECT available FROM books WHERE id = ?', [data['book_id']], one=True)
-    if not book:
-        return jsonify({'error': 'Book not found'}), 404
 
-    auto_approve = data.get('auto_approve', False)
-
-    # Auto-match or create reader when reader_id not provided
-    reader_id = data.get('reader_id')
-    child_id = data.get('child_id')
-    renter_phone = data['renter_phone']
-    renter_name = data['renter_name']
-
-    if not reader_id and renter_phone:
-        existing = query_db(
-            'SELECT id FROM readers WHERE phone1 = ? OR phone2 = ?',
-            [renter_phone, renter_phone], one=True
-        )
-        if existing:
-            reader_id = existing['id']
-        else:
-            parts = renter_name.strip().rsplit(' ', 1)
-            if len(parts) == 2:
-                p_name, p_surname = parts[0], parts[1]
+    # Availability, queue tail and the insert must see one consistent state,
+    # or two requests could both take the same queue slot
+    def create(db):
+        # Check book availability
+        book = query_db('SELECT available FROM books WHERE id = ?', [data['book_id']], one=True)
+        if not book:
+            return {'error': 'Book not found'}, 404
+
+        auto_approve = data.get('auto_approve', False)
+
+        # Auto-match or create reader when reader_id not provided
+        reader_id = data.get('reader_id')
+        child_id = data.get('child_id')
+        renter_phone = data['renter_phone']
+        renter_name = data['renter_name']
+
+        if not reader_id and renter_phone:
+            existing_id = find_reader_by_phone(db, renter_phone)
+            if existing_id:
+                reader_id = existing_id
             else:
-                p_name, p_surname = parts[0], parts[0]
-            reader_id = str(uuid.uuid4())
+                parts = renter_name.strip().rsplit(' ', 1)
+                if len(parts) == 2:
+                    p_name, p_surname = parts[0], parts[1]
+                else:
+                    p_name, p_surname = parts[0], parts[0]
+                reader_id = str(uuid.uuid4())
+                db.execute(
+                    'INSERT INTO readers (id, parent_name, parent_surname, phone1, address) VALUES (?, ?, ?, ?, ?)',
+                    [reader_id, p_name, p_surname, renter_phone, 'не вказано']
+                )
+                sync_reader_phones(db, reader_id, [renter_phone])
+
+        if book['available'] and auto_approve:
+            # Admin-created: auto-approve and mark book unavailable immediately
+            now = datetime.utcnow().isoformat()
+            db.execute(
+                '''INSERT INTO rental_requests
+                   (id, book_id, book_title, renter_name, renter_phone, renter_email,
+                    rental_duration, status, approved_at, reader_id, child_id)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, 'approved', ?, ?, ?)''',
+                [
+                    rental_id,
+                    data['book_id'],
+                    data['book_title'],
+                    data['renter_name'],
+                    data['renter_phone'],
+                    data.get('renter_email', ''),
+                    data['rental_duration'],
+                    now,
+                    reader_id,
+                    child_id
+                ]
+            )
+            db.execute('UPDATE books SET available = 0 WHERE id = ?', [data['book_id']])
+        elif book['available']:
+            # Book is available — pending rental request (book stays available until admin approves)
             db.execute(
-                'INSERT INTO readers (id, parent_name, parent_surname, phone1, address) VALUES (?, ?, ?, ?, ?)',
-                [reader_id, p_name, p_surname, renter_phone, 'не вказано']
+                '''INSERT INTO rental_requests
+                   (id, book_id, book_title, renter_name, renter_phone, renter_email,
+                    rental_duration, reader_id, child_id)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                [
+                    rental_id,
+                    data['book_id'],
+                    data['book_title'],
+                    data['renter_name'],
+                    data['renter_phone'],
+                    data.get('renter_email', ''),
+                    data['rental_duration'],
+                    reader_id,
+                    child_id
+                ]
             )
+        else:
+            # Book is unavailable — queue reservation behind everyone who ever
+            # queued for it (sequence values are never reused)
+            max_seq = query_db(QUEUE_TAIL_QUERY, [data['book_id']], one=True)
+            next_seq = (max_seq['max_seq'] or 0) + 1
 
-    if book['available'] and auto_approve:
-        # Admin-created: auto-approve and mark book unavailable immediately
-        now = datetime.utcnow().isoformat()
-        db.execute(
-            '''INSERT INTO rental_requests
-               (id, book_id, book_title, renter_name, renter_phone, renter_email,
-                rental_duration, status, approved_at, reader_id, child_id)
-               VALUES (?, ?, ?, ?, ?, ?, ?, 'approved', ?, ?, ?)''',
-            [
-                rental_id,
-                data['book_id'],
-                data['book_title'],
-                data['renter_name'],
-                data['renter_phone'],
-                data.get('renter_email', ''),
-                data['rental_duration'],
-                now,
-                reader_id,
-                child_id
-            ]
-        )
-        db.execute('UPDATE books SET available = 0 WHERE id = ?', [data['book_id']])
-    elif book['available']:
-        # Book is available — pending rental request (book stays available until admin approves)
-        db.execute(
-            '''INSERT INTO rental_requests
-               (id, book_id, book_title, renter_name, renter_phone, renter_email,
-                rental_duration, reader_id, child_id)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-            [
-                rental_id,
-                data['book_id'],
-                data['book_title'],
-                data['renter_name'],
-                data['renter_phone'],
-                data.get('renter_email', ''),
-                data['rental_duration'],
-                reader_id,
-                child_id
-            ]
-        )
-    else:
-        # Book is unavailable — queue reservation
-        max_pos = query_db(
-            'SELECT MAX(queue_position) as max_pos FROM rental_requests WHERE book_id = ? AND status = ?',
-            [data['book_id'], 'queued'], one=True
-        )
-        next_position = (max_pos['max_pos'] or 0) + 1
-
-        db.execute(
-            '''INSERT INTO rental_requests
-               (id, book_id, book_title, renter_name, renter_phone, renter_email,
-                rental_duration, status, queue_position, reader_id, child_id)
-               VALUES (?, ?, ?, ?, ?, ?, ?, 'queued', ?, ?, ?)''',
-            [
-                rental_id,
-                data['book_id'],
-                data['book_title'],
-                data['renter_name'],
-                data['renter_phone'],
-                data.get('renter_email', ''),
-                data['rental_duration'],
-                next_position,
-                reader_id,
-                child_id
-            ]
-        )
+            db.execute(
+                '''INSERT INTO rental_requests
+                   (id, book_id, book_title, renter_name, renter_phone, renter_email,
+                    rental_duration, status, queue_seq, reader_id, child_id)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, 'queued', ?, ?, ?)''',
+                [
+                    rental_id,
+                    data['book_id'],
+                    data['book_title'],
+                    data['renter_name'],
+                    data['renter_phone'],
+                    data.get('renter_email', ''),
+                    data['rental_duration'],
+                    next_seq,
+                    reader_id,
+                    child_id
+                ]
+            )
 
-    db.commit()
+        rental = _get_rental(rental_id)
+        publish(db, 'rental', action='created', id=rental_id, book_id=rental['book_id'], status=rental['status'])
+        if rental['status'] == 'approved':
+            publish(db, 'book', action='unavailable', id=rental['book_id'])
+        return rental, 201
 
-    rental = query_db('SELECT * FROM rental_requests WHERE id = ?', [rental_id], one=True)
-    return jsonify(rental), 201
+    body, status = write_transaction(create)
+    return jsonify(body), status
 
 
 @rentals_bp.route('/<rental_id>/status', methods=['PUT'])
@@ -194,10 +367,6 @@ def update_rental_status(rental_id):
 
     Accepts { status: "approved" | "declined" | "returned" }.
     """
-    rental = query_db('SELECT * FROM rental_requests WHERE id = ?', [rental_id], one=True)
-    if not rental:
-        return jsonify({'error': 'Rental request not found'}), 404
-
     data = request.get_json()
     if not data or 'status' not in data:
         return jsonify({'error': 'status is required'}), 400
@@ -206,51 +375,59 @@ def update_rental_status(rental_id):
     if new_status not in ('approved', 'declined', 'returned'):
         return jsonify({'error': 'status must be "approved", "declined", or "returned"'}), 400
 
-    db = get_db()
+    # The rental is re-read under the write lock, so concurrent admins act on
+    # its current status (no double approvals, returns or queue shifts)
+    def update(db):
+        rental = _get_rental(rental_id)
+        if not rental:
+            return {'error': 'Rental request not found'}, 404
+
+        if new_status == 'approved':
+            if rental['status'] == 'approved':
+                return rental, 200
+            if rental['status'] not in ('pending', 'queued'):
+                return {'error': 'Only pending or queued rentals can be approved'}, 400
+            other = query_db(
+                "SELECT id FROM rental_requests WHERE book_id = ? AND status = 'approved' AND id != ?",
+                [rental['book_id'], rental_id], one=True
+            )
+            if other:
+                return {'error': 'Book is already rented out'}, 409
 
-    if new_status == 'approved':
-        now = datetime.utcnow().isoformat()
-        db.execute(
-            'UPDATE rental_requests SET status = ?, approved_at = ? WHERE id = ?',
-            ['approved', now, rental_id]
-        )
-        # Mark book as unavailable on approval
-        db.execute('UPDATE books SET available = 0 WHERE id = ?', [rental['book_id']])
-
-    elif new_status == 'returned':
-        if rental['status'] != 'approved':
-            return jsonify({'error': 'Only approved rentals can be returned'}), 400
-        now = datetime.utcnow().isoformat()
-        db.execute(
-            'UPDATE rental_requests SET status = ?, return_date = ? WHERE id = ?',
-            ['returned', now, rental_id]
-        )
-        _promote_next_or_release(db, rental['book_id'])
+            now = datetime.utcnow().isoformat()
+            db.execute(
+                'UPDATE rental_requests SET status = ?, approved_at = ? WHERE id = ?',
+                ['approved', now, rental_id]
+            )
+            # Mark book as unavailable on approval
+            db.execute('UPDATE books SET available = 0 WHERE id = ?', [rental['book_id']])
+            publish(db, 'book', action='unavailable', id=rental['book_id'])
+
+        elif new_status == 'returned':
+            if rental['status'] != 'approved':
+                return {'error': 'Only approved rentals can be returned'}, 400
+            now = datetime.utcnow().isoformat()
+            db.execute(
+                'UPDATE rental_requests SET status = ?, return_date = ? WHERE id = ?',
+                ['returned', now, rental_id]
+            )
+            _promote_next_or_release(db, rental['book_id'])
 
-    elif new_status == 'declined':
-        current_status = rental['status']
-        db.execute(
-            'UPDATE rental_requests SET status = ? WHERE id = ?',
-            ['declined', rental_id]
-        )
-        if current_status == 'queued' and rental['queue_position'] is not None:
-            _remove_from_queue(db, rental['book_id'], rental['queue_position'])
+        elif new_status == 'declined':
+            if rental['status'] == 'declined':
+                return rental, 200
+            db.execute('UPDATE rental_requests SET status = ? WHERE id = ?', ['declined', rental_id])
 
-    db.commit()
+        publish(db, 'rental', action=new_status, id=rental_id, book_id=rental['book_id'], status=new_status)
+        return _get_rental(rental_id), 200
 
-    updated = query_db('SELECT * FROM rental_requests WHERE id = ?', [rental_id], one=True)
-    return jsonify(updated)
+    body, status = write_transaction(update)
+    return jsonify(body), status
 
 
 @rentals_bp.route('/queue/<book_id>', methods=['GET'])
 @admin_required
 def get_queue(book_id):
     """Get queue entries for a book. Admin only."""
-    entries = query_db(
-        '''SELECT id, renter_name, queue_position, requested_at
-           FROM rental_requests
-           WHERE book_id = ? AND status = 'queued'
-           ORDER BY queue_position ASC''',
-        [book_id]
-    )
+    entries = query_db(QUEUE_QUERY, [book_id])
     return jsonify(entries)
@@ -3,14 +3,18 @@ from flask import Blueprint, request, jsonify
 
 from app.auth import admin_required
 from app.database import get_db, query_db
+from app.versions import etag_cached
 
 series_bp = Blueprint('series', __name__, url_prefix='/api/series')
 
+SERIES_QUERY = 'SELECT * FROM series ORDER BY name'
+
 
 @series_bp.route('', methods=['GET'])
+@etag_cached('series')
 def get_series():
     """Get all series."""
-    series = query_db('SELECT * FROM series ORDER BY name')
+    series = query_db(SERIES_QUERY)
     return jsonify(series)
 
 
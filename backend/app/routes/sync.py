@@ -0,0 +1,64 @@
+from flask import Blueprint, request, jsonify
+
+from app.auth import admin_required
+from app.database import read_transaction
+from app.pagination import parse_limit
+
+sync_bp = Blueprint('sync', __name__, url_prefix='/api/sync')
+
+# Entities tracked by the sync_changes triggers (migrations/0013_sync_changes.sql)
+SYNC_ENTITIES = ('books', 'readers', 'children', 'rental_requests')
+
+DEFAULT_SYNC_LIMIT = 1000
+MAX_SYNC_LIMIT = 5000
+
+CHANGES_QUERY = 'SELECT seq, entity, row_id, deleted FROM sync_changes WHERE seq > ? ORDER BY seq LIMIT ?'
+
+
+def _read_changes(db, since, limit):
+    changes = db.execute(CHANGES_QUERY, [since, limit + 1]).fetchall()
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    changed_ids = {entity: [] for entity in SYNC_ENTITIES}
+    deleted = {entity: [] for entity in SYNC_ENTITIES}
+    for change in changes:
+        (deleted if change['deleted'] else changed_ids)[change['entity']].append(change['row_id'])
+
+    changed = {}
+    for entity, ids in changed_ids.items():
+        rows = []
+        if ids:
+            placeholders = ', '.join('?' * len(ids))
+            rows = db.execute(f'SELECT * FROM {entity} WHERE id IN ({placeholders})', ids).fetchall()
+        changed[entity] = [dict(row) for row in rows]
+    return changes, changed, deleted, has_more
+
+
+@sync_bp.route('', methods=['GET'])
+@admin_required
+def get_changes():
+    """Return rows changed or deleted after ?since=<seq> (admin only).
+
+    Response: { changed: {entity: [rows]}, deleted: {entity: [ids]}, since,
+    has_more }. Pass the returned `since` back to get the next page or, once
+    has_more is false, the next batch of changes; ?since=0 (the default)
+    returns every row. At most ?limit= changes are returned per call.
+    Rental rows carry queue_seq rather than a queue position, which moves
+    whenever someone ahead leaves the queue.
+    """
+    try:
+        since = int(request.args.get('since', 0))
+    except ValueError:
+        return jsonify({'error': 'since must be an integer'}), 400
+    limit = parse_limit(request.args.get('limit'), default=DEFAULT_SYNC_LIMIT, maximum=MAX_SYNC_LIMIT)
+
+    # One read transaction, so the rows match the change log they were picked from
+    changes, changed, deleted, has_more = read_transaction(_read_changes, since, limit)
+
+    return jsonify({
+        'changed': changed,
+        'deleted': deleted,
+        'since': changes[-1]['seq'] if changes else since,
+        'has_more': has_more,
+    })
@@ -4,12 +4,15 @@ from flask import Blueprint, request, jsonify, current_app
 
 from app.auth import admin_required
 from app.database import get_db, query_db
+from app.events import publish
 
 upload_bp = Blueprint('upload', __name__, url_prefix='/api/upload')
 
 ALLOWED_IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 ALLOWED_MEDIA_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp', 'mp4', 'mp3', 'pdf'}
 
+NEXT_MEDIA_ORDER_QUERY = 'SELECT MAX(display_order) as max_order FROM book_media WHERE book_id = ?'
+
 
 def allowed_file(filename, allowed_extensions):
     """Check if a filename has an allowed extension."""
@@ -73,11 +76,7 @@ def upload_media():
         display_order = 0
 
         # Get next display order
-        existing = query_db(
-            'SELECT MAX(display_order) as max_order FROM book_media WHERE book_id = ?',
-            [book_id],
-            one=True
-        )
+        existing = query_db(NEXT_MEDIA_ORDER_QUERY, [book_id], one=True)
         if existing and existing['max_order'] is not None:
             display_order = existing['max_order'] + 1
 
@@ -86,6 +85,7 @@ def upload_media():
             'INSERT INTO book_media (id, book_id, file_url, file_type, display_order) VALUES (?, ?, ?, ?, ?)',
             [media_id, book_id, url, file_type, display_order]
         )
+        publish(db, 'book', action='updated', id=book_id)
         db.commit()
 
         media = query_db('SELECT * FROM book_media WHERE id = ?', [media_id], one=True)
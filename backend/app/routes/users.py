@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
 
-from app.auth import admin_required
+from app.auth import admin_required, invalidate_user
 from app.database import get_db, query_db
 
 users_bp = Blueprint('users', __name__, url_prefix='/api/users')
@@ -38,6 +38,7 @@ def update_user_role(user_id):
         [new_role, user_id]
     )
     db.commit()
+    invalidate_user(user_id)
 
     updated = query_db(
         'SELECT id, email, full_name, role, avatar_url, created_at, updated_at FROM users WHERE id = ?',
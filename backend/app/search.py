@@ -0,0 +1,68 @@
+import re
+
+# Ukrainian text uses several apostrophe characters interchangeably; they are
+# stripped both when indexing (see migrations/0003_books_fts.sql) and
+# when parsing queries.
+APOSTROPHES = ("'", '’', 'ʼ')
+
+# bm25 weights for books_fts columns: title, author, description, series, publisher
+BM25_WEIGHTS = (10.0, 5.0, 1.0, 2.0, 2.0)
+
+_TOKEN_RE = re.compile(r'[^\W_]+')
+
+
+def normalize_search_text(text):
+    """Strip apostrophe variants so they match the indexed form."""
+    for apostrophe in APOSTROPHES:
+        text = text.replace(apostrophe, '')
+    return text
+
+
+def tokenize(text):
+    """Casefolded words of `text`, apostrophes removed ("Мар'яна" -> ["маряна"])."""
+    return _TOKEN_RE.findall(normalize_search_text(text or '').casefold())
+
+
+def build_fts_query(text):
+    """Turn free-form user input into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term that must match the start of
+    its own word in the book, so "котиг мя" matches "Котигорошко і м'яч"
+    (but "кот гор" does not), and user input can never inject FTS5 syntax.
+    Returns None if the input contains no searchable words.
+    """
+    tokens = _TOKEN_RE.findall(normalize_search_text(text or ''))
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _strip_apostrophes_sql(expr):
+    """SQL expression mirroring normalize_search_text."""
+    for apostrophe in APOSTROPHES:
+        quoted = apostrophe.replace("'", "''")
+        expr = f"replace({expr}, '{quoted}', '')"
+    return expr
+
+
+def rebuild_books_fts(db):
+    """Repopulate books_fts from books, series and publishers.
+
+    Runs inside the caller's transaction.
+    """
+    db.execute('DELETE FROM books_fts')
+    db.execute(
+        f'''INSERT INTO books_fts (rowid, title, author, description, series, publisher)
+            SELECT b.rowid, {_strip_apostrophes_sql('b.title')}, {_strip_apostrophes_sql('b.author')},
+                   {_strip_apostrophes_sql('b.description')}, {_strip_apostrophes_sql('s.name')},
+                   {_strip_apostrophes_sql('p.name')}
+            FROM books b
+            LEFT JOIN series s ON s.id = b.series_id
+            LEFT JOIN publishers p ON p.id = b.publisher_id'''
+    )
+
+
+def configure_books_fts_rank(db):
+    """Make `rank` on books_fts use the weighted bm25 from BM25_WEIGHTS."""
+    rank = f'bm25({", ".join(str(w) for w in BM25_WEIGHTS)})'
+    db.execute("INSERT INTO books_fts (books_fts, rank) VALUES ('rank', ?)", [rank])
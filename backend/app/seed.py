@@ -3,15 +3,12 @@ from uuid import uuid4
 
 from app import create_app
 from app.auth import hash_password
-from app.database import init_db, get_db, query_db
+from app.catalog_sync import apply_sync, plan_sync, summarize
+from app.database import get_db, query_db
+from app.excel import iter_book_rows
+from app.importer import COVER_COLORS
 
 
-COVER_COLORS = [
-    '#4A90E2', '#E74C3C', '#2ECC71', '#F39C12', '#9B59B6',
-    '#1ABC9C', '#E67E22', '#3498DB', '#E91E63', '#00BCD4',
-    '#8BC34A', '#FF5722',
-]
-
 BOOKS = [
     {'title': 'Котигорошко', 'category': 'Казки', 'author': 'Народна творчість'},
     {'title': 'Кирпатий казкар', 'category': 'Казки', 'author': 'Іван Франко'},
@@ -37,8 +34,6 @@ def seed():
     app = create_app()
 
     with app.app_context():
-        init_db()
-
         # Check if admin already exists
         existing_admin = query_db(
             'SELECT id FROM users WHERE email = ?',
@@ -112,11 +107,15 @@ def seed():
         print('Seed completed successfully.')
 
 
-def seed_from_excel(filepath):
-    """Seed the database with books from an Excel file.
+def seed_from_excel(filepath, dry_run=False):
+    """Sync the books table with the "КНИГИ" sheet of an Excel file.
 
-    Clears all book-related data (books, categories, series, publishers, book_media, rental_requests)
-    and repopulates from the "КНИГИ" sheet.
+    Only the differences are written (see app/catalog_sync.py): new rows
+    are inserted, changed books updated, and books missing from the sheet
+    removed unless they have rental history. Media and rentals are kept.
+    Loans on the "Книги на руках QUERY" sheet are imported once, matched on
+    book and date, so re-syncing does not bring back returned loans.
+    With dry_run=True, only prints what would change.
 
     Usage:
         python -c "from app.seed import seed_from_excel; seed_from_excel('../Бібліотечка Українського дитячого клубу.xlsx')"
@@ -126,155 +125,25 @@ def seed_from_excel(filepath):
     app = create_app()
 
     with app.app_context():
-        init_db()
         db = get_db()
 
-        # --- Clear book-related tables (FK order) ---
-        db.execute('DELETE FROM book_media')
-        db.execute('DELETE FROM rental_requests')
-        db.execute('DELETE FROM books')
-        db.execute('DELETE FROM categories')
-        db.execute('DELETE FROM series')
-        db.execute('DELETE FROM publishers')
-        print('Cleared existing book-related data.')
-
-        # --- Read Excel ---
-        wb = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
-        ws = wb['КНИГИ']
-
-        rows = list(ws.iter_rows(min_row=2, values_only=True))  # skip header
-        wb.close()
-        print(f'Read {len(rows)} rows from Excel.')
-
-        # --- First pass: collect unique categories, publishers, series ---
-        categories_set = set()
-        publishers_dict = {}  # name -> city
-        series_set = set()
-
-        for row in rows:
-            title = row[5]
-            author = row[4]
-            if not title or not str(title).strip():
-                continue
-
-            cat = row[3]
-            if cat and str(cat).strip():
-                categories_set.add(str(cat).strip())
-
-            pub_name = row[9]
-            pub_city = row[8]
-            if pub_name and str(pub_name).strip():
-                pub_name_clean = str(pub_name).strip()
-                pub_city_clean = str(pub_city).strip() if pub_city else ''
-                if pub_name_clean not in publishers_dict:
-                    publishers_dict[pub_name_clean] = pub_city_clean
-
-            ser = row[7]
-            if ser and str(ser).strip():
-                series_set.add(str(ser).strip())
-
-        # --- Insert categories ---
-        category_ids = {}
-        for name in sorted(categories_set):
-            cat_id = str(uuid4())
-            db.execute('INSERT INTO categories (id, name) VALUES (?, ?)', [cat_id, name])
-            category_ids[name] = cat_id
-        print(f'Created {len(category_ids)} categories.')
-
-        # --- Insert publishers ---
-        publisher_ids = {}
-        for name in sorted(publishers_dict.keys()):
-            pub_id = str(uuid4())
-            city = publishers_dict[name]
-            db.execute('INSERT INTO publishers (id, name, city) VALUES (?, ?, ?)', [pub_id, name, city])
-            publisher_ids[name] = pub_id
-        print(f'Created {len(publisher_ids)} publishers.')
-
-        # --- Insert series ---
-        series_ids = {}
-        for name in sorted(series_set):
-            s_id = str(uuid4())
-            db.execute('INSERT INTO series (id, name) VALUES (?, ?)', [s_id, name])
-            series_ids[name] = s_id
-        print(f'Created {len(series_ids)} series.')
-
-        # --- Insert books ---
-        colors = COVER_COLORS[:]
-        book_count = 0
-        skipped = 0
-
-        for row in rows:
-            title = row[5]
-            author = row[4]
-            if not title or not str(title).strip():
-                skipped += 1
-                continue
-
-            title = str(title).strip()
-            author = str(author).strip() if author else ''
+        sheet_books = list(iter_book_rows(filepath))
+        print(f'Read {len(sheet_books)} books from Excel.')
 
-            book_id = str(uuid4())
-            color = random.choice(colors)
-
-            # Category
-            cat_name = str(row[3]).strip() if row[3] else None
-            cat_id = category_ids.get(cat_name) if cat_name else None
-
-            # Inventory number
-            inv = row[2]
-            inventory_number = None
-            if inv is not None:
-                try:
-                    inventory_number = int(float(inv))
-                except (ValueError, TypeError):
-                    pass
-
-            # Series
-            ser = str(row[7]).strip() if row[7] else None
-            series_id = series_ids.get(ser) if ser else None
-
-            # Publisher
-            pub = str(row[9]).strip() if row[9] else None
-            publisher_id = publisher_ids.get(pub) if pub else None
-
-            # Publication year
-            year_val = row[10]
-            publication_year = None
-            if year_val is not None:
-                try:
-                    publication_year = str(int(float(year_val)))
-                except (ValueError, TypeError):
-                    publication_year = str(year_val).strip() if str(year_val).strip() else None
-
-            # ISBN
-            isbn = str(row[11]).strip() if row[11] else None
-
-            # Supplier
-            supplier = str(row[12]).strip() if row[12] else None
-
-            # Age
-            age = str(row[14]).strip() if row[14] else None
-
-            # Description
-            description = str(row[15]).strip() if row[15] else None
-
-            # Available — col 6 (Наявність) is more complete than col 18
-            avail_val = row[6]
-            available = 0 if avail_val and str(avail_val).strip() == 'ЧИТАЮТЬ' else 1
+        plan = plan_sync(db, sheet_books)
+        for key, count in summarize(plan).items():
+            print(f'  {key}: {count}')
+        for book_id, book, changed in plan['update'][:20]:
+            print(f'    ~ {book["title"]}: {", ".join(changed)}')
+        for book in plan['keep'][:20]:
+            print(f'    kept (has rentals): {book["title"]}')
 
-            db.execute(
-                '''INSERT INTO books (id, title, author, category, category_id, series_id, publisher_id,
-                   cover_color, available, description, age, publication_year, isbn,
-                   inventory_number, supplier, new_book)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)''',
-                [book_id, title, author, cat_name or '', cat_id, series_id, publisher_id,
-                 color, available, description, age, publication_year, isbn,
-                 inventory_number, supplier]
-            )
-            book_count += 1
+        if dry_run:
+            print('Dry run: no changes written.')
+            return
 
-        db.commit()
-        print(f'Created {book_count} books. Skipped {skipped} rows (missing title/author).')
+        apply_sync(db, plan)
+        print('Books synced.')
 
         # --- Create approved rental requests from "Книги на руках QUERY" sheet ---
         wb2 = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
@@ -286,7 +155,23 @@ def seed_from_excel(filepath):
         for b in all_books:
             title_lookup[b[1].lower()] = (b[0], b[1])
 
+        # Books already out on an approved rental
+        on_loan = {
+            row[0] for row in db.execute(
+                "SELECT DISTINCT book_id FROM rental_requests WHERE status = 'approved'"
+            )
+        }
+        # Loans an earlier sync already imported, whatever happened to them
+        # since (a loan returned in the app must not come back), keyed like
+        # the rows inserted below
+        imported = {
+            (row[0], row[1]) for row in db.execute(
+                'SELECT book_id, requested_at FROM rental_requests'
+            )
+        }
+
         rental_count = 0
+        already_imported = 0
         unmatched = []
 
         for row in ws2.iter_rows(min_row=1, values_only=True):
@@ -310,6 +195,15 @@ def seed_from_excel(filepath):
             approved_at = None
             if rental_date and hasattr(rental_date, 'strftime'):
                 approved_at = rental_date.strftime('%Y-%m-%d %H:%M:%S')
+            requested_at = approved_at or '2025-01-01 00:00:00'
+
+            if (book_id, requested_at) in imported:
+                already_imported += 1
+                continue
+            if book_id in on_loan:
+                continue
+            on_loan.add(book_id)
+            imported.add((book_id, requested_at))
 
             req_id = str(uuid4())
             db.execute(
@@ -319,7 +213,7 @@ def seed_from_excel(filepath):
                    VALUES (?, ?, ?, ?, ?, ?, ?, 'approved', ?, ?)''',
                 [req_id, book_id, original_title, renter_name,
                  '7777777', 'blank@gmail.com', 4,
-                 approved_at or '2025-01-01 00:00:00', approved_at]
+                 requested_at, approved_at]
             )
 
             # Ensure book is marked unavailable
@@ -329,13 +223,14 @@ def seed_from_excel(filepath):
         wb2.close()
         db.commit()
 
-        print(f'Created {rental_count} approved rental requests.')
+        print(f'Created {rental_count} approved rental requests '
+              f'({already_imported} already imported by an earlier sync).')
         if unmatched:
             print(f'  Could not match {len(unmatched)} titles:')
             for t in unmatched:
                 print(f'    - {t}')
 
-        print('Excel seed completed successfully.')
+        print('Excel sync completed successfully.')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,59 @@
+"""Data versions and conditional GET support.
+
+Every write to a versioned table bumps its scope in `data_versions` via
+triggers (migrations/0006_data_versions.sql), so a version changes whenever
+any process changes the data, no matter which code path wrote it.
+"""
+import hashlib
+from functools import wraps
+
+from flask import request, make_response, current_app
+
+from app.database import query_db
+
+
+def get_versions(scopes):
+    """Return {scope: version} for the given scopes."""
+    placeholders = ', '.join('?' for _ in scopes)
+    rows = query_db(
+        f'SELECT scope, version FROM data_versions WHERE scope IN ({placeholders})',
+        list(scopes)
+    )
+    return {row['scope']: row['version'] for row in rows}
+
+
+def etag_cached(*scopes, extra_scopes=None):
+    """Decorator adding a strong ETag derived from the versions of `scopes`.
+
+    `extra_scopes`, if given, is called on each request and returns more
+    scopes that request's response depends on (e.g. only when an optional
+    section is included).
+
+    A request whose If-None-Match carries the current ETag gets a 304
+    without the view running. Versions are read before the view so a
+    concurrent write can only make the ETag older than the body, never
+    the other way round.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            request_scopes = scopes + tuple(extra_scopes()) if extra_scopes else scopes
+            versions = get_versions(request_scopes)
+            key = ';'.join(f'{scope}={versions.get(scope, 0)}' for scope in request_scopes)
+            digest = hashlib.sha1(f'{key}|{request.full_path}'.encode('utf-8')).hexdigest()
+            etag = f'{request.endpoint}-{digest[:20]}'
+
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+
+        return decorated
+
+    return decorator
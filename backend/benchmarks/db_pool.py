@@ -0,0 +1,89 @@
+"""Compare request throughput with and without the connection pool.
+
+Seeds a throwaway database, then drives a few read endpoints from several
+threads through the Flask test client, once with DB_POOL_SIZE=0 (a new
+connection per request, the old behaviour) and once with pooling.
+
+Usage (from backend/):
+    python -m benchmarks.db_pool [--requests 2000] [--threads 8] [--books 2000]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+ENDPOINTS = [
+    '/api/books?limit=50',
+    '/api/books/filters',
+    '/api/categories',
+    '/api/series',
+]
+
+
+def seed(app, books):
+    from app.database import get_db
+
+    with app.app_context():
+        db = get_db()
+        db.execute("INSERT INTO categories (id, name) VALUES ('c1', 'Казки')")
+        db.executemany(
+            'INSERT INTO books (id, title, author, category, category_id, available) VALUES (?, ?, ?, ?, ?, ?)',
+            [(str(uuid.uuid4()), f'Книга {i}', f'Автор {i % 50}', 'Казки', 'c1', i % 3 != 0) for i in range(books)]
+        )
+        db.commit()
+
+
+def run(pool_size, requests, threads, books):
+    from app import create_app
+    from app.config import Config
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_PATH'] = Config.DATABASE_PATH = os.path.join(tmp, 'bench.db')
+        os.environ['UPLOAD_FOLDER'] = Config.UPLOAD_FOLDER = os.path.join(tmp, 'uploads')
+        Config.DB_POOL_SIZE = pool_size
+        Config.BCRYPT_ROUNDS = 4  # skip calibration, no hashing here
+
+        app = create_app()
+        seed(app, books)
+
+        per_thread = requests // threads
+        errors = []
+
+        def worker():
+            client = app.test_client()
+            for i in range(per_thread):
+                response = client.get(ENDPOINTS[i % len(ENDPOINTS)])
+                if response.status_code != 200:
+                    errors.append(response.status_code)
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        start = time.perf_counter()
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        stats = app.extensions['db_pool'].stats() if 'db_pool' in app.extensions else None
+        return per_thread * threads / elapsed, errors, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--books', type=int, default=2000)
+    parser.add_argument('--pool-size', type=int, default=16)
+    args = parser.parse_args()
+
+    for label, pool_size in (('connect per request', 0), (f'pool of {args.pool_size}', args.pool_size)):
+        rps, errors, stats = run(pool_size, args.requests, args.threads, args.books)
+        print(f'{label:>20}: {rps:8.1f} req/s' + (f'  ({len(errors)} errors)' if errors else ''))
+        if stats:
+            print(f'{"":>20}  pool: {stats}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""Multi-process stress test for the rental state machine.
+
+Several worker processes (each with a few threads, like gunicorn workers)
+share one database file and race through three phases:
+
+1. create rental requests for a handful of books, half of them already
+   rented out (so requests queue) and half available (so they go pending);
+2. all try to approve every pending request;
+3. all try to return every approved rental and decline queued requests.
+
+After the approvals and again at the end it checks that no book has more
+than one approved rental and that no two queued requests for a book share
+a queue sequence number (positions are numbered from it at read time).
+
+Usage (from backend/):
+    python -m benchmarks.rental_stress [--processes 4] [--threads 8] [--requests 400] [--books 6]
+"""
+import argparse
+import collections
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+
+def _worker(env, phase, jobs, barrier, results):
+    os.environ.update(env)
+    from app import create_app
+    from app.auth import generate_token
+
+    app = create_app()
+    with app.app_context():
+        headers = {'Authorization': f'Bearer {generate_token("admin", "admin")}'}
+    statuses = collections.Counter()
+    lock = threading.Lock()
+
+    def run(chunk):
+        client = app.test_client()
+        for job in chunk:
+            if phase == 'create':
+                response = client.post('/api/rentals', json={
+                    'book_id': job, 'book_title': 'Stress', 'renter_name': f'Reader {uuid.uuid4().hex[:6]}',
+                    'renter_phone': f'+38067{random.randint(1000000, 9999999)}', 'rental_duration': 2,
+                })
+            else:
+                rental_id, status = job
+                response = client.put(f'/api/rentals/{rental_id}/status', json={'status': status}, headers=headers)
+            with lock:
+                statuses[response.status_code] += 1
+
+    threads_count = int(env['STRESS_THREADS'])
+    chunks = [jobs[i::threads_count] for i in range(threads_count)]
+    threads = [threading.Thread(target=run, args=(chunk,)) for chunk in chunks]
+    barrier.wait()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    results.put(dict(statuses))
+
+
+def _run_phase(env, phase, jobs_per_process):
+    barrier = multiprocessing.Barrier(len(jobs_per_process))
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_worker, args=(env, phase, jobs, barrier, results))
+        for jobs in jobs_per_process
+    ]
+    start = time.perf_counter()
+    for p in processes:
+        p.start()
+    totals = collections.Counter()
+    for _ in processes:
+        totals.update(results.get())
+    for p in processes:
+        p.join()
+    print(f'{phase:>8}: {sum(totals.values())} requests in {time.perf_counter() - start:.2f}s, status codes {dict(totals)}')
+
+
+def _check(db_path):
+    db = sqlite3.connect(db_path)
+    problems = []
+    for book_id, approved in db.execute(
+        "SELECT book_id, COUNT(*) FROM rental_requests WHERE status = 'approved' GROUP BY book_id HAVING COUNT(*) > 1"
+    ):
+        problems.append(f'book {book_id}: {approved} approved rentals')
+
+    for book_id, seq, count in db.execute(
+        '''SELECT book_id, queue_seq, COUNT(*) FROM rental_requests WHERE queue_seq IS NOT NULL
+           GROUP BY book_id, queue_seq HAVING COUNT(*) > 1'''
+    ):
+        problems.append(f'book {book_id}: {count} queued requests share sequence {seq}')
+    for book_id, missing in db.execute(
+        "SELECT book_id, COUNT(*) FROM rental_requests WHERE status = 'queued' AND queue_seq IS NULL GROUP BY book_id"
+    ):
+        problems.append(f'book {book_id}: {missing} queued requests without a sequence number')
+    db.close()
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--books', type=int, default=6)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            'DATABASE_PATH': os.path.join(tmp, 'stress.db'),
+            'UPLOAD_FOLDER': os.path.join(tmp, 'uploads'),
+            'BCRYPT_ROUNDS': '4',
+            'STRESS_THREADS': str(args.threads),
+        }
+        os.environ.update(env)
+        from app import create_app
+        from app.database import get_db
+
+        app = create_app()
+        with app.app_context():
+            db = get_db()
+            db.execute("INSERT INTO users (id, email, password_hash, role) VALUES ('admin', 'admin@stress', 'x', 'admin')")
+            db.execute("INSERT INTO categories (id, name) VALUES ('c1', 'Stress')")
+            books = [f'book{i}' for i in range(args.books)]
+            for i, book_id in enumerate(books):
+                out = i % 2 == 0
+                db.execute(
+                    "INSERT INTO books (id, title, author, category, category_id, available) VALUES (?, ?, 'A', 'Stress', 'c1', ?)",
+                    [book_id, f'Book {i}', 0 if out else 1]
+                )
+                if out:
+                    db.execute(
+                        '''INSERT INTO rental_requests (id, book_id, book_title, renter_name, renter_phone,
+                           renter_email, rental_duration, status, approved_at)
+                           VALUES (?, ?, 'Stress', 'Holder', '1', '', 2, 'approved', CURRENT_TIMESTAMP)''',
+                        [str(uuid.uuid4()), book_id]
+                    )
+            db.commit()
+
+        create_jobs = [random.choice(books) for _ in range(args.requests)]
+        _run_phase(env, 'create', [create_jobs[i::args.processes] for i in range(args.processes)])
+
+        raw = sqlite3.connect(env['DATABASE_PATH'])
+        pending = [row[0] for row in raw.execute("SELECT id FROM rental_requests WHERE status = 'pending'")]
+        # Every process tries to approve every pending request
+        _run_phase(env, 'approve', [
+            random.sample([(rental_id, 'approved') for rental_id in pending], len(pending))
+            for _ in range(args.processes)
+        ])
+
+        problems = _check(env['DATABASE_PATH'])  # double approvals show up here
+        approved = [row[0] for row in raw.execute("SELECT id FROM rental_requests WHERE status = 'approved'")]
+        queued = [row[0] for row in raw.execute("SELECT id FROM rental_requests WHERE status = 'queued'")]
+        raw.close()
+        finish = [(rental_id, 'returned') for rental_id in approved]
+        finish += [(rental_id, 'declined') for rental_id in random.sample(queued, len(queued) // 3)]
+        _run_phase(env, 'finish', [random.sample(finish, len(finish)) for _ in range(args.processes)])
+
+        problems += [p for p in _check(env['DATABASE_PATH']) if p not in problems]
+
+    for problem in problems:
+        print(f'  {problem}')
+    print(f'{len(problems)} invariant violations.')
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
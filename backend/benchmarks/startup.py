@@ -0,0 +1,58 @@
+"""Measure application startup time (import plus create_app).
+
+Each run is a fresh interpreter, as with a new gunicorn worker or a CLI
+command. The first run starts from an empty database and so includes the
+migrations; the rest start from a current schema and should skip them.
+
+Usage (from backend/):
+    python -m benchmarks.startup [--runs 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROBE = (
+    'import json\n'
+    'from app import create_app\n'
+    'app = create_app()\n'
+    'print(json.dumps(app.extensions["startup_ms"]))\n'
+)
+
+
+def measure(env):
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings['total'] = round(timings['import'] + timings['create_app'], 1)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            DATABASE_PATH=os.path.join(tmp, 'startup.db'),
+            UPLOAD_FOLDER=os.path.join(tmp, 'uploads'),
+            PYTHONPATH=backend_dir,
+        )
+        cold = measure(env)
+        warm = [measure(env) for _ in range(args.runs)]
+
+    print(f'{"fresh database":>16}: {cold["total"]:7.1f} ms  (import {cold["import"]}, create_app {cold["create_app"]})')
+    for key in ('import', 'create_app', 'total'):
+        values = [run[key] for run in warm]
+        print(f'{key:>16}: {statistics.median(values):7.1f} ms median, {max(values):7.1f} ms max over {len(values)} runs')
+
+
+if __name__ == '__main__':
+    main()
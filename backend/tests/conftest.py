@@ -0,0 +1,58 @@
+"""Shared fixtures: an app on a fresh, migrated database in a temp directory."""
+import pytest
+
+from app import create_app
+from app.auth import generate_token
+from app.config import Config
+from app.database import get_db
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'DATABASE_PATH', str(tmp_path / 'library.db'))
+    monkeypatch.setattr(Config, 'UPLOAD_FOLDER', str(tmp_path / 'uploads'))
+    monkeypatch.setattr(Config, 'DB_POOL_SIZE', 0)
+    return create_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def db(app):
+    """A connection to the app's database, inside an app context."""
+    with app.app_context():
+        yield get_db()
+
+
+@pytest.fixture
+def admin_headers(app, db):
+    db.execute(
+        "INSERT INTO users (id, email, password_hash, full_name, role) VALUES ('admin', 'admin@example.com', '', 'Admin', 'admin')"
+    )
+    db.commit()
+    return {'Authorization': f"Bearer {generate_token('admin', 'admin')}"}
+
+
+@pytest.fixture
+def add_book(db):
+    """Return add(book_id, **fields), inserting a book with sensible defaults."""
+    def add(book_id, **fields):
+        book = {'id': book_id, 'title': f'Книга {book_id}', 'author': 'Автор', 'category': 'Казки', **fields}
+        columns = ', '.join(book)
+        db.execute(f"INSERT INTO books ({columns}) VALUES ({', '.join('?' for _ in book)})", list(book.values()))
+        db.commit()
+    return add
+
+
+@pytest.fixture
+def rent(client):
+    """Return rent(book_id, **fields): the response to a public rental request."""
+    def rent(book_id, **fields):
+        return client.post('/api/rentals', json={
+            'book_id': book_id, 'book_title': f'Книга {book_id}', 'renter_name': 'Олена Коваль',
+            'renter_phone': '0671234567', 'rental_duration': 2, **fields,
+        })
+    return rent
@@ -0,0 +1,72 @@
+"""The catalog must load a page of books in a fixed number of queries.
+
+Counts the SQL statements a catalog request runs against 1 book and against
+many; if enriching books ever goes back to a lookup per book (publisher,
+series, ...) the counts differ.
+
+Run from backend/:
+    python -m pytest tests
+"""
+import pytest
+from flask import g
+
+from app import create_app
+from app.config import Config
+from app.database import get_db
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    """Return make(count): an app whose database holds `count` books, and its statement log."""
+    def make(count):
+        app_dir = tmp_path / f'{count}-books'
+        app_dir.mkdir()
+        monkeypatch.setattr(Config, 'DATABASE_PATH', str(app_dir / 'library.db'))
+        monkeypatch.setattr(Config, 'UPLOAD_FOLDER', str(app_dir / 'uploads'))
+        monkeypatch.setattr(Config, 'DB_POOL_SIZE', 0)
+        app = create_app()
+
+        with app.app_context():
+            db = get_db()
+            db.execute("INSERT INTO categories (id, name) VALUES ('c1', 'Казки')")
+            for i in range(count):
+                db.execute("INSERT INTO publishers (id, name, city) VALUES (?, ?, 'Львів')", [f'p{i}', f'Видавництво {i}'])
+                db.execute('INSERT INTO series (id, name) VALUES (?, ?)', [f's{i}', f'Серія {i}'])
+                db.execute(
+                    '''INSERT INTO books (id, title, author, category, category_id, publisher_id, series_id)
+                       VALUES (?, ?, 'Автор', 'Казки', 'c1', ?, ?)''',
+                    [f'b{i}', f'Книга {i}', f'p{i}', f's{i}']
+                )
+            db.commit()
+
+        statements = []
+
+        @app.before_request
+        def trace_statements():
+            get_db().set_trace_callback(statements.append)
+
+        @app.teardown_request
+        def stop_tracing(e=None):
+            if 'db' in g:
+                g.db.set_trace_callback(None)
+
+        return app, statements
+
+    return make
+
+
+@pytest.mark.parametrize('path', [
+    '/api/books',
+    '/api/books?limit=50',
+    '/api/books?limit=50&include=availability',
+    '/api/books/grouped?limit=40',
+])
+def test_catalog_query_count_does_not_grow_with_books(catalog, path):
+    counts = []
+    for count in (1, 25):
+        app, statements = catalog(count)
+        response = app.test_client().get(path)
+        assert response.status_code == 200
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1], f'{path}: {counts[0]} statements for 1 book, {counts[1]} for 25'
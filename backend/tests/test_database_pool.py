@@ -0,0 +1,55 @@
+"""The connection pool stays bounded, reuses warm connections and never
+hands out a connection with an open transaction."""
+import pytest
+
+from app.config import Config
+from app.database import ConnectionPool, PoolExhausted, connect
+
+
+@pytest.fixture
+def pool(tmp_path):
+    path = str(tmp_path / 'pool.db')
+    db = connect(path, vars(Config))
+    db.execute('CREATE TABLE t (x INTEGER)')
+    db.commit()
+    db.close()
+    return ConnectionPool(path, vars(Config), size=2, timeout=0.05)
+
+
+def test_connections_are_tuned(pool):
+    db = pool.acquire()
+    assert db.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    assert db.execute('PRAGMA busy_timeout').fetchone()[0] == Config.SQLITE_BUSY_TIMEOUT_MS
+    assert db.execute('PRAGMA foreign_keys').fetchone()[0] == 1
+    assert db.execute("SELECT casefold('ҐАНОК')").fetchone()[0] == 'ґанок'
+
+
+def test_most_recently_released_connection_is_reused(pool):
+    first, second = pool.acquire(), pool.acquire()
+    pool.release(first)
+    pool.release(second)
+
+    assert pool.acquire() is second
+    assert pool.stats()['size'] == 2
+
+
+def test_exhausted_pool_times_out(pool):
+    pool.acquire()
+    pool.acquire()
+
+    with pytest.raises(PoolExhausted):
+        pool.acquire()
+    stats = pool.stats()
+    assert stats['size'] == 2
+    assert stats['timeouts'] == 1
+
+
+def test_release_rolls_back_open_transaction(pool):
+    db = pool.acquire()
+    db.execute('INSERT INTO t VALUES (1)')
+    assert db.in_transaction
+    pool.release(db)
+
+    db = pool.acquire()
+    assert not db.in_transaction
+    assert db.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
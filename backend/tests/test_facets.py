@@ -0,0 +1,54 @@
+"""Facet counts must agree with the catalog for the same selection."""
+import pytest
+
+BOOKS = [
+    # id, category, author, age, available
+    ('b1', 'Казки', 'Франко', '3+', 1),
+    ('b2', 'Казки', 'Франко', '6+', 0),
+    ('b3', 'Казки', 'Українка', '6+', 1),
+    ('b4', 'Пригоди', 'Нестайко', '6+', 1),
+    ('b5', 'Пригоди', 'Франко', None, 0),
+]
+
+
+@pytest.fixture
+def catalog(client, db):
+    for book_id, category, author, age, available in BOOKS:
+        db.execute(
+            'INSERT INTO books (id, title, author, category, age, available) VALUES (?, ?, ?, ?, ?, ?)',
+            [book_id, f'Книга {book_id}', author, category, age, available]
+        )
+    db.commit()
+    return client
+
+
+def _catalog_total(client, params):
+    response = client.get('/api/books', query_string={**params, 'limit': 1})
+    assert response.status_code == 200
+    return response.get_json()['total']
+
+
+@pytest.mark.parametrize('selection', [
+    {},
+    {'category': 'Казки'},
+    {'category': 'Казки', 'author': 'Франко'},
+    {'available': 'true', 'age': '6+'},
+])
+def test_facet_counts_match_catalog_totals(catalog, selection):
+    response = catalog.get('/api/books/filters', query_string=selection)
+    assert response.status_code == 200
+    body = response.get_json()
+
+    assert body['total'] == _catalog_total(catalog, selection)
+    for facet, arg in (('category', 'category'), ('author', 'author'), ('age', 'age')):
+        for entry in body['facets'][facet]:
+            # Each facet is counted under the *other* selected facets
+            params = {**selection, arg: entry['value']}
+            assert entry['count'] == _catalog_total(catalog, params), (facet, entry)
+
+
+def test_availability_facet_counts(catalog):
+    body = catalog.get('/api/books/filters', query_string={'category': 'Казки'}).get_json()
+
+    counts = {entry['value']: entry['count'] for entry in body['facets']['availability']}
+    assert counts == {'available': 2, 'unavailable': 1}
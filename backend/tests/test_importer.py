@@ -0,0 +1,48 @@
+"""Bulk book import: chunked commits, per-row failures and shared references."""
+from app import importer
+
+
+def _row(i, **fields):
+    return {'title': f'Книга {i}', 'author': 'Автор', 'category': 'Казки', 'series': 'Серія', **fields}
+
+
+def test_bad_rows_fail_alone(db):
+    rows = [_row(i) for i in range(1, 8)]
+    rows[1]['author'] = ''  # rejected before insert
+    rows[4]['description'] = {'not': 'text'}  # rejected by SQLite on insert
+    progress = []
+
+    result = importer.import_books(
+        db, rows, chunk_size=3,
+        on_progress=lambda res, last_row: progress.append((last_row, res['success'])),
+    )
+
+    assert result['success'] == 5
+    assert result['failed'] == 2
+    assert [error.split(':')[0] for error in result['errors']] == ['Row 2', 'Row 5']
+    assert progress == [(3, 2), (6, 4), (7, 5)]
+    assert not db.in_transaction
+    assert db.execute('SELECT COUNT(*) FROM books').fetchone()[0] == 5
+
+
+def test_references_are_created_once(db):
+    rows = [_row(i, category='Казки' if i % 2 else 'Пригоди', publisher='Старий Лев') for i in range(10)]
+
+    importer.import_books(db, rows, chunk_size=4)
+
+    assert [r[0] for r in db.execute('SELECT name FROM categories ORDER BY name')] == ['Казки', 'Пригоди']
+    assert db.execute('SELECT COUNT(*) FROM series').fetchone()[0] == 1
+    assert db.execute('SELECT COUNT(*) FROM publishers').fetchone()[0] == 1
+    assert db.execute(
+        'SELECT COUNT(*) FROM books WHERE category_id IS NULL OR series_id IS NULL OR publisher_id IS NULL'
+    ).fetchone()[0] == 0
+
+
+def test_error_messages_are_capped(db, monkeypatch):
+    monkeypatch.setattr(importer, 'MAX_ERRORS', 2)
+
+    result = importer.import_books(db, [{'title': ''}] * 5 + [_row(1)])
+
+    assert result['success'] == 1
+    assert result['failed'] == 5
+    assert len(result['errors']) == 2
@@ -0,0 +1,76 @@
+"""Due dates are stored on approval and overdue loans are split at today."""
+import pytest
+
+# Loans below are two weeks long; each is keyed by days until it is due
+DUE_IN = (-5, -1, 0, 3, 4)
+
+
+def _add_loan(db, rental_id, due_in, status='approved'):
+    db.execute(
+        '''INSERT INTO rental_requests
+           (id, book_id, book_title, renter_name, renter_phone, renter_email, rental_duration, status, approved_at)
+           VALUES (?, 'b1', 'Книга', 'Олена', '0671234567', '', 2, ?, datetime('now', ?))''',
+        [rental_id, status, f'{due_in - 14} days']
+    )
+
+
+@pytest.fixture
+def loans(db, add_book):
+    add_book('b1', available=0)
+    for due_in in DUE_IN:
+        _add_loan(db, f'due{due_in}', due_in)
+    _add_loan(db, 'returned', -10, status='returned')
+    db.commit()
+
+
+def _overdue(client, headers, **params):
+    response = client.get('/api/rentals/overdue', query_string=params, headers=headers)
+    assert response.status_code == 200
+    body = response.get_json()
+    return [r['id'] for r in body['overdue']], [r['id'] for r in body['due_soon']], body
+
+
+def test_loans_split_at_today(client, admin_headers, loans):
+    overdue, due_soon, body = _overdue(client, admin_headers)
+
+    # Soonest due first; a loan due today is not yet overdue
+    assert overdue == ['due-5', 'due-1']
+    assert due_soon == ['due0', 'due3']
+    assert body['days'] == 3
+    assert [r['days_overdue'] for r in body['overdue'] + body['due_soon']] == [5, 1, 0, -3]
+
+
+@pytest.mark.parametrize('days, due_soon', [(0, ['due0']), (4, ['due0', 'due3', 'due4'])])
+def test_days_sets_the_due_soon_window(client, admin_headers, loans, days, due_soon):
+    assert _overdue(client, admin_headers, days=days)[1] == due_soon
+
+
+@pytest.mark.parametrize('days', ['-1', '366', 'soon'])
+def test_days_out_of_range_is_rejected(client, admin_headers, days):
+    response = client.get('/api/rentals/overdue', query_string={'days': days}, headers=admin_headers)
+    assert response.status_code == 400
+
+
+def test_bootstrap_counts_match_the_listing(client, admin_headers, loans):
+    counts = client.get('/api/admin/bootstrap', headers=admin_headers).get_json()['counts']
+
+    assert (counts['overdue'], counts['due_soon']) == (2, 2)
+
+
+def test_due_date_follows_approval_and_duration(client, db, admin_headers, add_book, rent):
+    add_book('b2')
+    rental = rent('b2', rental_duration=3).get_json()
+    assert rental['due_date'] is None
+
+    response = client.put(f"/api/rentals/{rental['id']}/status", json={'status': 'approved'}, headers=admin_headers)
+    assert response.status_code == 200
+    approved = response.get_json()
+
+    def approved_plus(days):
+        return db.execute('SELECT date(?, ?)', [approved['approved_at'], f'+{days} days']).fetchone()[0]
+
+    assert approved['due_date'] == approved_plus(21)
+
+    db.execute('UPDATE rental_requests SET rental_duration = 1 WHERE id = ?', [rental['id']])
+    db.commit()
+    assert db.execute('SELECT due_date FROM rental_requests WHERE id = ?', [rental['id']]).fetchone()[0] == approved_plus(7)
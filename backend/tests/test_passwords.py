@@ -0,0 +1,17 @@
+"""Password hashes are upgraded to a higher cost, never moved back down."""
+import bcrypt
+
+from app.passwords import PasswordHasher
+
+
+def _hash(rounds):
+    return bcrypt.hashpw(b'secret', bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def test_needs_rehash_only_for_lower_cost():
+    hasher = PasswordHasher(5, max_concurrency=1, max_queue=1, queue_timeout=1)
+
+    assert hasher.needs_rehash(_hash(4))
+    assert not hasher.needs_rehash(_hash(5))
+    # Another worker calibrated higher; its hashes are left alone
+    assert not hasher.needs_rehash(_hash(6))
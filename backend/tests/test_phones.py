@@ -0,0 +1,70 @@
+"""Renters are matched to readers by phone number in any spelling."""
+import pytest
+
+from app.phones import phone_key
+
+
+@pytest.mark.parametrize('phone', [
+    '+380 67 123 4567',
+    '+380 (67) 123-45-67',
+    '380671234567',
+    '067 123 45 67',
+    '0671234567',
+    '=380671234567',
+    '00380671234567',
+])
+def test_spellings_of_one_number_share_a_key(phone):
+    assert phone_key(phone) == '671234567'
+
+
+def test_bulgarian_numbers_use_the_national_number():
+    assert phone_key('+359 88 420 6203') == phone_key('0884206203') == '884206203'
+
+
+@pytest.mark.parametrize('phone', [None, '', '-', '12345', '000000012'])
+def test_too_few_digits_have_no_key(phone):
+    assert phone_key(phone) is None
+
+
+def _rent(client, book_id, phone):
+    response = client.post('/api/rentals', json={
+        'book_id': book_id, 'book_title': 'Книга', 'renter_name': 'Олена Коваль',
+        'renter_phone': phone, 'rental_duration': 2,
+    })
+    assert response.status_code == 201
+    return response.get_json()
+
+
+@pytest.fixture
+def books(db):
+    for book_id in ('b1', 'b2', 'b3'):
+        db.execute(
+            "INSERT INTO books (id, title, author, category) VALUES (?, 'Книга', 'Автор', 'Казки')", [book_id]
+        )
+    db.commit()
+
+
+def test_rental_is_matched_to_reader_by_phone(client, db, admin_headers, books):
+    reader = client.post('/api/readers', json={
+        'parent_name': 'Олена', 'parent_surname': 'Коваль',
+        'phone1': '+380 (67) 123-45-67', 'address': 'Київ',
+    }).get_json()
+
+    rental = _rent(client, 'b1', '0671234567')
+
+    assert rental['reader_id'] == reader['id']
+    assert db.execute('SELECT COUNT(*) FROM readers').fetchone()[0] == 1
+
+
+def test_changed_phone_is_reindexed(client, db, admin_headers, books):
+    reader = client.post('/api/readers', json={
+        'parent_name': 'Олена', 'parent_surname': 'Коваль',
+        'phone1': '0671234567', 'address': 'Київ',
+    }).get_json()
+    response = client.put(f"/api/readers/{reader['id']}", json={'phone1': '0509876543'}, headers=admin_headers)
+    assert response.status_code == 200
+
+    assert _rent(client, 'b1', '+380 50 987 65 43')['reader_id'] == reader['id']
+    # The old number no longer belongs to anyone; a new reader is created
+    assert _rent(client, 'b2', '0671234567')['reader_id'] != reader['id']
+    assert db.execute('SELECT COUNT(*) FROM readers').fetchone()[0] == 2
@@ -0,0 +1,19 @@
+"""Every hot query in app/query_check.py must be served by an index.
+
+Run from backend/:
+    python -m pytest tests
+"""
+from app.config import Config
+from app.database import connect
+from app.migrate import migrate
+from app.query_check import find_table_scans
+
+
+def test_hot_queries_use_indexes(tmp_path):
+    # connect() registers the SQL functions the routes use (casefold)
+    db = connect(str(tmp_path / 'plan.db'), vars(Config))
+    try:
+        migrate(db)
+        assert find_table_scans(db) == []
+    finally:
+        db.close()
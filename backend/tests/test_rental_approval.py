@@ -0,0 +1,68 @@
+"""Approvals are serialized: a book is never approved to two renters."""
+import threading
+import time
+
+from app.database import query_db
+from app.routes import rentals
+
+
+def _set_status(client, headers, rental_id, status):
+    return client.put(f'/api/rentals/{rental_id}/status', json={'status': status}, headers=headers)
+
+
+def test_second_approval_for_a_book_is_refused(client, db, admin_headers, add_book, rent):
+    add_book('b1')
+    first = rent('b1', renter_phone='0671111111').get_json()
+    second = rent('b1', renter_phone='0672222222').get_json()
+    assert first['status'] == second['status'] == 'pending'
+
+    assert _set_status(client, admin_headers, first['id'], 'approved').status_code == 200
+    response = _set_status(client, admin_headers, second['id'], 'approved')
+
+    assert response.status_code == 409
+    assert response.get_json() == {'error': 'Book is already rented out'}
+    statuses = dict(db.execute('SELECT id, status FROM rental_requests').fetchall())
+    assert statuses == {first['id']: 'approved', second['id']: 'pending'}
+
+
+def test_repeated_approval_is_a_no_op(client, db, admin_headers, add_book, rent):
+    add_book('b1')
+    rental = rent('b1').get_json()
+    approved = _set_status(client, admin_headers, rental['id'], 'approved').get_json()
+    events = db.execute('SELECT COUNT(*) FROM events').fetchone()[0]
+
+    again = _set_status(client, admin_headers, rental['id'], 'approved')
+
+    assert again.status_code == 200
+    assert again.get_json()['approved_at'] == approved['approved_at']
+    assert db.execute('SELECT COUNT(*) FROM events').fetchone()[0] == events
+
+
+def test_concurrent_approvals_approve_one(app, db, admin_headers, add_book, rent, monkeypatch):
+    add_book('b1')
+    rental_ids = [rent('b1', renter_phone=f'06700000{i:02}').get_json()['id'] for i in range(4)]
+
+    # Widen the window between checking for an approved rental and writing,
+    # so unserialized approvals would all pass the check
+    def slow_query_db(*args, **kwargs):
+        result = query_db(*args, **kwargs)
+        time.sleep(0.02)
+        return result
+    monkeypatch.setattr(rentals, 'query_db', slow_query_db)
+    barrier = threading.Barrier(len(rental_ids))
+    codes = []
+
+    def approve(rental_id):
+        worker = app.test_client()
+        barrier.wait()
+        codes.append(_set_status(worker, admin_headers, rental_id, 'approved').status_code)
+
+    threads = [threading.Thread(target=approve, args=(rental_id,)) for rental_id in rental_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(codes) == [200, 409, 409, 409]
+    assert db.execute("SELECT COUNT(*) FROM rental_requests WHERE status = 'approved'").fetchone()[0] == 1
+    assert db.execute("SELECT available FROM books WHERE id = 'b1'").fetchone()[0] == 0
@@ -0,0 +1,68 @@
+"""Queue positions follow the immutable enqueue sequence, without gaps."""
+import pytest
+
+
+def _set_status(client, headers, rental_id, status):
+    response = client.put(f'/api/rentals/{rental_id}/status', json={'status': status}, headers=headers)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+@pytest.fixture
+def queue(client, admin_headers, add_book, rent):
+    """A book on loan with four queued reservations; returns (holder, [queued])."""
+    add_book('b1')
+    holder = rent('b1', renter_phone='0670000000', auto_approve=True).get_json()
+    assert holder['status'] == 'approved'
+    queued = [rent('b1', renter_phone=f'06711111{i:02}').get_json() for i in range(4)]
+    assert [r['queue_position'] for r in queued] == [1, 2, 3, 4]
+    return holder, queued
+
+
+def _positions(client, headers):
+    return [(e['id'], e['queue_position']) for e in client.get('/api/rentals/queue/b1', headers=headers).get_json()]
+
+
+def _rentals(client, headers):
+    return {r['id']: r for r in client.get('/api/rentals?book_id=b1', headers=headers).get_json()}
+
+
+def test_declining_a_reservation_closes_the_gap(client, admin_headers, queue):
+    _, queued = queue
+    _set_status(client, admin_headers, queued[1]['id'], 'declined')
+
+    expected = [(queued[0]['id'], 1), (queued[2]['id'], 2), (queued[3]['id'], 3)]
+    assert _positions(client, admin_headers) == expected
+    # The rentals listing computes the same positions
+    rentals = _rentals(client, admin_headers)
+    for rental_id, position in expected:
+        assert rentals[rental_id]['queue_position'] == position
+
+
+def test_deleted_reservation_leaves_no_gap(client, db, admin_headers, queue):
+    _, queued = queue
+    db.execute('DELETE FROM rental_requests WHERE id = ?', [queued[0]['id']])
+    db.commit()
+
+    assert _positions(client, admin_headers) == [(r['id'], i) for i, r in enumerate(queued[1:], start=1)]
+
+
+def test_return_promotes_the_head_of_the_queue(client, admin_headers, queue):
+    holder, queued = queue
+    _set_status(client, admin_headers, holder['id'], 'returned')
+
+    promoted = _rentals(client, admin_headers)[queued[0]['id']]
+    assert promoted['status'] == 'pending'
+    assert promoted['queue_position'] is None
+    assert _positions(client, admin_headers) == [(r['id'], i) for i, r in enumerate(queued[1:], start=1)]
+
+
+def test_sequence_numbers_are_never_reused(client, db, admin_headers, queue, rent):
+    _, queued = queue
+    _set_status(client, admin_headers, queued[3]['id'], 'declined')
+
+    newcomer = rent('b1', renter_phone='0672222222').get_json()
+
+    seqs = dict(db.execute('SELECT id, queue_seq FROM rental_requests WHERE queue_seq IS NOT NULL').fetchall())
+    assert seqs[newcomer['id']] > max(seqs[r['id']] for r in queued)
+    assert newcomer['queue_position'] == 4
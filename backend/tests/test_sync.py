@@ -0,0 +1,84 @@
+"""Delta sync pages through the change log and reports deletions as tombstones."""
+
+
+def _sync(client, headers, since, limit=None):
+    params = {'since': since}
+    if limit:
+        params['limit'] = limit
+    response = client.get('/api/sync', query_string=params, headers=headers)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def _sync_all(client, headers, since=0, limit=None):
+    """Follow has_more to the end; return (changed book ids, deleted book ids, since, pages)."""
+    changed, deleted, pages = [], [], 0
+    while True:
+        body = _sync(client, headers, since, limit)
+        pages += 1
+        changed += [book['id'] for book in body['changed']['books']]
+        deleted += body['deleted']['books']
+        since = body['since']
+        if not body['has_more']:
+            return changed, deleted, since, pages
+
+
+def test_pages_follow_has_more(client, admin_headers, add_book):
+    for i in range(5):
+        add_book(f'b{i}')
+
+    first = _sync(client, admin_headers, 0, limit=2)
+    assert first['has_more'] is True
+    assert len(first['changed']['books']) == 2
+
+    changed, deleted, since, pages = _sync_all(client, admin_headers, limit=2)
+    assert sorted(changed) == [f'b{i}' for i in range(5)]
+    assert deleted == []
+    assert pages == 3
+
+    caught_up = _sync(client, admin_headers, since)
+    assert caught_up['has_more'] is False
+    assert caught_up['since'] == since
+    assert caught_up['changed']['books'] == []
+
+
+def test_only_rows_changed_since_are_returned(client, admin_headers, add_book):
+    add_book('b1')
+    add_book('b2')
+    _, _, since, _ = _sync_all(client, admin_headers)
+
+    response = client.put('/api/books/b2', json={'title': 'Нова назва'}, headers=admin_headers)
+    assert response.status_code == 200
+
+    body = _sync(client, admin_headers, since)
+    assert [book['title'] for book in body['changed']['books']] == ['Нова назва']
+
+
+def test_deleted_rows_become_tombstones(client, admin_headers, add_book):
+    add_book('b1')
+    add_book('b2')
+    _, _, since, _ = _sync_all(client, admin_headers)
+
+    assert client.delete('/api/books/b1', headers=admin_headers).status_code == 200
+    add_book('b3')
+    assert client.delete('/api/books/b3', headers=admin_headers).status_code == 200
+
+    changed, deleted, _, _ = _sync_all(client, admin_headers, since)
+    # A row created and deleted between syncs is only reported deleted
+    assert changed == []
+    assert sorted(deleted) == ['b1', 'b3']
+
+
+def test_deleting_a_reader_tombstones_their_children(client, admin_headers):
+    reader = client.post('/api/readers', json={
+        'parent_name': 'Олена', 'parent_surname': 'Коваль', 'phone1': '0671234567', 'address': 'Київ',
+        'children': [{'name': 'Ія', 'surname': 'Коваль', 'birth_date': '2018-01-01'}],
+    }).get_json()
+    since = _sync(client, admin_headers, 0)['since']
+
+    assert client.delete(f"/api/readers/{reader['id']}", headers=admin_headers).status_code == 200
+
+    body = _sync(client, admin_headers, since)
+    assert body['deleted']['readers'] == [reader['id']]
+    assert body['deleted']['children'] == [reader['children'][0]['id']]
+    assert body['changed']['children'] == []
@@ -0,0 +1,28 @@
+"""Authenticated users are served from the cache without a query per request."""
+from app.auth import UserCache
+
+
+def test_version_is_read_at_most_once_per_interval(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr('app.auth.time.monotonic', lambda: clock[0])
+    reads = []
+
+    def fetch():
+        reads.append(clock[0])
+        return len(reads)
+
+    cache = UserCache(maxsize=10, ttl=60, version_interval=5)
+    assert cache.version(fetch) == 1
+    clock[0] += 4
+    assert cache.version(fetch) == 1
+    clock[0] += 1
+    assert cache.version(fetch) == 2
+    assert len(reads) == 2
+
+
+def test_newer_version_invalidates_entries():
+    cache = UserCache(maxsize=10, ttl=60, version_interval=5)
+    cache.put('u1', {'id': 'u1', 'role': 'admin'}, version=1)
+
+    assert cache.get('u1', 1) == {'id': 'u1', 'role': 'admin'}
+    assert cache.get('u1', 2) is None
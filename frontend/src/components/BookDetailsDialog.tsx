@@ -4,7 +4,7 @@ import { Dialog, DialogContent, DialogHeader, DialogTitle } from "@/components/u
 import { Button } from "@/components/ui/button";
 import { Badge } from "@/components/ui/badge";
 import { ChevronLeft, ChevronRight, BookOpen, X, ZoomIn } from "lucide-react";
-import { booksApi, rentalsApi, resolveUrl } from "@/lib/api";
+import { booksApi, resolveUrl } from "@/lib/api";
 
 interface BookMedia {
   id: string;
@@ -29,6 +29,8 @@ interface BookDetailsDialogProps {
   coverColor: string;
   coverImageUrl?: string | null;
   available: boolean;
+  queueLength?: number;
+  expectedReturn?: string | null;
   onRent: () => void;
 }
 
@@ -52,6 +54,8 @@ const BookDetailsDialog = ({
   coverColor,
   coverImageUrl,
   available,
+  queueLength = 0,
+  expectedReturn,
   onRent,
 }: BookDetailsDialogProps) => {
   const [media, setMedia] = useState<BookMedia[]>([]);
@@ -60,7 +64,6 @@ const BookDetailsDialog = ({
   const [dialogWidth, setDialogWidth] = useState(() => DEFAULT_WIDTH());
   const [isResizing, setIsResizing] = useState(false);
   const [lightboxOpen, setLightboxOpen] = useState(false);
-  const [queueLength, setQueueLength] = useState(0);
   const dialogRef = useRef<HTMLDivElement>(null);
 
   // Build images array: cover image first, then additional media (resolve relative URLs)
@@ -73,13 +76,8 @@ const BookDetailsDialog = ({
     if (open && bookId) {
       fetchMedia();
       setCurrentImageIndex(0);
-      if (!available) {
-        rentalsApi.getQueue(bookId).then(entries => setQueueLength(entries.length)).catch(() => setQueueLength(0));
-      } else {
-        setQueueLength(0);
-      }
     }
-  }, [open, bookId, available]);
+  }, [open, bookId]);
 
   // Calculate optimal width based on widest image
   useEffect(() => {
@@ -356,6 +354,11 @@ const BookDetailsDialog = ({
                 В черзі: {queueLength} {queueLength === 1 ? "людина" : queueLength < 5 ? "людини" : "людей"}
               </p>
             )}
+            {!available && expectedReturn && (
+              <p className="text-sm text-center text-muted-foreground">
+                Очікується повернення: {new Date(expectedReturn).toLocaleDateString("uk-UA")}
+              </p>
+            )}
           </div>
         </div>
       </DialogContent>
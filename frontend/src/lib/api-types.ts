@@ -47,14 +47,56 @@ export interface Book {
   updated_at: string;
   publishers?: { name: string; city: string } | null;
   series?: { name: string } | null;
+  availability?: BookAvailability | null;
 }
 
+export interface BookAvailability {
+  queue_length: number;
+  expected_return: string | null;
+  available_copies: number;
+}
+
+export interface BookGroup extends Book {
+  copies: number;
+  available_copies: number;
+}
+
+export interface BookQuery {
+  category?: string;
+  author?: string;
+  publisher?: string;
+  age?: string;
+  series?: string;
+  available?: 'all' | 'available' | 'unavailable';
+  search?: string;
+  sort?: 'title' | 'author' | 'newest' | 'year' | 'inventory';
+  order?: 'asc' | 'desc';
+  limit?: number;
+  cursor?: string | null;
+  include?: 'availability';
+}
+
+export interface Page<T> {
+  items: T[];
+  next_cursor: string | null;
+  total: number;
+}
+
+export interface FacetCount {
+  value: string;
+  count: number;
+}
+
+export type FacetName = 'category' | 'author' | 'age' | 'publisher' | 'series' | 'availability';
+
 export interface BookFilters {
   categories: string[];
   authors: string[];
   ages: string[];
   publishers: string[];
   series: string[];
+  facets: Record<FacetName, FacetCount[]>;
+  total: number;
 }
 
 export interface BookMedia {
@@ -113,6 +155,14 @@ export interface ReaderWithChildren extends Reader {
   children: Child[];
 }
 
+export interface ReaderQuery {
+  search?: string;
+  sort?: 'surname' | 'name' | 'newest';
+  order?: 'asc' | 'desc';
+  limit?: number;
+  cursor?: string | null;
+}
+
 // Rentals
 export interface RentalRequest {
   id: string;
@@ -129,6 +179,49 @@ export interface RentalRequest {
   requested_at: string;
   approved_at: string | null;
   return_date: string | null;
+  due_date: string | null;
+  book_author?: string | null;
+  child_name?: string | null;
+}
+
+export interface OverdueRental {
+  id: string;
+  book_id: string;
+  book_title: string;
+  book_author: string | null;
+  renter_name: string;
+  renter_phone: string;
+  renter_email: string;
+  reader_id: string | null;
+  reader_name: string | null;
+  reader_surname: string | null;
+  reader_phone1: string | null;
+  reader_phone2: string | null;
+  reader_email: string | null;
+  child_id: string | null;
+  child_name: string | null;
+  approved_at: string;
+  rental_duration: number;
+  due_date: string;
+  days_overdue: number;
+}
+
+export interface OverdueRentals {
+  overdue: OverdueRental[];
+  due_soon: OverdueRental[];
+  days: number;
+}
+
+export interface RentalQuery {
+  status?: RentalRequest['status'];
+  reader_id?: string;
+  book_id?: string;
+  child_id?: string;
+  from?: string;
+  to?: string;
+  renter?: string;
+  limit?: number;
+  cursor?: string | null;
 }
 
 export interface QueueEntry {
@@ -157,3 +250,34 @@ export interface ImportResult {
   failed: number;
   errors: string[];
 }
+
+export interface ImportJob extends ImportResult {
+  id: string;
+  filename: string;
+  status: 'queued' | 'running' | 'done' | 'failed';
+  total_rows: number | null;
+  processed: number;
+  error: string | null;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+}
+
+export type SyncEntity = 'books' | 'readers' | 'children' | 'rental_requests';
+
+export interface SyncChanges {
+  changed: Record<SyncEntity, Record<string, unknown>[]>;
+  deleted: Record<SyncEntity, string[]>;
+  since: number;
+  has_more: boolean;
+}
+
+export interface AdminBootstrap {
+  user: User;
+  counts: { pending: number; queued: number; approved: number; overdue: number; due_soon: number };
+  pending: RentalRequest[];
+  queued: RentalRequest[];
+  categories: Category[];
+  series: Series[];
+  publishers: Publisher[];
+}
@@ -1,10 +1,10 @@
 import type {
   AuthResponse, LoginRequest, SignupRequest, User,
-  Book, BookFilters, BookMedia,
+  Book, BookAvailability, BookFilters, BookGroup, BookMedia, BookQuery, Page,
   Category, Series, Publisher,
-  Reader, ReaderWithChildren, Child,
-  RentalRequest, RentalHistory, UserProfile, ImportResult,
-  QueueEntry
+  Reader, ReaderWithChildren, ReaderQuery, Child,
+  RentalRequest, RentalQuery, RentalHistory, OverdueRentals, UserProfile, ImportResult, ImportJob,
+  QueueEntry, SyncChanges, AdminBootstrap
 } from './api-types';
 
 const API_URL = import.meta.env.VITE_API_URL ?? 'http://localhost:8000';
@@ -63,6 +63,17 @@ async function apiFetch<T>(path: string, options: RequestInit = {}): Promise<T>
   return response.json();
 }
 
+/** Build a query string from params, skipping empty values and the "all" sentinel. */
+function toQuery(params: object): string {
+  const search = new URLSearchParams();
+  for (const [key, value] of Object.entries(params)) {
+    if (value === undefined || value === null || value === '' || value === 'all') continue;
+    search.set(key, String(value));
+  }
+  const query = search.toString();
+  return query ? `?${query}` : '';
+}
+
 // Auth API
 export const authApi = {
   signup: (data: SignupRequest) =>
@@ -83,7 +94,17 @@ export const authApi = {
 export const booksApi = {
   list: () => apiFetch<Book[]>('/api/books'),
 
-  filters: () => apiFetch<BookFilters>('/api/books/filters'),
+  page: (params: BookQuery = {}) =>
+    apiFetch<Page<Book>>(`/api/books${toQuery({ limit: 50, ...params })}`),
+
+  grouped: (params: BookQuery = {}) =>
+    apiFetch<Page<BookGroup>>(`/api/books/grouped${toQuery({ limit: 40, ...params })}`),
+
+  filters: (params: Omit<BookQuery, 'sort' | 'order' | 'limit' | 'cursor'> = {}) =>
+    apiFetch<BookFilters>(`/api/books/filters${toQuery(params)}`),
+
+  availability: (ids: string[]) =>
+    apiFetch<Record<string, BookAvailability>>('/api/books/availability', { method: 'POST', body: JSON.stringify({ ids }) }),
 
   create: (data: Partial<Book>) =>
     apiFetch<Book>('/api/books', { method: 'POST', body: JSON.stringify(data) }),
@@ -146,6 +167,8 @@ export const publishersApi = {
 // Readers API
 export const readersApi = {
   list: () => apiFetch<ReaderWithChildren[]>('/api/readers'),
+  page: (params: ReaderQuery = {}) =>
+    apiFetch<Page<ReaderWithChildren>>(`/api/readers${toQuery({ limit: 50, ...params })}`),
   get: (id: string) => apiFetch<ReaderWithChildren>(`/api/readers/${id}`),
   create: (data: { parent_name: string; parent_surname: string; phone1: string; phone2?: string; address: string; comment?: string; children: Array<{ name: string; surname: string; birth_date: string; gender?: string }> }) =>
     apiFetch<ReaderWithChildren>('/api/readers', { method: 'POST', body: JSON.stringify(data) }),
@@ -172,6 +195,24 @@ export const readersApi = {
 // Rentals API
 export const rentalsApi = {
   list: () => apiFetch<RentalRequest[]>('/api/rentals'),
+  journal: (params: RentalQuery = {}) =>
+    apiFetch<Page<RentalRequest>>(`/api/rentals${toQuery({ limit: 50, ...params })}`),
+  /** Download the journal (same filters) as a CSV or XLSX file. */
+  exportJournal: async (format: 'csv' | 'xlsx', params: Omit<RentalQuery, 'limit' | 'cursor'> = {}) => {
+    const response = await fetch(`${API_URL}/api/rentals/export${toQuery({ ...params, format })}`, {
+      headers: token ? { Authorization: `Bearer ${token}` } : {},
+    });
+    if (!response.ok) {
+      const error = await response.json().catch(() => ({ error: 'Unknown error' }));
+      throw new Error(error.error || `HTTP ${response.status}`);
+    }
+    const url = URL.createObjectURL(await response.blob());
+    const link = document.createElement('a');
+    link.href = url;
+    link.download = `rentals.${format}`;
+    link.click();
+    URL.revokeObjectURL(url);
+  },
   create: (data: { book_id: string; book_title: string; renter_name: string; renter_phone: string; renter_email: string; rental_duration: number; reader_id?: string; child_id?: string; auto_approve?: boolean }) =>
     apiFetch<RentalRequest>('/api/rentals', { method: 'POST', body: JSON.stringify(data) }),
   updateStatus: (id: string, status: 'approved' | 'declined' | 'returned') =>
@@ -180,6 +221,8 @@ export const rentalsApi = {
     apiFetch<RentalHistory[]>(`/api/rentals?reader_id=${readerId}`),
   getQueue: (bookId: string) =>
     apiFetch<QueueEntry[]>(`/api/rentals/queue/${bookId}`),
+  overdue: (days?: number) =>
+    apiFetch<OverdueRentals>(`/api/rentals/overdue${toQuery({ days })}`),
 };
 
 // Users API (admin)
@@ -207,4 +250,35 @@ export const uploadApi = {
 export const importApi = {
   importBooks: (booksData: any[]) =>
     apiFetch<ImportResult>('/api/books/import', { method: 'POST', body: JSON.stringify({ booksData }) }),
+  importXlsx: (file: File) => {
+    const formData = new FormData();
+    formData.append('file', file);
+    return apiFetch<ImportJob>('/api/books/import/xlsx', { method: 'POST', body: formData });
+  },
+  job: (id: string) => apiFetch<ImportJob>(`/api/books/import/jobs/${id}`),
+};
+
+// Admin dashboard
+export const adminApi = {
+  bootstrap: () => apiFetch<AdminBootstrap>('/api/admin/bootstrap'),
+};
+
+// Delta sync (admin): rows changed or deleted since a change sequence
+export const syncApi = {
+  changes: (since = 0, limit?: number) =>
+    apiFetch<SyncChanges>(`/api/sync${toQuery({ since, limit })}`),
 };
+
+// Admin change stream (Server-Sent Events). EventSource cannot send headers,
+// so the token goes in the URL; the browser resumes with Last-Event-ID.
+export type ChangeEventType = 'rental' | 'book' | 'reset';
+
+export function subscribeEvents(onEvent: (type: ChangeEventType, data: Record<string, unknown>) => void): () => void {
+  const source = new EventSource(`${API_URL}/api/events?token=${encodeURIComponent(token ?? '')}`);
+  for (const type of ['rental', 'book', 'reset'] as const) {
+    source.addEventListener(type, (event) => {
+      onEvent(type, JSON.parse((event as MessageEvent).data || '{}'));
+    });
+  }
+  return () => source.close();
+}
@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
@@ -6,7 +6,7 @@ import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
 import { Badge } from "@/components/ui/badge";
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from "@/components/ui/table";
 import { useToast } from "@/hooks/use-toast";
-import { authApi, booksApi, rentalsApi, usersApi, categoriesApi, seriesApi, publishersApi, readersApi, getToken, setToken, resolveUrl } from "@/lib/api";
+import { adminApi, authApi, booksApi, rentalsApi, usersApi, categoriesApi, seriesApi, publishersApi, readersApi, getToken, setToken, resolveUrl, subscribeEvents } from "@/lib/api";
 import type { RentalRequest, Book, UserProfile, Category, Series, Publisher, ReaderWithChildren, Child } from "@/lib/api-types";
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select";
 import {
@@ -66,6 +66,11 @@ const Admin = () => {
   const [publisherSearchQuery, setPublisherSearchQuery] = useState("");
   const [readerSearchQuery, setReaderSearchQuery] = useState("");
   const [journalSearchQuery, setJournalSearchQuery] = useState("");
+  const [journalFrom, setJournalFrom] = useState("");
+  const [journalTo, setJournalTo] = useState("");
+  const [journalEntries, setJournalEntries] = useState<RentalRequest[]>([]);
+  const [journalTotal, setJournalTotal] = useState(0);
+  const [journalCursor, setJournalCursor] = useState<string | null>(null);
   const [isAddBookOpen, setIsAddBookOpen] = useState(false);
   const [editingBook, setEditingBook] = useState<Book | null>(null);
   const [isCategoryDialogOpen, setIsCategoryDialogOpen] = useState(false);
@@ -89,6 +94,24 @@ const Admin = () => {
   const navigate = useNavigate();
   const { toast } = useToast();
 
+  // Heavy lists are fetched the first time a tab (or dialog) needs them
+  const loaded = useRef(new Set<string>());
+  const ensureLoaded = (...keys: Array<'rentals' | 'books' | 'users' | 'readers' | 'journal'>) => {
+    const fetchers = { rentals: fetchRentalRequests, books: fetchBooks, users: fetchUsers, readers: fetchReaders, journal: () => fetchJournal() };
+    for (const key of keys) {
+      if (loaded.current.has(key)) continue;
+      loaded.current.add(key);
+      fetchers[key]();
+    }
+  };
+  const TAB_DATA: Record<string, Array<'rentals' | 'books' | 'users' | 'readers' | 'journal'>> = {
+    requests: ['rentals'],
+    journal: ['journal'],
+    books: ['books'],
+    users: ['users'],
+    readers: ['readers', 'rentals'],
+  };
+
   useEffect(() => {
     const checkAuthAndLoad = async () => {
       if (!getToken()) {
@@ -97,7 +120,25 @@ const Admin = () => {
       }
 
       try {
-        // Check if user is admin
+        // One call for the first render: counts, pending/queued requests and reference tables
+        const bootstrap = await adminApi.bootstrap();
+        setCurrentUserId(bootstrap.user.id);
+        setIsLoggedIn(true);
+        setIsAdmin(true);
+        setRentalRequests([...bootstrap.pending, ...bootstrap.queued]);
+        setCategories(bootstrap.categories);
+        setSeries(bootstrap.series);
+        setPublishers(bootstrap.publishers);
+        setLoading(false);
+
+        // Then the full rental list for the approved/returned sections
+        ensureLoaded(...TAB_DATA.requests);
+        return;
+      } catch {
+        // Not an admin, or the token is no longer valid
+      }
+
+      try {
         const user = await authApi.me();
         setCurrentUserId(user.id);
 
@@ -113,15 +154,10 @@ const Admin = () => {
 
         setIsLoggedIn(true);
         setIsAdmin(true);
-
-        // Only fetch data if admin
         fetchRentalRequests();
-        fetchBooks();
-        fetchUsers();
         fetchCategories();
         fetchSeries();
         fetchPublishers();
-        fetchReaders();
       } catch (error) {
         setToken(null);
         navigate("/auth");
@@ -130,17 +166,70 @@ const Admin = () => {
 
     checkAuthAndLoad();
 
-    // Set up polling for rental requests and books (replaces real-time subscription)
-    const interval = setInterval(() => {
-      fetchRentalRequests();
-      fetchBooks();
-    }, 300000); // 5 minutes
+    // Reload rentals and books when the server reports a change; bursts of
+    // events (a return that promotes the queue, an import) reload once
+    let rentalsTimer: ReturnType<typeof setTimeout> | undefined;
+    let booksTimer: ReturnType<typeof setTimeout> | undefined;
+    const unsubscribe = subscribeEvents((type) => {
+      if (type === 'rental' || type === 'reset') {
+        clearTimeout(rentalsTimer);
+        rentalsTimer = setTimeout(fetchRentalRequests, 300);
+      }
+      if ((type === 'book' || type === 'reset') && loaded.current.has('books')) {
+        clearTimeout(booksTimer);
+        booksTimer = setTimeout(fetchBooks, 300);
+      }
+    });
 
     return () => {
-      clearInterval(interval);
+      unsubscribe();
+      clearTimeout(rentalsTimer);
+      clearTimeout(booksTimer);
     };
   }, [navigate]);
 
+  // The journal is paged on the server; filters reset it to the first page
+  const journalFilters = () => ({
+    status: 'returned' as const,
+    renter: journalSearchQuery.trim(),
+    from: journalFrom,
+    to: journalTo,
+  });
+
+  const fetchJournal = async (cursor: string | null = null) => {
+    try {
+      const page = await rentalsApi.journal({ ...journalFilters(), cursor });
+      setJournalEntries(prev => cursor ? [...prev, ...page.items] : page.items);
+      setJournalTotal(page.total);
+      setJournalCursor(page.next_cursor);
+    } catch (error) {
+      console.error("Помилка завантаження журналу:", error);
+      toast({
+        title: "Помилка",
+        description: "Не вдалося завантажити журнал видач",
+        variant: "destructive",
+      });
+    }
+  };
+
+  useEffect(() => {
+    if (!loaded.current.has('journal')) return;
+    const timer = setTimeout(() => fetchJournal(), 300);
+    return () => clearTimeout(timer);
+  }, [journalSearchQuery, journalFrom, journalTo]);
+
+  const handleExportJournal = async (format: 'csv' | 'xlsx') => {
+    try {
+      await rentalsApi.exportJournal(format, journalFilters());
+    } catch (error) {
+      toast({
+        title: "Помилка",
+        description: "Не вдалося експортувати журнал",
+        variant: "destructive",
+      });
+    }
+  };
+
   const fetchRentalRequests = async () => {
     console.log("Fetching rental requests...");
     try {
@@ -503,24 +592,6 @@ const Admin = () => {
     return age;
   };
 
-  // Journal: approved + returned rentals with author lookup
-  const bookMap = new Map(books.map(b => [b.id, b]));
-  const childMap = new Map(readers.flatMap(r => (r.children || []).map(c => [c.id, c])));
-  const journalEntries = rentalRequests
-    .filter(r => r.status === "returned")
-    .filter(r => {
-      if (!journalSearchQuery) return true;
-      const q = journalSearchQuery.toLowerCase();
-      const author = bookMap.get(r.book_id)?.author || "";
-      return r.renter_name.toLowerCase().includes(q) ||
-        r.book_title.toLowerCase().includes(q) ||
-        author.toLowerCase().includes(q);
-    })
-    .sort((a, b) => {
-      const da = a.approved_at || a.requested_at;
-      const db = b.approved_at || b.requested_at;
-      return db.localeCompare(da);
-    });
 
   const handleEditBook = (book: Book) => {
     setEditingBook(book);
@@ -586,7 +657,7 @@ const Admin = () => {
       </div>
 
       <div className="container mx-auto px-4 py-8">
-        <Tabs defaultValue="requests" className="space-y-6">
+        <Tabs defaultValue="requests" className="space-y-6" onValueChange={(tab) => ensureLoaded(...(TAB_DATA[tab] ?? []))}>
           <TabsList>
             <TabsTrigger value="requests">Запити на оренду</TabsTrigger>
             <TabsTrigger value="journal">Журнал</TabsTrigger>
@@ -603,7 +674,7 @@ const Admin = () => {
               <CardHeader>
                 <div className="flex items-center justify-between">
                   <CardTitle>Запити на оренду</CardTitle>
-                  <Button onClick={() => setIsCreateRentalOpen(true)} className="gap-2">
+                  <Button onClick={() => { ensureLoaded('books', 'readers'); setIsCreateRentalOpen(true); }} className="gap-2">
                     <Plus className="w-4 h-4" />
                     Нова оренда
                   </Button>
@@ -732,16 +803,26 @@ const Admin = () => {
           <TabsContent value="journal" className="space-y-6">
             <Card>
               <CardHeader>
-                <CardTitle>Журнал видач ({journalEntries.length})</CardTitle>
-                <div className="relative mt-4">
-                  <Search className="absolute left-3 top-1/2 transform -translate-y-1/2 text-muted-foreground w-4 h-4" />
-                  <Input
-                    type="text"
-                    placeholder="Шукати за назвою, автором або читачем..."
-                    value={journalSearchQuery}
-                    onChange={(e) => setJournalSearchQuery(e.target.value)}
-                    className="pl-10"
-                  />
+                <div className="flex items-center justify-between">
+                  <CardTitle>Журнал видач ({journalTotal})</CardTitle>
+                  <div className="flex gap-2">
+                    <Button variant="outline" size="sm" onClick={() => handleExportJournal('csv')}>CSV</Button>
+                    <Button variant="outline" size="sm" onClick={() => handleExportJournal('xlsx')}>XLSX</Button>
+                  </div>
+                </div>
+                <div className="flex flex-col sm:flex-row gap-2 mt-4">
+                  <div className="relative flex-1">
+                    <Search className="absolute left-3 top-1/2 transform -translate-y-1/2 text-muted-foreground w-4 h-4" />
+                    <Input
+                      type="text"
+                      placeholder="Шукати за читачем..."
+                      value={journalSearchQuery}
+                      onChange={(e) => setJournalSearchQuery(e.target.value)}
+                      className="pl-10"
+                    />
+                  </div>
+                  <Input type="date" value={journalFrom} onChange={(e) => setJournalFrom(e.target.value)} className="sm:w-44" />
+                  <Input type="date" value={journalTo} onChange={(e) => setJournalTo(e.target.value)} className="sm:w-44" />
                 </div>
               </CardHeader>
               <CardContent>
@@ -770,7 +851,7 @@ const Admin = () => {
                                 ? new Date(entry.approved_at).toLocaleDateString('uk-UA')
                                 : "—"}
                             </TableCell>
-                            <TableCell>{bookMap.get(entry.book_id)?.author || "—"}</TableCell>
+                            <TableCell>{entry.book_author || "—"}</TableCell>
                             <TableCell className="font-medium">{entry.book_title}</TableCell>
                             <TableCell className="whitespace-nowrap">
                               {entry.return_date
@@ -779,12 +860,19 @@ const Admin = () => {
                             </TableCell>
                             <TableCell>{entry.renter_name}</TableCell>
                             <TableCell>
-                              {entry.child_id ? childMap.get(entry.child_id)?.name || "—" : "—"}
+                              {entry.child_name || "—"}
                             </TableCell>
                           </TableRow>
                         ))}
                       </TableBody>
                     </Table>
+                    {journalCursor && (
+                      <div className="flex justify-center mt-4">
+                        <Button variant="outline" onClick={() => fetchJournal(journalCursor)}>
+                          Завантажити ще
+                        </Button>
+                      </div>
+                    )}
                   </div>
                 )}
               </CardContent>
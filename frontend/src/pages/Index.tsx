@@ -33,13 +33,21 @@ interface Book {
   } | null;
 }
 
+interface BookGroup extends Book {
+  copies: number;
+  available_copies: number;
+}
+
 const Index = () => {
   const [searchQuery, setSearchQuery] = useState("");
   const [selectedBook, setSelectedBook] = useState<Book | null>(null);
   const [isDetailsDialogOpen, setIsDetailsDialogOpen] = useState(false);
   const [isRentDialogOpen, setIsRentDialogOpen] = useState(false);
-  const [books, setBooks] = useState<Book[]>([]);
+  const [groups, setGroups] = useState<BookGroup[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [collectionSize, setCollectionSize] = useState(0);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [isLoggedIn, setIsLoggedIn] = useState<boolean>(!!getToken());
   const [categories, setCategories] = useState<string[]>([]);
   const [publishers, setPublishers] = useState<string[]>([]);
@@ -56,7 +64,6 @@ const Index = () => {
   const { toast } = useToast();
 
   useEffect(() => {
-    fetchBooks();
     fetchFilters();
 
     // Check for existing session
@@ -74,19 +81,48 @@ const Index = () => {
     checkAuth();
   }, []);
 
+  // Filtering, grouping of copies into works and paging all happen on the server
+  const catalogQuery = () => ({
+    search: searchQuery.trim(),
+    category: selectedCategory,
+    author: selectedAuthor,
+    publisher: selectedPublisher,
+    age: selectedAge,
+    series: selectedSeries,
+    available: selectedAvailability as "all" | "available" | "unavailable",
+    include: "availability" as const,
+  });
+
   const fetchBooks = async () => {
-    console.log("Fetching books from database...");
     try {
-      const data = await booksApi.list();
-      console.log("Books fetched successfully:", data);
-      console.log("Number of books:", data?.length);
-      setBooks(data || []);
+      const page = await booksApi.grouped(catalogQuery());
+      setGroups(page.items);
+      setNextCursor(page.next_cursor);
     } catch (error) {
       console.error("Помилка завантаження книг:", error);
     }
     setLoading(false);
   };
 
+  const fetchMoreBooks = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await booksApi.grouped({ ...catalogQuery(), cursor: nextCursor });
+      setGroups((prev) => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      console.error("Помилка завантаження книг:", error);
+    }
+    setLoadingMore(false);
+  };
+
+  useEffect(() => {
+    // Debounce typing in the search box; filter changes apply almost immediately
+    const timer = setTimeout(fetchBooks, 250);
+    return () => clearTimeout(timer);
+  }, [searchQuery, selectedCategory, selectedAuthor, selectedPublisher, selectedAge, selectedSeries, selectedAvailability]);
+
   const fetchFilters = async () => {
     try {
       const data = await booksApi.filters();
@@ -95,47 +131,12 @@ const Index = () => {
       setAges(data.ages);
       setPublishers(data.publishers);
       setSeriesList(data.series);
+      setCollectionSize(data.total);
     } catch (error) {
       console.error("Помилка завантаження фільтрів:", error);
     }
   };
 
-  const filteredBooks = books.filter((book) => {
-    const matchesSearch =
-      book.title.toLowerCase().includes(searchQuery.toLowerCase()) ||
-      book.author.toLowerCase().includes(searchQuery.toLowerCase()) ||
-      book.category.toLowerCase().includes(searchQuery.toLowerCase());
-
-    const matchesCategory = selectedCategory === "all" || book.category === selectedCategory;
-    const matchesAuthor = selectedAuthor === "all" || book.author === selectedAuthor;
-    const matchesPublisher = selectedPublisher === "all" || book.publishers?.name === selectedPublisher;
-    const matchesAge = selectedAge === "all" || book.age === selectedAge;
-    const matchesSeries = selectedSeries === "all" || book.series?.name === selectedSeries;
-    const matchesAvailability = selectedAvailability === "all" || (selectedAvailability === "available" ? book.available : !book.available);
-
-    return matchesSearch && matchesCategory && matchesAuthor && matchesPublisher && matchesAge && matchesSeries && matchesAvailability;
-  });
-
-  // Group filtered books by title+author, keeping one representative card per group
-  const groupedBooks = (() => {
-    const groups = new Map<string, { book: Book; total: number; available: number }>();
-    for (const book of filteredBooks) {
-      const key = `${book.title}|||${book.author}`;
-      const existing = groups.get(key);
-      if (existing) {
-        existing.total++;
-        if (book.available) existing.available++;
-        // Prefer a copy with a cover image as representative
-        if (!existing.book.cover_image_url && book.cover_image_url) {
-          existing.book = book;
-        }
-      } else {
-        groups.set(key, { book, total: 1, available: book.available ? 1 : 0 });
-      }
-    }
-    return Array.from(groups.values());
-  })();
-
   const handleBookClick = (book: Book) => {
     setSelectedBook(book);
     setIsDetailsDialogOpen(true);
@@ -217,7 +218,7 @@ const Index = () => {
         <div className="max-w-4xl mx-auto">
           <div className="text-center mb-6">
             <h2 className="text-xl font-bold text-foreground mb-1">Дитячі книги</h2>
-            <p className="text-sm text-muted-foreground">{books.length} книг у колекції</p>
+            <p className="text-sm text-muted-foreground">{collectionSize} книг у колекції</p>
           </div>
           <div className="grid grid-cols-2 md:grid-cols-4 gap-x-6 gap-y-2">
             {categories.slice(0, 12).map((category) => (
@@ -342,24 +343,33 @@ const Index = () => {
           </div>
         </div>
 
-        {groupedBooks.length > 0 ? (
-          <div className="grid grid-cols-2 sm:grid-cols-3 lg:grid-cols-4 xl:grid-cols-5 gap-5">
-            {groupedBooks.map(({ book, total, available }) => (
-              <BookCard
-                key={book.id}
-                id={book.id}
-                title={book.title}
-                author={book.author}
-                coverColor={book.cover_color}
-                coverImageUrl={book.cover_image_url}
-                available={available > 0}
-                isNew={book.new_book || false}
-                totalCopies={total}
-                availableCopies={available}
-                onClick={() => handleBookClick(book)}
-              />
-            ))}
-          </div>
+        {groups.length > 0 ? (
+          <>
+            <div className="grid grid-cols-2 sm:grid-cols-3 lg:grid-cols-4 xl:grid-cols-5 gap-5">
+              {groups.map((book) => (
+                <BookCard
+                  key={book.id}
+                  id={book.id}
+                  title={book.title}
+                  author={book.author}
+                  coverColor={book.cover_color}
+                  coverImageUrl={book.cover_image_url}
+                  available={book.available_copies > 0}
+                  isNew={book.new_book || false}
+                  totalCopies={book.copies}
+                  availableCopies={book.available_copies}
+                  onClick={() => handleBookClick(book)}
+                />
+              ))}
+            </div>
+            {nextCursor && (
+              <div className="flex justify-center mt-8">
+                <Button variant="outline" onClick={fetchMoreBooks} disabled={loadingMore}>
+                  {loadingMore ? "Завантаження..." : "Показати ще"}
+                </Button>
+              </div>
+            )}
+          </>
         ) : (
           <div className="text-center py-12">
             <p className="text-muted-foreground">Книги не знайдено. Спробуйте інший пошуковий запит.</p>
@@ -418,6 +428,8 @@ const Index = () => {
           coverColor={selectedBook.cover_color}
           coverImageUrl={selectedBook.cover_image_url}
           available={selectedBook.available}
+          queueLength={selectedBook.availability?.queue_length ?? 0}
+          expectedReturn={selectedBook.availability?.expected_return}
           onRent={handleRentFromDetails}
         />
       )}